@@ -15,6 +15,7 @@ from PyQt5 import QtWidgets
 from labelme import __appname__
 from labelme import __version__
 from labelme.app import MainWindow
+from labelme.config import get_cache_dir
 from labelme.config import get_config
 from labelme.utils import newIcon
 
@@ -51,12 +52,7 @@ def _setup_loguru(logger_level: str) -> None:
     if sys.stderr:
         logger.add(sys.stderr, level=logger_level)
 
-    cache_dir: str
-    if os.name == "nt":
-        cache_dir = os.path.join(os.environ["LOCALAPPDATA"], "labelme")
-    else:
-        cache_dir = os.path.expanduser("~/.cache/labelme")
-
+    cache_dir: str = get_cache_dir()
     os.makedirs(cache_dir, exist_ok=True)
 
     log_file = os.path.join(cache_dir, "labelme.log")
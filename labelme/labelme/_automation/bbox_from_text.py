@@ -1,17 +1,28 @@
 import json
 import time
+from typing import TYPE_CHECKING
+from typing import Union
 
 import numpy as np
 import numpy.typing as npt
-import osam
 from loguru import logger
 
+if TYPE_CHECKING:
+    import osam
+
 
 def get_bboxes_from_texts(
-    model: str, image: np.ndarray, texts: list[str]
+    model: Union[str, "osam.types.Model"], image: np.ndarray, texts: list[str]
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Detect boxes for the texts, with a model name or an already loaded model.
+
+    A loaded model may be shared by several threads.
+    """
+    import osam
+
+    model_name: str = model if isinstance(model, str) else model.name
     request: osam.types.GenerateRequest = osam.types.GenerateRequest(
-        model=model,
+        model=model_name,
         image=image,
         prompt=osam.types.Prompt(
             texts=texts,
@@ -21,11 +32,15 @@ def get_bboxes_from_texts(
         ),
     )
     logger.debug(
-        f"Requesting with model={model!r}, image={(image.shape, image.dtype)}, "
+        f"Requesting with model={model_name!r}, image={(image.shape, image.dtype)}, "
         f"prompt={request.prompt!r}"
     )
     t_start: float = time.time()
-    response: osam.types.GenerateResponse = osam.apis.generate(request=request)
+    response: osam.types.GenerateResponse
+    if isinstance(model, str):
+        response = osam.apis.generate(request=request)
+    else:
+        response = model.generate(request=request)
 
     num_annotations: int = len(response.annotations)
     logger.debug(
@@ -57,6 +72,8 @@ def nms_bboxes(
     score_threshold: float,
     max_num_detections: int,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    import osam
+
     num_classes: int = max(labels) + 1
     scores_of_all_classes: npt.NDArray[np.float32] = np.zeros(
         (len(boxes), num_classes), dtype=np.float32
@@ -64,17 +81,53 @@ def nms_bboxes(
     for i, (score, label) in enumerate(zip(scores, labels)):
         scores_of_all_classes[i, label] = score
     logger.debug(f"Input: num_boxes={len(boxes)}")
+    # Newer osam also returns the indices of the kept boxes.
     boxes, scores, labels = osam.apis.non_maximum_suppression(
         boxes=boxes,
         scores=scores_of_all_classes,
         iou_threshold=iou_threshold,
         score_threshold=score_threshold,
         max_num_detections=max_num_detections,
-    )
+    )[:3]
     logger.debug(f"Output: num_boxes={len(boxes)}")
     return boxes, scores, labels
 
 
+def nms_new_bboxes(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    labels: np.ndarray,
+    existing_boxes: np.ndarray,
+    existing_labels: np.ndarray,
+    iou_threshold: float,
+    score_threshold: float,
+    max_num_detections: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """NMS over new and existing boxes, returning the new ones that are kept.
+
+    Existing boxes get a score above any detection, so new boxes overlapping
+    them are dropped.
+    """
+    existing_score: float = 1.01
+    boxes = np.r_[boxes, np.asarray(existing_boxes, dtype=np.float32).reshape(-1, 4)]
+    scores = np.r_[scores, np.full(len(existing_labels), existing_score)]
+    labels = np.r_[labels, np.asarray(existing_labels, dtype=np.int32)]
+    if len(boxes) == 0:
+        return boxes, scores, labels
+
+    boxes, scores, labels = nms_bboxes(
+        boxes=boxes,
+        scores=scores,
+        labels=labels,
+        iou_threshold=iou_threshold,
+        score_threshold=score_threshold,
+        max_num_detections=max_num_detections,
+    )
+
+    keep = scores != existing_score
+    return boxes[keep], scores[keep], labels[keep]
+
+
 def get_shapes_from_bboxes(
     boxes: np.ndarray, scores: np.ndarray, labels: np.ndarray, texts: list[str]
 ) -> list[dict]:
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import os.path as osp
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+if TYPE_CHECKING:
+    import osam
+
+
+class EmbeddingCache:
+    """On-disk cache of image embeddings keyed by model name and image digest.
+
+    Each entry is an uncompressed ``.npz`` file. Reading an entry bumps its
+    mtime, and writing one evicts the least recently used entries until the
+    total size is within ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self._cache_dir: str = cache_dir
+        self._max_bytes: int = max_bytes
+        self._lock: threading.Lock = threading.Lock()
+
+    def _get_path(self, model_name: str, image_digest: str) -> str:
+        model_digest: str = hashlib.sha1(model_name.encode()).hexdigest()[:8]
+        return osp.join(self._cache_dir, f"{model_digest}-{image_digest}.npz")
+
+    def get(
+        self, model_name: str, image_digest: str
+    ) -> Optional["osam.types.ImageEmbedding"]:
+        import osam
+
+        path: str = self._get_path(model_name=model_name, image_digest=image_digest)
+        try:
+            with np.load(path) as data:
+                image_embedding = osam.types.ImageEmbedding(
+                    original_height=int(data["original_height"]),
+                    original_width=int(data["original_width"]),
+                    embedding=data["embedding"],
+                    extra_features=[
+                        data[f"extra_feature_{i}"]
+                        for i in range(int(data["num_extra_features"]))
+                    ],
+                )
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception("Failed to load cached embedding: {!r}", path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        logger.debug("Loaded cached embedding: {!r}", path)
+        return image_embedding
+
+    def put(
+        self,
+        model_name: str,
+        image_digest: str,
+        image_embedding: "osam.types.ImageEmbedding",
+    ) -> None:
+        path: str = self._get_path(model_name=model_name, image_digest=image_digest)
+        tmp_path: Optional[str] = None
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial one.
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    original_height=image_embedding.original_height,
+                    original_width=image_embedding.original_width,
+                    embedding=image_embedding.embedding,
+                    num_extra_features=len(image_embedding.extra_features),
+                    **{
+                        f"extra_feature_{i}": extra_feature
+                        for i, extra_feature in enumerate(
+                            image_embedding.extra_features
+                        )
+                    },
+                )
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("Failed to save embedding to cache: {!r}", path)
+            if tmp_path is not None and osp.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[float, int, str]] = []
+            with os.scandir(self._cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".npz"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_bytes: int = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self._max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                logger.debug("Evicted cached embedding: {!r}", path)
+                total_bytes -= size
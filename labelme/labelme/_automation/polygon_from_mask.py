@@ -1,7 +1,5 @@
-import imgviz
 import numpy as np
 import numpy.typing as npt
-import skimage
 from loguru import logger
 
 
@@ -12,6 +10,8 @@ def _get_contour_length(contour: npt.NDArray[np.float32]) -> float:
 
 
 def compute_polygon_from_mask(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.float32]:
+    import skimage.measure
+
     contours: npt.NDArray[np.float32] = skimage.measure.find_contours(
         np.pad(mask, pad_width=1)
     )
@@ -29,6 +29,7 @@ def compute_polygon_from_mask(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.flo
     polygon = polygon[:-1]  # drop last point that is duplicate of first point
 
     if 0:
+        import imgviz
         import PIL.Image
 
         image_pil = PIL.Image.fromarray(imgviz.gray2rgb(imgviz.bool2ubyte(mask)))
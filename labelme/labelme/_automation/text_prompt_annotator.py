@@ -0,0 +1,166 @@
+import io
+import json
+import os
+import os.path as osp
+import threading
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import Optional
+
+import numpy as np
+import PIL.Image
+from loguru import logger
+
+from labelme._automation import bbox_from_text
+from labelme.label_file import LabelFile
+
+if TYPE_CHECKING:
+    import osam
+
+AnnotateResult = Literal["written", "skipped", "no_detections"]
+
+
+class TextPromptAnnotator:
+    """Annotates image files with boxes detected from a text prompt.
+
+    It's meant to be called from several worker threads at once. The model is
+    loaded on first use and shared by them.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        texts: list[str],
+        iou_threshold: float,
+        score_threshold: float,
+        flags: Optional[dict[str, bool]] = None,
+        store_data: bool = False,
+        max_num_detections: int = 100,
+    ):
+        self._model_name: str = model_name
+        self._model: Optional[osam.types.Model] = None
+        self._model_lock: threading.Lock = threading.Lock()
+        self._texts: list[str] = texts
+        self._iou_threshold: float = iou_threshold
+        self._score_threshold: float = score_threshold
+        self._flags: dict[str, bool] = flags or {}
+        self._store_data: bool = store_data
+        self._max_num_detections: int = max_num_detections
+
+    def _get_model(self) -> "osam.types.Model":
+        import osam
+
+        with self._model_lock:
+            if self._model is None:
+                logger.debug("Loading model: {!r}", self._model_name)
+                self._model = osam.apis.get_model_type_by_name(self._model_name)()
+            return self._model
+
+    def annotate_file(
+        self, filename: str, label_file: str, overwrite: bool = False
+    ) -> AnnotateResult:
+        """Add the detected boxes to the label file of the image.
+
+        Unless ``overwrite``, images that already have a label file are
+        skipped. Otherwise the boxes are added to its shapes, except those
+        overlapping existing boxes of the same label, and the rest of the file
+        is kept as it was.
+        """
+        existing: Optional[LabelFile] = None
+        if osp.exists(label_file):
+            if not overwrite:
+                return "skipped"
+            existing = LabelFile(label_file)
+
+        image_data: Optional[bytes] = LabelFile.load_image_file(filename)
+        if image_data is None:
+            raise OSError(f"Failed to read image file: {filename!r}")
+        with PIL.Image.open(io.BytesIO(image_data)) as image_pil:
+            image: np.ndarray = np.asarray(image_pil.convert("RGB"))
+
+        boxes, scores, labels = bbox_from_text.get_bboxes_from_texts(
+            model=self._get_model(), image=image, texts=self._texts
+        )
+
+        shapes: list[dict] = []
+        if existing is not None:
+            shapes = [_format_loaded_shape(shape) for shape in existing.shapes]
+        existing_shapes: list[dict] = [
+            shape
+            for shape in shapes
+            if shape["shape_type"] == "rectangle" and shape["label"] in self._texts
+        ]
+        boxes, scores, labels = bbox_from_text.nms_new_bboxes(
+            boxes=boxes,
+            scores=scores,
+            labels=labels,
+            existing_boxes=np.array(
+                [shape["points"][0] + shape["points"][1] for shape in existing_shapes],
+                dtype=np.float32,
+            ),
+            existing_labels=np.array(
+                [self._texts.index(shape["label"]) for shape in existing_shapes],
+                dtype=np.int32,
+            ),
+            iou_threshold=self._iou_threshold,
+            score_threshold=self._score_threshold,
+            max_num_detections=self._max_num_detections,
+        )
+        if len(boxes) == 0:
+            return "no_detections"
+
+        for shape in bbox_from_text.get_shapes_from_bboxes(
+            boxes=boxes, scores=scores, labels=labels, texts=self._texts
+        ):
+            shape["mask"] = None
+            shapes.append(shape)
+
+        image_path: str
+        stored_image_data: Optional[bytes]
+        if existing is not None:
+            flags: dict = existing.flags
+            other_data: dict = existing.otherData
+            # The image is referred to as it was, and embedded only if it was.
+            image_path = existing.imagePath  # type: ignore[assignment]
+            stored_image_data = (
+                existing.imageData if _has_image_data(label_file) else None
+            )
+        else:
+            flags = self._flags
+            other_data = {}
+            image_path = osp.relpath(filename, osp.dirname(label_file))
+            stored_image_data = image_data if self._store_data else None
+        if osp.dirname(label_file):
+            os.makedirs(osp.dirname(label_file), exist_ok=True)
+        LabelFile().save(
+            filename=label_file,
+            shapes=shapes,
+            imagePath=image_path,
+            imageData=stored_image_data,
+            imageHeight=image.shape[0],
+            imageWidth=image.shape[1],
+            otherData=other_data,
+            flags=flags,
+        )
+        return "written"
+
+
+def _has_image_data(label_file: str) -> bool:
+    # LabelFile reads the image in either case, so look at the file itself.
+    with open(label_file) as f:
+        return json.load(f).get("imageData") is not None
+
+
+def _format_loaded_shape(shape: dict) -> dict:
+    # From LabelFile.shapes back to what LabelFile.save() takes.
+    data = dict(shape["other_data"])
+    data.update(
+        label=shape["label"],
+        points=shape["points"],
+        group_id=shape["group_id"],
+        description=shape["description"],
+        shape_type=shape["shape_type"],
+        flags=shape["flags"],
+        mask=shape["mask_base64"],
+    )
+    return data
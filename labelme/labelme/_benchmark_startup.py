@@ -0,0 +1,85 @@
+"""Time from launch until the main window is shown, and where it goes.
+
+Run as ``python -m labelme._benchmark_startup``. Each run is a fresh
+interpreter started with ``-X importtime``, so the import breakdown is that
+of a cold start with warm disk caches.
+"""
+
+import argparse
+import collections
+import json
+import statistics
+import subprocess
+import sys
+
+# Runs in the child interpreter, and prints the phase times as JSON.
+_CHILD_CODE = """
+import json
+import time
+
+t_start = time.perf_counter()
+import labelme.__main__
+t_imported = time.perf_counter()
+
+from PyQt5 import QtWidgets
+from labelme.app import MainWindow
+from labelme.config import get_config
+
+app = QtWidgets.QApplication([])
+win = MainWindow(config=get_config())
+win.show()
+app.processEvents()
+t_shown = time.perf_counter()
+print(json.dumps(dict(import_=t_imported - t_start, window=t_shown - t_imported)))
+"""
+
+
+def _run_once() -> tuple[dict[str, float], dict[str, float]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    phases: dict[str, float] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # Self time of the modules, summed by top-level package.
+    seconds_by_package: dict[str, float] = collections.defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_usec, _, name = line[len("import time:") :].split("|")
+        if not self_usec.strip().isdigit():
+            continue  # the header
+        seconds_by_package[name.strip().split(".")[0]] += int(self_usec) / 1e6
+    return phases, seconds_by_package
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    parser.add_argument("--top", type=int, default=15, help="packages to show")
+    args = parser.parse_args()
+
+    runs = [_run_once() for _ in range(args.repeat)]
+
+    import_seconds = statistics.median(phases["import_"] for phases, _ in runs)
+    window_seconds = statistics.median(phases["window"] for phases, _ in runs)
+    print(f"import labelme.__main__: {import_seconds:.3f}s")
+    print(f"create and show window:  {window_seconds:.3f}s")
+    print(f"total:                   {import_seconds + window_seconds:.3f}s")
+
+    packages = {package for _, seconds in runs for package in seconds}
+    medians = {
+        package: statistics.median(seconds.get(package, 0.0) for _, seconds in runs)
+        for package in packages
+    }
+    print(f"\nimport time by package (median of {args.repeat} runs):")
+    for package, seconds in sorted(medians.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"  {package:<24} {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
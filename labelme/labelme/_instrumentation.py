@@ -0,0 +1,145 @@
+"""Opt-in timing histograms for finding out where the GUI spends its time.
+
+Enabled by the ``instrumentation`` config key or by setting the environment
+variable ``LABELME_INSTRUMENTATION=1``. While disabled, :func:`measure` and
+:func:`record` return right away.
+"""
+
+import bisect
+import contextlib
+import os
+import threading
+import time
+from typing import Iterator
+from typing import Optional
+
+from loguru import logger
+
+ENV_VAR = "LABELME_INSTRUMENTATION"
+
+# Upper bounds of the histogram buckets in milliseconds; the last is open.
+BUCKETS_MSEC = (1, 2, 4, 8, 16, 33, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts: list[int] = [0] * (len(BUCKETS_MSEC) + 1)
+        self.count: int = 0
+        self.total_msec: float = 0.0
+        self.max_msec: float = 0.0
+
+    def add(self, msec: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MSEC, msec)] += 1
+        self.count += 1
+        self.total_msec += msec
+        self.max_msec = max(self.max_msec, msec)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q``-th percentile."""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS_MSEC[i] if i < len(BUCKETS_MSEC) else self.max_msec
+        return self.max_msec
+
+    def summary(self) -> str:
+        if self.count == 0:
+            return "n=0"
+        return "n={} mean={:.1f}ms p50<={}ms p95<={}ms max={:.1f}ms".format(
+            self.count,
+            self.total_msec / self.count,
+            _format_msec(self.percentile(50)),
+            _format_msec(self.percentile(95)),
+            self.max_msec,
+        )
+
+    def format_counts(self) -> str:
+        labels = ["<={}ms".format(msec) for msec in BUCKETS_MSEC]
+        labels.append(">{}ms".format(BUCKETS_MSEC[-1]))
+        return " ".join(
+            "{}:{}".format(label, count)
+            for label, count in zip(labels, self.counts)
+            if count
+        )
+
+
+_lock = threading.Lock()
+_enabled: bool = False
+_summary_interval: float = 60.0
+_last_summary_time: float = 0.0
+_histograms: dict[str, Histogram] = {}
+
+
+def enable(summary_interval: float = 60.0) -> None:
+    """Start recording, and log a summary every ``summary_interval`` seconds."""
+    global _enabled, _summary_interval, _last_summary_time
+    with _lock:
+        _enabled = True
+        _summary_interval = summary_interval
+        _last_summary_time = time.monotonic()
+    logger.info("Instrumentation is enabled")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def is_enabled_by_env() -> bool:
+    return os.environ.get(ENV_VAR, "").lower() in ["1", "true", "yes", "on"]
+
+
+def record(name: str, seconds: float) -> None:
+    global _last_summary_time
+    if not _enabled:
+        return
+
+    log_summary: bool = False
+    with _lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram()
+        _histograms[name].add(seconds * 1000)
+
+        now = time.monotonic()
+        if now - _last_summary_time >= _summary_interval:
+            _last_summary_time = now
+            log_summary = True
+    if log_summary:
+        logger.info(
+            "Instrumentation summary:\n{}",
+            "\n".join(get_summary_lines(with_counts=True)),
+        )
+
+
+@contextlib.contextmanager
+def measure(name: str) -> Iterator[None]:
+    if not _enabled:
+        yield
+        return
+    t_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name=name, seconds=time.perf_counter() - t_start)
+
+
+def get_histogram(name: str) -> Optional[Histogram]:
+    with _lock:
+        return _histograms.get(name)
+
+
+def get_summary_lines(with_counts: bool = False) -> list[str]:
+    lines: list[str] = []
+    with _lock:
+        for name, histogram in sorted(_histograms.items()):
+            lines.append("{}: {}".format(name, histogram.summary()))
+            if with_counts:
+                lines.append("  {}".format(histogram.format_counts()))
+    return lines
+
+
+def _format_msec(msec: float) -> str:
+    return "{:g}".format(round(msec, 1))
@@ -0,0 +1,136 @@
+"""On-disk cache of image thumbnails, without Qt so batch tools can fill it."""
+
+import hashlib
+import io
+import os
+import os.path as osp
+import tempfile
+import threading
+from typing import Optional
+
+import PIL.Image
+from loguru import logger
+
+import labelme.utils
+
+# Evicting lists the whole cache directory, so it's done every this many puts.
+_EVICT_INTERVAL = 100
+
+
+class ThumbnailCache:
+    """JPEG thumbnails keyed by image path, mtime, file size and thumbnail size.
+
+    A changed image gets a new key, and its old thumbnail is evicted in time
+    like any unused entry: reading an entry bumps its mtime, and writing
+    evicts the least recently used entries until the total size is within
+    ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self._cache_dir: str = cache_dir
+        self._max_bytes: int = max_bytes
+        self._lock: threading.Lock = threading.Lock()
+        self._num_puts: int = 0
+
+    def _get_path(self, filename: str, size: int) -> Optional[str]:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        key = "{}\0{}\0{}\0{}".format(
+            osp.abspath(filename), stat.st_mtime_ns, stat.st_size, size
+        )
+        return osp.join(
+            self._cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".jpg"
+        )
+
+    def get(self, filename: str, size: int) -> Optional[bytes]:
+        """Cached thumbnail as JPEG data, or None."""
+        path: Optional[str] = self._get_path(filename=filename, size=size)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data: bytes = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def get_or_create(self, filename: str, size: int) -> Optional[bytes]:
+        """Thumbnail as JPEG data, made and cached if needed; None if unreadable.
+
+        Thumbnails are made from a reduced-resolution decode where the format
+        supports it, e.g. JPEG, so large images are not fully decoded.
+        """
+        if (data := self.get(filename=filename, size=size)) is not None:
+            return data
+        try:
+            data = _make_thumbnail(filename=filename, size=size)
+        except Exception as e:
+            logger.debug("Failed to make thumbnail of {!r}: {}", filename, e)
+            return None
+        self._put(filename=filename, size=size, data=data)
+        return data
+
+    def _put(self, filename: str, size: int, data: bytes) -> None:
+        if self._max_bytes <= 0:
+            return
+        path: Optional[str] = self._get_path(filename=filename, size=size)
+        if path is None:
+            return
+        tmp_path: Optional[str] = None
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial one.
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("Failed to save thumbnail to cache: {!r}", path)
+            if tmp_path is not None and osp.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._num_puts += 1
+            evict: bool = self._num_puts % _EVICT_INTERVAL == 1
+        if evict:
+            self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries: list[tuple[float, int, str]] = []
+            with os.scandir(self._cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".jpg"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_bytes: int = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self._max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total_bytes -= size
+
+
+def _make_thumbnail(filename: str, size: int) -> bytes:
+    with PIL.Image.open(filename) as image_pil:
+        # Lets the JPEG decoder scale down by up to 8x while decoding.
+        image_pil.draft("RGB", (size, size))
+        image_pil = labelme.utils.apply_exif_orientation(image_pil)
+        image_pil.thumbnail((size, size))
+        if image_pil.mode != "RGB":
+            image_pil = image_pil.convert("RGB")
+        f = io.BytesIO()
+        image_pil.save(f, format="JPEG", quality=85)
+    return f.getvalue()
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import collections
+import concurrent.futures
 import functools
 import html
 import math
 import os
 import os.path as osp
 import re
+import threading
+import time
 import webbrowser
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import Union
 
-import imgviz
-import natsort
 import numpy as np
 from loguru import logger
 from PyQt5 import QtCore
@@ -18,18 +24,27 @@ from PyQt5 import QtWidgets
 from PyQt5.QtCore import Qt
 
 from labelme import __appname__
+from labelme import _instrumentation
 from labelme._automation import bbox_from_text
+from labelme._automation.embedding_cache import EmbeddingCache
+from labelme._automation.text_prompt_annotator import TextPromptAnnotator
+from labelme._thumbnail_cache import ThumbnailCache
+from labelme.config import get_cache_dir
 from labelme.config import get_config
 from labelme.label_file import LabelFile
 from labelme.label_file import LabelFileError
 from labelme.shape import Shape
+from labelme.shape import get_shape_colors
 from labelme.widgets import AiPromptWidget
 from labelme.widgets import BrightnessContrastDialog
 from labelme.widgets import Canvas
 from labelme.widgets import FileDialogPreview
+from labelme.widgets import FileListWidget
 from labelme.widgets import LabelDialog
 from labelme.widgets import LabelListWidget
 from labelme.widgets import LabelListWidgetItem
+from labelme.widgets import ThumbnailLoader
+from labelme.widgets import TiledImage
 from labelme.widgets import ToolBar
 from labelme.widgets import UniqueLabelQListWidget
 from labelme.widgets import ZoomWidget
@@ -43,12 +58,165 @@ from . import utils
 # - Zoom is too "steppy".
 
 
-LABEL_COLORMAP = imgviz.label_colormap()
+@functools.lru_cache(maxsize=1)
+def _get_label_colormap() -> np.ndarray:
+    import imgviz
+
+    return imgviz.label_colormap()
+
+
+class _FileData(object):
+    """Label file and decoded image of a file, read off the GUI thread."""
+
+    def __init__(self, filename: str, label_file: str):
+        self.filename: str = filename
+        self.label_file: str = label_file
+        self.labelFile: Optional[LabelFile] = None
+        self.labelFileError: Optional[LabelFileError] = None
+        self.imageData: Optional[bytes] = None
+        self.imagePath: Optional[str] = None
+        self.image: QtGui.QImage = QtGui.QImage()
+        self.mtimes: tuple[Optional[float], ...] = _get_mtimes(filename, label_file)
+
+    @property
+    def nbytes(self) -> int:
+        return self.image.sizeInBytes() + len(self.imageData or b"")
+
+    def isModified(self) -> bool:
+        """Whether the files changed on disk since they were read."""
+        return self.mtimes != _get_mtimes(self.filename, self.label_file)
+
+
+class _AiAnnotateJob(object):
+    """Text prompt run over many images, and its progress so far."""
+
+    def __init__(
+        self,
+        annotator: TextPromptAnnotator,
+        filenames: list[str],
+        progress: QtWidgets.QProgressDialog,
+    ):
+        self.annotator: TextPromptAnnotator = annotator
+        self.filenames: list[str] = filenames
+        self.progress: QtWidgets.QProgressDialog = progress
+        self.cancelled: threading.Event = threading.Event()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1)
+        )
+        self.counts: collections.Counter[str] = collections.Counter()
+        self.errors: list[tuple[str, Exception]] = []
+        self.reload: bool = False
+
+
+def _get_mtimes(*paths: str) -> tuple[Optional[float], ...]:
+    mtimes: list[Optional[float]] = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _get_label_file(filename: str, output_dir: Optional[str]) -> str:
+    label_file = osp.splitext(filename)[0] + ".json"
+    if output_dir:
+        label_file_without_path = osp.basename(label_file)
+        label_file = osp.join(output_dir, label_file_without_path)
+    return label_file
+
+
+def _has_label_files(
+    filenames: list[str],
+    output_dir: Optional[str],
+    names_by_dir: Optional[dict[str, set[str]]] = None,
+) -> list[bool]:
+    """Whether each image has a label file, listing each directory only once.
+
+    On network shares a directory listing is far cheaper than a stat call
+    per image. Pass the same ``names_by_dir`` to reuse listings across calls.
+    """
+    label_files = [_get_label_file(filename, output_dir) for filename in filenames]
+    if names_by_dir is None:
+        names_by_dir = {}
+    has_label_files: list[bool] = []
+    for label_file in label_files:
+        dirname = osp.dirname(label_file)
+        if dirname not in names_by_dir:
+            names: set[str] = set()
+            try:
+                with os.scandir(dirname or ".") as it:
+                    for entry in it:
+                        if LabelFile.is_label_file(entry.name):
+                            names.add(osp.normcase(entry.name))
+            except OSError:
+                pass
+            names_by_dir[dirname] = names
+        has_label_files.append(
+            osp.normcase(osp.basename(label_file)) in names_by_dir[dirname]
+        )
+    return has_label_files
+
+
+def _iter_image_files(dirpath: str, extensions: tuple[str, ...]) -> Iterator[str]:
+    """Image files under the directory, in no particular order."""
+    dirpaths: list[str] = [dirpath]
+    while dirpaths:
+        try:
+            with os.scandir(dirpaths.pop()) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # Like os.walk(), don't follow symlinks to directories.
+                        if not entry.is_symlink():
+                            dirpaths.append(entry.path)
+                    elif entry.name.lower().endswith(extensions):
+                        yield osp.normpath(entry.path)
+        except OSError:
+            continue
+
+
+def _read_file(filename: str, output_dir: Optional[str]) -> _FileData:
+    # This may run in a worker thread, so it must not touch any widget.
+    label_file = _get_label_file(filename, output_dir)
+    file_data = _FileData(filename=filename, label_file=label_file)
+
+    t_start = time.perf_counter()
+    if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(label_file):
+        try:
+            file_data.labelFile = LabelFile(label_file)
+        except LabelFileError as e:
+            file_data.labelFileError = e
+            return file_data
+        file_data.imageData = file_data.labelFile.imageData
+        file_data.imagePath = osp.join(
+            osp.dirname(label_file),
+            file_data.labelFile.imagePath,  # type: ignore[arg-type]
+        )
+    else:
+        file_data.imageData = LabelFile.load_image_file(filename)
+        if file_data.imageData:
+            file_data.imagePath = filename
+    t_read = time.perf_counter()
+    _instrumentation.record("load_file.read", seconds=t_read - t_start)
+
+    if file_data.imageData:
+        file_data.image = QtGui.QImage.fromData(file_data.imageData)
+    _instrumentation.record("load_file.decode", seconds=time.perf_counter() - t_read)
+    return file_data
 
 
 class MainWindow(QtWidgets.QMainWindow):
     FIT_WINDOW, FIT_WIDTH, MANUAL_ZOOM = 0, 1, 2
 
+    _fileLoaded = QtCore.pyqtSignal(int, object)
+    _filesScanned = QtCore.pyqtSignal(int, object, bool)
+    _labelsAutosaved = QtCore.pyqtSignal()
+    _aiAnnotateProgress = QtCore.pyqtSignal(object, str, object)
+
     def __init__(
         self,
         config=None,
@@ -67,6 +235,16 @@ class MainWindow(QtWidgets.QMainWindow):
             config = get_config()
         self._config = config
 
+        if self._config["instrumentation"] or _instrumentation.is_enabled_by_env():
+            _instrumentation.enable()
+
+        # Patterns of label_flags, and the default flags they give each label.
+        self._label_flag_patterns: list[tuple[re.Pattern, list[str]]] = [
+            (re.compile(pattern), keys)
+            for pattern, keys in (self._config["label_flags"] or {}).items()
+        ]
+        self._default_flags_by_label: dict[str, dict[str, bool]] = {}
+
         # set default shape colors
         Shape.line_color = QtGui.QColor(*self._config["shape"]["line_color"])  # type: ignore[assignment]
         Shape.fill_color = QtGui.QColor(*self._config["shape"]["fill_color"])  # type: ignore[assignment]
@@ -146,8 +324,22 @@ class MainWindow(QtWidgets.QMainWindow):
         self.fileSearch = QtWidgets.QLineEdit()
         self.fileSearch.setPlaceholderText(self.tr("Search Filename"))
         self.fileSearch.textChanged.connect(self.fileSearchChanged)
-        self.fileListWidget = QtWidgets.QListWidget()
+        # Filter once typing pauses rather than on every keystroke.
+        self._fileSearchTimer = QtCore.QTimer(self)
+        self._fileSearchTimer.setSingleShot(True)
+        self._fileSearchTimer.setInterval(300)
+        self._fileSearchTimer.timeout.connect(self._applyFileSearch)
+        self.fileListWidget = FileListWidget()
         self.fileListWidget.itemSelectionChanged.connect(self.fileSelectionChanged)
+        self._thumbnail_loader = ThumbnailLoader(
+            ThumbnailCache(
+                cache_dir=osp.join(get_cache_dir(), "thumbnails"),
+                max_bytes=self._config["file_thumbnails"]["cache_mb"] * 1024 * 1024,
+            ),
+            parent=self,
+        )
+        if self._config["file_thumbnails"]["show"]:
+            self.setFileThumbnailsVisible(True)
         fileListLayout = QtWidgets.QVBoxLayout()
         fileListLayout.setContentsMargins(0, 0, 0, 0)
         fileListLayout.setSpacing(0)
@@ -162,13 +354,61 @@ class MainWindow(QtWidgets.QMainWindow):
         self.zoomWidget = ZoomWidget()
         self.setAcceptDrops(True)
 
+        embedding_cache: Optional[EmbeddingCache] = None
+        if self._config["ai"]["embedding_cache_mb"]:
+            embedding_cache = EmbeddingCache(
+                cache_dir=osp.join(get_cache_dir(), "embeddings"),
+                max_bytes=self._config["ai"]["embedding_cache_mb"] * 1024 * 1024,
+            )
         self.canvas = Canvas(
             epsilon=self._config["epsilon"],
             double_click=self._config["canvas"]["double_click"],
             num_backups=self._config["canvas"]["num_backups"],
+            backups_memory_mb=self._config["canvas"]["backups_memory_mb"],
             crosshair=self._config["canvas"]["crosshair"],
+            embedding_cache=embedding_cache,
         )
         self.canvas.zoomRequest.connect(self.zoomRequest)
+        self._load_file_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._load_file_future: Optional[concurrent.futures.Future] = None
+        self._load_file_request_id: int = 0
+        self._load_file_context: tuple[float, bool, list[Shape]] = (0.0, False, [])
+        self._fileLoaded.connect(self._applyLoadedFile)
+        # Files around the current one in imageList, read ahead of time.
+        self._file_prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1
+        )
+        self._file_prefetch_lock: threading.Lock = threading.Lock()
+        self._file_prefetch_cache: collections.OrderedDict[
+            tuple[str, Optional[str]], _FileData
+        ] = collections.OrderedDict()
+        self._file_prefetch_keys: set[tuple[str, Optional[str]]] = set()
+        self._file_prefetch_pending: set[tuple[str, Optional[str]]] = set()
+        self._embedding_prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1
+        )
+        self._embedding_prefetch_stop: threading.Event = threading.Event()
+        # Directory scans run in the background and add the files in batches.
+        self._dir_scan_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._dir_scan_request_id: int = 0
+        # File to select once its row appears, and whether to load one at all.
+        self._dir_scan_target: Optional[str] = None
+        self._dir_scan_load: bool = False
+        self._filesScanned.connect(self._addScannedFiles)
+        # With auto_save, edits are saved once they pause, in a worker thread.
+        self._autosave_timer = QtCore.QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.setInterval(500)
+        self._autosave_timer.timeout.connect(self._submitAutosave)
+        self._autosave_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._autosave_future: Optional[concurrent.futures.Future] = None
+        self._autosave_lock: threading.Lock = threading.Lock()
+        # Latest pending save of each label file, so rapid ones are coalesced.
+        self._autosave_jobs: dict[str, tuple[str, LabelFile, Callable[[], None]]] = {}
+        self._autosave_results: list[
+            tuple[str, str, LabelFile, Optional[Exception]]
+        ] = []
+        self._labelsAutosaved.connect(self._reportAutosaveResults)
         self.canvas.mouseMoved.connect(
             lambda pos: self.status(f"Mouse is at: x={pos.x()}, y={pos.y()}")
         )
@@ -526,6 +766,14 @@ class MainWindow(QtWidgets.QMainWindow):
             self.tr("Zoom to original size"),
             enabled=False,
         )
+        showFileThumbnails = action(
+            self.tr("Show File &Thumbnails"),
+            self.setFileThumbnailsVisible,
+            tip=self.tr("Show the file list as a grid of thumbnails"),
+            checkable=True,
+            checked=self._config["file_thumbnails"]["show"],
+            enabled=True,
+        )
         keepPrevScale = action(
             self.tr("&Keep Previous Scale"),
             self.enableKeepPrevScale,
@@ -735,6 +983,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.label_dock.toggleViewAction(),
                 self.shape_dock.toggleViewAction(),
                 self.file_dock.toggleViewAction(),
+                showFileThumbnails,
                 None,
                 fill_drawing,
                 None,
@@ -802,11 +1051,18 @@ class MainWindow(QtWidgets.QMainWindow):
                 model_name=self._selectAiModelComboBox.itemData(index)
             )
         )
+        self._selectAiModelComboBox.currentIndexChanged.connect(
+            lambda _: self._prefetch_image_embeddings()
+        )
         self._selectAiModelComboBox.setCurrentIndex(model_index)
 
         self._ai_prompt_widget: AiPromptWidget = AiPromptWidget(
-            on_submit=self._submit_ai_prompt, parent=self
+            on_submit=self._submit_ai_prompt,
+            on_submit_all=self._submit_ai_prompt_all,
+            parent=self,
         )
+        self._ai_annotate_job: Optional[_AiAnnotateJob] = None
+        self._aiAnnotateProgress.connect(self._onAiAnnotateProgress)
         ai_prompt_action = QtWidgets.QWidgetAction(self)
         ai_prompt_action.setDefaultWidget(self._ai_prompt_widget)
 
@@ -856,20 +1112,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self.fit_window = False
         self.zoom_values = {}  # key=filename, value=(zoom_mode, zoom_value)
         self.brightnessContrast_values = {}
+        self._brightnessContrastDialog: Optional[BrightnessContrastDialog] = None
         self.scroll_values = {  # type: ignore[var-annotated]
             Qt.Horizontal: {},  # type: ignore[attr-defined]
             Qt.Vertical: {},  # type: ignore[attr-defined]
         }  # key=filename, value=scroll_value
 
+        if config["file_search"]:
+            self.fileSearch.setText(config["file_search"])
+            self._applyFileSearch()
+
         if filename is not None and osp.isdir(filename):
-            self.importDirImages(filename, load=False)
+            self.importDirImages(filename)
         else:
             self.filename = filename
 
-        if config["file_search"]:
-            self.fileSearch.setText(config["file_search"])
-            self.fileSearchChanged()
-
         # XXX: Could be completely declarative.
         # Restore application settings.
         self.settings = QtCore.QSettings("labelme", "labelme")
@@ -945,11 +1202,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.undo.setEnabled(self.canvas.isShapeRestorable)  # type: ignore[attr-defined]
 
         if self._config["auto_save"] or self.actions.saveAuto.isChecked():  # type: ignore[attr-defined]
-            label_file = osp.splitext(self.imagePath)[0] + ".json"  # type: ignore[arg-type]
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            self.saveLabels(label_file)
+            self._autosave_timer.start()
             return
         self.dirty = True
         self.actions.save.setEnabled(True)  # type: ignore[attr-defined]
@@ -1000,36 +1253,36 @@ class MainWindow(QtWidgets.QMainWindow):
             texts=texts,
         )
 
-        for shape in self.canvas.shapes:
-            if shape.shape_type != "rectangle" or shape.label not in texts:
-                continue
-            box = np.array(
-                [
-                    shape.points[0].x(),
-                    shape.points[0].y(),
-                    shape.points[1].x(),
-                    shape.points[1].y(),
-                ],
-                dtype=np.float32,
-            )
-            boxes = np.r_[boxes, [box]]
-            scores = np.r_[scores, [1.01]]
-            labels = np.r_[labels, [texts.index(shape.label)]]
-
-        boxes, scores, labels = bbox_from_text.nms_bboxes(
+        existing_shapes: list[Shape] = [
+            shape
+            for shape in self.canvas.shapes
+            if shape.shape_type == "rectangle" and shape.label in texts
+        ]
+        boxes, scores, labels = bbox_from_text.nms_new_bboxes(
             boxes=boxes,
             scores=scores,
             labels=labels,
+            existing_boxes=np.array(
+                [
+                    [
+                        shape.points[0].x(),
+                        shape.points[0].y(),
+                        shape.points[1].x(),
+                        shape.points[1].y(),
+                    ]
+                    for shape in existing_shapes
+                ],
+                dtype=np.float32,
+            ),
+            existing_labels=np.array(
+                [texts.index(shape.label) for shape in existing_shapes],
+                dtype=np.int32,
+            ),
             iou_threshold=self._ai_prompt_widget.get_iou_threshold(),
             score_threshold=self._ai_prompt_widget.get_score_threshold(),
             max_num_detections=100,
         )
 
-        keep = scores != 1.01
-        boxes = boxes[keep]
-        scores = scores[keep]
-        labels = labels[keep]
-
         shape_dicts: list[dict] = bbox_from_text.get_shapes_from_bboxes(
             boxes=boxes,
             scores=scores,
@@ -1052,14 +1305,146 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loadShapes(shapes, replace=False)
         self.setDirty()
 
+    def _submit_ai_prompt_all(self, _) -> None:
+        """Run the text prompt on every image in the list, in worker threads."""
+        texts = self._ai_prompt_widget.get_text_prompt().split(",")
+        filenames = list(self.imageList)
+        if self._ai_annotate_job is not None or not filenames:
+            return
+        if not self.mayContinue():
+            return
+        self._flushAutosave()
+
+        overwrite = False
+        num_labeled = sum(_has_label_files(filenames, output_dir=self.output_dir))
+        if num_labeled:
+            mb = QtWidgets.QMessageBox
+            answer = mb.question(
+                self,
+                self.tr("Annotate all images"),
+                self.tr("%d of %d images already have labels. Add boxes to them too?")
+                % (num_labeled, len(filenames)),
+                mb.Yes | mb.No | mb.Cancel,
+                mb.No,
+            )
+            if answer == mb.Cancel:
+                return
+            overwrite = answer == mb.Yes
+
+        annotator = TextPromptAnnotator(
+            model_name="yoloworld",
+            texts=texts,
+            iou_threshold=self._ai_prompt_widget.get_iou_threshold(),
+            score_threshold=self._ai_prompt_widget.get_score_threshold(),
+            flags={key: False for key in self._config["flags"] or []},
+            store_data=self._config["store_data"],
+        )
+        progress = QtWidgets.QProgressDialog(
+            self.tr("Annotating images with %r...") % ",".join(texts),
+            self.tr("Cancel"),
+            0,
+            len(filenames),
+            self,
+        )
+        progress.setWindowModality(Qt.WindowModal)  # type: ignore[attr-defined]
+        progress.setMinimumDuration(0)
+        progress.setValue(0)
+
+        job = _AiAnnotateJob(
+            annotator=annotator, filenames=filenames, progress=progress
+        )
+        progress.canceled.connect(job.cancelled.set)
+        self._ai_annotate_job = job
+        for filename in filenames:
+            job.executor.submit(
+                self._run_ai_annotate,
+                job=job,
+                filename=filename,
+                label_file=_get_label_file(filename, self.output_dir),
+                overwrite=overwrite,
+            )
+
+    def _run_ai_annotate(
+        self, job: _AiAnnotateJob, filename: str, label_file: str, overwrite: bool
+    ) -> None:
+        # This runs in the worker threads.
+        result: Union[str, Exception]
+        if job.cancelled.is_set():
+            result = "cancelled"
+        else:
+            try:
+                with _instrumentation.measure("ai_annotate.file"):
+                    result = job.annotator.annotate_file(
+                        filename, label_file=label_file, overwrite=overwrite
+                    )
+            except Exception as e:
+                logger.exception("Failed to annotate {!r}", filename)
+                result = e
+        self._aiAnnotateProgress.emit(job, filename, result)
+
+    def _onAiAnnotateProgress(
+        self, job: _AiAnnotateJob, filename: str, result: Union[str, Exception]
+    ) -> None:
+        if isinstance(result, Exception):
+            job.errors.append((filename, result))
+        else:
+            job.counts[result] += 1
+            if result == "written":
+                self.fileListWidget.setChecked(filename, True)
+                job.reload |= filename == self.filename
+        num_done = len(job.errors) + sum(job.counts.values())
+        if not job.cancelled.is_set():
+            job.progress.setValue(num_done)
+        if num_done < len(job.filenames):
+            return
+
+        job.executor.shutdown(wait=False)
+        job.progress.close()
+        self._ai_annotate_job = None
+        if job.reload:
+            # Show the boxes the open image got.
+            self.loadFile(self.filename)
+        if job.counts["cancelled"]:
+            message = self.tr(
+                "Cancelled: annotated %d images, %d skipped, "
+                "%d without detections, %d cancelled"
+            ) % (
+                job.counts["written"],
+                job.counts["skipped"],
+                job.counts["no_detections"],
+                job.counts["cancelled"],
+            )
+        else:
+            message = self.tr(
+                "Annotated %d images, %d skipped, %d without detections"
+            ) % (
+                job.counts["written"],
+                job.counts["skipped"],
+                job.counts["no_detections"],
+            )
+        self.status(message)
+        if job.errors:
+            filename, error = job.errors[0]
+            self.errorMessage(
+                self.tr("Error annotating images"),
+                self.tr("Failed to annotate %d images, e.g. <b>%s</b>: %s")
+                % (len(job.errors), filename, error),
+            )
+
     def resetState(self):
+        self._flushAutosave()
         self.labelList.clear()
         self.filename = None
         self.imagePath = None
         self.imageData = None
         self.labelFile = None
         self.otherData = None
+        # Null until the next image is shown, so that nothing scales to it.
+        self.image = QtGui.QImage()
         self.canvas.resetState()
+        if self._brightnessContrastDialog is not None:
+            # Don't keep the pixels of the previous image around.
+            self._brightnessContrastDialog.setImage(QtGui.QImage())
 
     def currentItem(self):
         items = self.labelList.selectedItems()
@@ -1117,6 +1502,65 @@ class MainWindow(QtWidgets.QMainWindow):
             for draw_mode, draw_action in draw_actions.items():
                 draw_action.setEnabled(createMode != draw_mode)
         self.actions.editMode.setEnabled(not edit)  # type: ignore[attr-defined]
+        self._prefetch_image_embeddings()
+
+    def _prefetch_image_embeddings(self) -> None:
+        """Encode the current and next images while the user annotates.
+
+        Any running prefetch is stopped first, and nothing new is started
+        unless an AI create mode is active.
+        """
+        self._embedding_prefetch_stop.set()
+        if (
+            self.canvas.editing()
+            or self.canvas.createMode not in ["ai_polygon", "ai_mask"]
+            or not self.canvas.pixmap
+        ):
+            return
+
+        filenames: list[str] = []
+        depth: int = self._config["ai"]["prefetch_depth"]
+        image_list: list[str] = self.imageList
+        index: int = self.fileListWidget.row(self.filename)
+        if depth > 0 and index >= 0:
+            filenames = image_list[index + 1 : index + 1 + depth]
+
+        self._embedding_prefetch_stop = threading.Event()
+        self._embedding_prefetch_executor.submit(
+            self._run_image_embedding_prefetch,
+            image=self.canvas.pixmap,
+            filenames=filenames,
+            output_dir=self.output_dir,
+            stop=self._embedding_prefetch_stop,
+        )
+
+    def _run_image_embedding_prefetch(
+        self,
+        image: TiledImage,
+        filenames: list[str],
+        output_dir: Optional[str],
+        stop: threading.Event,
+    ) -> None:
+        # This runs in the worker thread. The current image goes first, so a
+        # prompt on it never waits behind the encoding of an upcoming one.
+        try:
+            if stop.is_set():
+                return
+            self.canvas.prefetch_image_embedding(
+                image=image.toImage(), image_digest=image.digest()
+            )
+            for filename in filenames:
+                if stop.is_set():
+                    return
+                # Same image as loadFile() gets, so the digests match.
+                qimage = self._getPrefetchedImage(filename, output_dir=output_dir)
+                if qimage.isNull():
+                    continue
+                self.canvas.prefetch_image_embedding(
+                    image=qimage, image_digest=utils.img_qt_to_digest(qimage)
+                )
+        except Exception:
+            logger.exception("Failed to prefetch image embeddings")
 
     def setEditMode(self):
         self.toggleDrawMode(True)
@@ -1248,26 +1692,21 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.uniqLabelList.setItemLabel(item, shape.label, rgb)
 
     def fileSearchChanged(self):
-        self.importDirImages(
-            self.lastOpenDir,
-            pattern=self.fileSearch.text(),
-            load=False,
-        )
+        self._fileSearchTimer.start()
+
+    def _applyFileSearch(self):
+        self._fileSearchTimer.stop()
+        self.fileListWidget.setFilterPattern(self.fileSearch.text())
 
     def fileSelectionChanged(self):
-        items = self.fileListWidget.selectedItems()
-        if not items:
+        filename = self.fileListWidget.selectedFilename()
+        if not filename:
             return
-        item = items[0]
 
         if not self.mayContinue():
             return
 
-        currIndex = self.imageList.index(str(item.text()))
-        if currIndex < len(self.imageList):
-            filename = self.imageList[currIndex]
-            if filename:
-                self.loadFile(filename)
+        self.loadFile(filename)
 
     # React to canvas signals.
     def shapeSelectionChanged(self, selected_shapes):
@@ -1289,36 +1728,53 @@ class MainWindow(QtWidgets.QMainWindow):
         self.actions.edit.setEnabled(n_selected)  # type: ignore[attr-defined]
 
     def addLabel(self, shape):
-        if shape.group_id is None:
-            text = shape.label
-        else:
-            text = "{} ({})".format(shape.label, shape.group_id)
-        label_list_item = LabelListWidgetItem(text, shape)
-        self.labelList.addItem(label_list_item)
-        if self.uniqLabelList.findItemByLabel(shape.label) is None:
-            item = self.uniqLabelList.createItemFromLabel(shape.label)
-            self.uniqLabelList.addItem(item)
-            rgb = self._get_rgb_by_label(shape.label)
-            self.uniqLabelList.setItemLabel(item, shape.label, rgb)
-        self.labelDialog.addLabelHistory(shape.label)
-        for action in self.actions.onShapesPresent:  # type: ignore[attr-defined]
-            action.setEnabled(True)
+        self.addLabels([shape])
 
-        self._update_shape_color(shape)
-        label_list_item.setText(
-            '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
-                html.escape(text), *shape.fill_color.getRgb()[:3]
+    def addLabels(self, shapes):
+        """Add the shapes to the label lists, updating each list once."""
+        items = []
+        rgb_by_label: dict[str, tuple[int, int, int]] = {}
+        for shape in shapes:
+            if shape.group_id is None:
+                text = shape.label
+            else:
+                text = "{} ({})".format(shape.label, shape.group_id)
+            if self.uniqLabelList.findItemByLabel(shape.label) is None:
+                item = self.uniqLabelList.createItemFromLabel(shape.label)
+                self.uniqLabelList.addItem(item)
+                rgb = self._get_rgb_by_label(shape.label)
+                self.uniqLabelList.setItemLabel(item, shape.label, rgb)
+            self._update_shape_color(shape, rgb_by_label=rgb_by_label)
+            items.append(
+                LabelListWidgetItem(
+                    '{} <font color="#{:02x}{:02x}{:02x}">●</font>'.format(
+                        html.escape(text), *shape.fill_color.getRgb()[:3]
+                    ),
+                    shape,
+                )
             )
-        )
+        if not items:
+            return
+        self.labelList.addItems(items)
+        self.labelDialog.addLabelHistories([shape.label for shape in shapes])
+        for action in self.actions.onShapesPresent:  # type: ignore[attr-defined]
+            action.setEnabled(True)
 
-    def _update_shape_color(self, shape):
-        r, g, b = self._get_rgb_by_label(shape.label)
-        shape.line_color = QtGui.QColor(r, g, b)
-        shape.vertex_fill_color = QtGui.QColor(r, g, b)
-        shape.hvertex_fill_color = QtGui.QColor(255, 255, 255)
-        shape.fill_color = QtGui.QColor(r, g, b, 128)
-        shape.select_line_color = QtGui.QColor(255, 255, 255)
-        shape.select_fill_color = QtGui.QColor(r, g, b, 155)
+    def _update_shape_color(self, shape, rgb_by_label=None):
+        if rgb_by_label is None:
+            rgb_by_label = {}
+        if shape.label not in rgb_by_label:
+            rgb_by_label[shape.label] = self._get_rgb_by_label(shape.label)
+        r, g, b = rgb_by_label[shape.label]
+        # Shapes of the same color share the QColor objects.
+        (
+            shape.line_color,
+            shape.vertex_fill_color,
+            shape.hvertex_fill_color,
+            shape.fill_color,
+            shape.select_line_color,
+            shape.select_fill_color,
+        ) = get_shape_colors(r=int(r), g=int(g), b=int(b))
 
     def _get_rgb_by_label(self, label):
         if self._config["shape_color"] == "auto":
@@ -1330,7 +1786,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.uniqLabelList.setItemLabel(item, label, rgb)
             label_id = self.uniqLabelList.indexFromItem(item).row() + 1
             label_id += self._config["shift_auto_shape_color"]
-            return LABEL_COLORMAP[label_id % len(LABEL_COLORMAP)]
+            label_colormap = _get_label_colormap()
+            return label_colormap[label_id % len(label_colormap)]
         elif (
             self._config["shape_color"] == "manual"
             and self._config["label_colors"]
@@ -1348,49 +1805,49 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def loadShapes(self, shapes, replace=True):
         self._noSelectionSlot = True
-        for shape in shapes:
-            self.addLabel(shape)
+        self.addLabels(shapes)
         self.labelList.clearSelection()
         self._noSelectionSlot = False
         self.canvas.loadShapes(shapes, replace=replace)
 
+    def _get_default_flags(self, label: str) -> dict[str, bool]:
+        if label not in self._default_flags_by_label:
+            default_flags: dict[str, bool] = {}
+            for regex, keys in self._label_flag_patterns:
+                if regex.match(label):
+                    for key in keys:
+                        default_flags[key] = False
+            self._default_flags_by_label[label] = default_flags
+        return dict(self._default_flags_by_label[label])
+
     def loadLabels(self, shapes):
         s = []
+        QPointF = QtCore.QPointF
         for shape in shapes:
-            label = shape["label"]
             points = shape["points"]
-            shape_type = shape["shape_type"]
-            flags: dict = shape["flags"] or {}
-            description = shape.get("description", "")
-            group_id = shape["group_id"]
-            other_data = shape["other_data"]
-
             if not points:
                 # skip point-empty shape
                 continue
 
-            shape = Shape(
+            label = shape["label"]
+            mask_base64 = shape.get("mask_base64")
+            shape_obj = Shape(
                 label=label,
-                shape_type=shape_type,
-                group_id=group_id,
-                description=description,
+                shape_type=shape["shape_type"],
+                group_id=shape["group_id"],
+                description=shape.get("description", ""),
                 mask=shape["mask"],
             )
-            for x, y in points:
-                shape.addPoint(QtCore.QPointF(x, y))
-            shape.close()
-
-            default_flags = {}
-            if self._config["label_flags"]:
-                for pattern, keys in self._config["label_flags"].items():
-                    if re.match(pattern, label):
-                        for key in keys:
-                            default_flags[key] = False
-            shape.flags = default_flags
-            shape.flags.update(flags)
-            shape.other_data = other_data
-
-            s.append(shape)
+            if mask_base64:
+                shape_obj.setMaskBase64(mask_base64)
+            shape_obj.addPoints([QPointF(x, y) for x, y in points])
+            shape_obj.close()
+
+            shape_obj.flags = self._get_default_flags(label)
+            shape_obj.flags.update(shape["flags"] or {})
+            shape_obj.other_data = shape["other_data"]
+
+            s.append(shape_obj)
         self.loadShapes(s)
 
     def loadFlags(self, flags):
@@ -1401,7 +1858,11 @@ class MainWindow(QtWidgets.QMainWindow):
             item.setCheckState(Qt.Checked if flag else Qt.Unchecked)  # type: ignore[attr-defined]
             self.flag_widget.addItem(item)  # type: ignore[union-attr]
 
-    def saveLabels(self, filename):
+    def _getSaveLabelsFunc(self, filename: str) -> tuple[LabelFile, Callable[[], None]]:
+        """Take the annotations now, and return a function saving them.
+
+        The function may run in a worker thread. Masks are encoded there.
+        """
         lf = LabelFile()
 
         def format_shape(s):
@@ -1413,10 +1874,8 @@ class MainWindow(QtWidgets.QMainWindow):
                     group_id=s.group_id,
                     description=s.description,
                     shape_type=s.shape_type,
-                    flags=s.flags,
-                    mask=None
-                    if s.mask is None
-                    else utils.img_arr_to_b64(s.mask.astype(np.uint8)),
+                    flags=None if s.flags is None else dict(s.flags),
+                    mask=None if s.mask is None else s,
                 )
             )
             return data
@@ -1428,9 +1887,16 @@ class MainWindow(QtWidgets.QMainWindow):
             key = item.text()  # type: ignore[union-attr]
             flag = item.checkState() == Qt.Checked  # type: ignore[attr-defined,union-attr]
             flags[key] = flag
-        try:
-            imagePath = osp.relpath(self.imagePath, osp.dirname(filename))  # type: ignore[arg-type]
-            imageData = self.imageData if self._config["store_data"] else None
+        imagePath = osp.relpath(self.imagePath, osp.dirname(filename))  # type: ignore[arg-type]
+        imageData = self.imageData if self._config["store_data"] else None
+        imageHeight = self.image.height()
+        imageWidth = self.image.width()
+        otherData = None if self.otherData is None else dict(self.otherData)
+
+        def save() -> None:
+            for shape in shapes:
+                if shape["mask"] is not None:
+                    shape["mask"] = shape["mask"].getMaskBase64()
             if osp.dirname(filename) and not osp.exists(osp.dirname(filename)):
                 os.makedirs(osp.dirname(filename))
             lf.save(
@@ -1438,17 +1904,22 @@ class MainWindow(QtWidgets.QMainWindow):
                 shapes=shapes,
                 imagePath=imagePath,
                 imageData=imageData,
-                imageHeight=self.image.height(),
-                imageWidth=self.image.width(),
-                otherData=self.otherData,
+                imageHeight=imageHeight,
+                imageWidth=imageWidth,
+                otherData=otherData,
                 flags=flags,
             )
+
+        return lf, save
+
+    def saveLabels(self, filename):
+        # Don't let a pending autosave overwrite this one.
+        self._flushAutosave()
+        lf, save = self._getSaveLabelsFunc(filename)
+        try:
+            save()
             self.labelFile = lf
-            items = self.fileListWidget.findItems(self.imagePath, Qt.MatchExactly)  # type: ignore[arg-type,attr-defined]
-            if len(items) > 0:
-                if len(items) != 1:
-                    raise RuntimeError("There are duplicate files.")
-                items[0].setCheckState(Qt.Checked)  # type: ignore[attr-defined]
+            self.fileListWidget.setChecked(self.imagePath, True)
             # disable allows next and previous image to proceed
             # self.filename = filename
             return True
@@ -1458,6 +1929,62 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             return False
 
+    def _submitAutosave(self) -> None:
+        self._autosave_timer.stop()
+        if self.imagePath is None:
+            return
+        label_file = osp.splitext(self.imagePath)[0] + ".json"
+        if self.output_dir:
+            label_file_without_path = osp.basename(label_file)
+            label_file = osp.join(self.output_dir, label_file_without_path)
+        lf, save = self._getSaveLabelsFunc(label_file)
+        with self._autosave_lock:
+            self._autosave_jobs[label_file] = (self.imagePath, lf, save)
+        self._autosave_future = self._autosave_executor.submit(
+            self._run_autosave, label_file=label_file
+        )
+
+    def _run_autosave(self, label_file: str) -> None:
+        # This runs in the worker thread.
+        with self._autosave_lock:
+            job = self._autosave_jobs.pop(label_file, None)
+        if job is None:
+            return  # already saved by an earlier run
+        image_path, lf, save = job
+        error: Optional[Exception] = None
+        try:
+            with _instrumentation.measure("autosave.write"):
+                save()
+        except Exception as e:
+            error = e
+        with self._autosave_lock:
+            self._autosave_results.append((label_file, image_path, lf, error))
+        self._labelsAutosaved.emit()
+
+    def _flushAutosave(self) -> None:
+        """Save pending edits now, and wait until all are written."""
+        if self._autosave_timer.isActive():
+            self._submitAutosave()
+        if self._autosave_future is not None:
+            self._autosave_future.result()
+            self._autosave_future = None
+        self._reportAutosaveResults()
+
+    def _reportAutosaveResults(self) -> None:
+        with self._autosave_lock:
+            results = self._autosave_results
+            self._autosave_results = []
+        for label_file, image_path, lf, error in results:
+            if error is not None:
+                logger.error("Failed to save {!r}: {}", label_file, error)
+                self.errorMessage(
+                    self.tr("Error saving label data"), self.tr("<b>%s</b>") % error
+                )
+                continue
+            self.fileListWidget.setChecked(image_path, True)
+            if image_path == self.imagePath:
+                self.labelFile = lf
+
     def duplicateSelectedShape(self):
         self.copySelectedShape()
         self.pasteSelectedShape()
@@ -1592,26 +2119,39 @@ class MainWindow(QtWidgets.QMainWindow):
         self.zoomMode = self.FIT_WIDTH if value else self.MANUAL_ZOOM
         self.adjustScale()
 
+    def setFileThumbnailsVisible(self, visible):
+        self._config["file_thumbnails"]["show"] = visible
+        self.fileListWidget.setThumbnailLoader(
+            self._thumbnail_loader if visible else None,
+            size=self._config["file_thumbnails"]["size"],
+        )
+
     def enableKeepPrevScale(self, enabled):
         self._config["keep_prev_scale"] = enabled
         self.actions.keepPrevScale.setChecked(enabled)  # type: ignore[attr-defined]
 
     def onNewBrightnessContrast(self, qimage):
-        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(qimage), clear_shapes=False)
+        # The image is downscaled while a slider is dragged.
+        self.canvas.loadPixmap(qimage, clear_shapes=False, size=self.image.size())
+
+    def _getBrightnessContrastDialog(self) -> BrightnessContrastDialog:
+        # One dialog is kept and pointed at the current image.
+        if self._brightnessContrastDialog is None:
+            self._brightnessContrastDialog = BrightnessContrastDialog(
+                self.image,
+                self.onNewBrightnessContrast,
+                parent=self,
+            )
+        elif self._brightnessContrastDialog.img is not self.image:
+            self._brightnessContrastDialog.setImage(self.image)
+        return self._brightnessContrastDialog
 
     def brightnessContrast(self, value):
-        dialog = BrightnessContrastDialog(
-            utils.img_data_to_pil(self.imageData),
-            self.onNewBrightnessContrast,
-            parent=self,
-        )
+        dialog = self._getBrightnessContrastDialog()
         brightness, contrast = self.brightnessContrast_values.get(
             self.filename, (None, None)
         )
-        if brightness is not None:
-            dialog.slider_brightness.setValue(brightness)
-        if contrast is not None:
-            dialog.slider_contrast.setValue(contrast)
+        dialog.setValues(brightness, contrast)
         dialog.exec_()
 
         brightness = dialog.slider_brightness.value()
@@ -1626,17 +2166,27 @@ class MainWindow(QtWidgets.QMainWindow):
             item.setCheckState(Qt.Checked if flag else Qt.Unchecked)  # type: ignore[attr-defined]
 
     def loadFile(self, filename=None):
-        """Load the specified file, or the last opened file if None."""
+        """Load the specified file, or the last opened file if None.
+
+        The file is read and decoded in a worker thread, and shown by
+        _applyLoadedFile() once ready. Loading another file before that
+        discards the pending one.
+        """
         # changing fileListWidget loads file
-        if filename in self.imageList and (
-            self.fileListWidget.currentRow() != self.imageList.index(filename)
-        ):
-            self.fileListWidget.setCurrentRow(self.imageList.index(filename))
+        row = self.fileListWidget.row(filename)
+        if row >= 0 and self.fileListWidget.currentRow() != row:
+            self.fileListWidget.setCurrentRow(row)
             self.fileListWidget.repaint()
             return
 
+        # keep_prev may be toggled only for the duration of this call.
+        keep_prev = self._config["keep_prev"]
+        prev_shapes = self.canvas.shapes
+
         self.resetState()
         self.canvas.setEnabled(False)
+        # Until _applyLoadedFile() shows the image.
+        self.toggleActions(False)
         if filename is None:
             filename = self.settings.value("filename", "")
         filename = str(filename)
@@ -1648,38 +2198,69 @@ class MainWindow(QtWidgets.QMainWindow):
             return False
         # assumes same name, but json extension
         self.status(str(self.tr("Loading %s...")) % osp.basename(str(filename)))
-        label_file = osp.splitext(filename)[0] + ".json"
-        if self.output_dir:
-            label_file_without_path = osp.basename(label_file)
-            label_file = osp.join(self.output_dir, label_file_without_path)
-        if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(label_file):
-            try:
-                self.labelFile = LabelFile(label_file)
-            except LabelFileError as e:
-                self.errorMessage(
-                    self.tr("Error opening file"),
-                    self.tr(
-                        "<p><b>%s</b></p>"
-                        "<p>Make sure <i>%s</i> is a valid label file."
-                    )
-                    % (e, label_file),
+        # Set right away, so that next/prev image work while it's loading.
+        self.filename = filename
+
+        self._load_file_request_id += 1
+        self._load_file_context = (time.perf_counter(), keep_prev, prev_shapes)
+        if self._load_file_future is not None:
+            self._load_file_future.cancel()
+            self._load_file_future = None
+
+        file_data = self._popPrefetchedFile(filename)
+        if file_data is not None:
+            self._applyLoadedFile(self._load_file_request_id, file_data)
+            return True
+
+        self._load_file_future = self._load_file_executor.submit(
+            self._run_load_file,
+            request_id=self._load_file_request_id,
+            filename=filename,
+            output_dir=self.output_dir,
+        )
+        return True
+
+    def _run_load_file(
+        self, request_id: int, filename: str, output_dir: Optional[str]
+    ) -> None:
+        # This runs in the worker thread.
+        if request_id != self._load_file_request_id:
+            return
+        file_data = _read_file(filename, output_dir=output_dir)
+        try:
+            self._fileLoaded.emit(request_id, file_data)
+        except RuntimeError:
+            pass  # the window is already deleted
+
+    def _applyLoadedFile(self, request_id: int, file_data: _FileData) -> None:
+        if request_id != self._load_file_request_id:
+            return  # superseded by a later loadFile()
+        self._load_file_future = None
+        t_start, keep_prev, prev_shapes = self._load_file_context
+        filename = file_data.filename
+
+        if file_data.labelFileError is not None:
+            self.filename = None
+            self.errorMessage(
+                self.tr("Error opening file"),
+                self.tr(
+                    "<p><b>%s</b></p>"
+                    "<p>Make sure <i>%s</i> is a valid label file."
                 )
-                self.status(self.tr("Error reading %s") % label_file)
-                return False
-            self.imageData = self.labelFile.imageData
-            self.imagePath = osp.join(
-                osp.dirname(label_file),
-                self.labelFile.imagePath,  # type: ignore[arg-type]
+                % (file_data.labelFileError, file_data.label_file),
             )
+            self.status(self.tr("Error reading %s") % file_data.label_file)
+            return
+        self.labelFile = file_data.labelFile
+        self.imageData = file_data.imageData
+        self.imagePath = file_data.imagePath
+        if self.labelFile:
             self.otherData = self.labelFile.otherData
-        else:
-            self.imageData = LabelFile.load_image_file(filename)
-            if self.imageData:
-                self.imagePath = filename
-            self.labelFile = None
-        image = QtGui.QImage.fromData(self.imageData)  # type: ignore[arg-type]
+        image = file_data.image
+        t_decode = time.perf_counter()
 
         if image.isNull():
+            self.filename = None
             formats = [
                 "*.{}".format(fmt.data().decode())
                 for fmt in QtGui.QImageReader.supportedImageFormats()
@@ -1692,19 +2273,20 @@ class MainWindow(QtWidgets.QMainWindow):
                 ).format(filename, ",".join(formats)),
             )
             self.status(self.tr("Error reading %s") % filename)
-            return False
+            return
         self.image = image
         self.filename = filename
-        if self._config["keep_prev"]:
-            prev_shapes = self.canvas.shapes
-        self.canvas.loadPixmap(QtGui.QPixmap.fromImage(image))
+        self.canvas.loadPixmap(image)
         flags = {k: False for k in self._config["flags"] or []}
         if self.labelFile:
             self.loadLabels(self.labelFile.shapes)
             if self.labelFile.flags is not None:
                 flags.update(self.labelFile.flags)
         self.loadFlags(flags)
-        if self._config["keep_prev"] and self.noShapes():
+        _instrumentation.record(
+            "load_file.shapes", seconds=time.perf_counter() - t_decode
+        )
+        if keep_prev and self.noShapes():
             self.loadShapes(prev_shapes, replace=False)
             self.setDirty()
         else:
@@ -1724,11 +2306,6 @@ class MainWindow(QtWidgets.QMainWindow):
                     orientation, self.scroll_values[orientation][self.filename]
                 )
         # set brightness contrast values
-        dialog = BrightnessContrastDialog(
-            utils.img_data_to_pil(self.imageData),
-            self.onNewBrightnessContrast,
-            parent=self,
-        )
         brightness, contrast = self.brightnessContrast_values.get(
             self.filename, (None, None)
         )
@@ -1740,19 +2317,95 @@ class MainWindow(QtWidgets.QMainWindow):
             _, contrast = self.brightnessContrast_values.get(
                 self.recentFiles[0], (None, None)
             )
-        if brightness is not None:
-            dialog.slider_brightness.setValue(brightness)
-        if contrast is not None:
-            dialog.slider_contrast.setValue(contrast)
         self.brightnessContrast_values[self.filename] = (brightness, contrast)
         if brightness is not None or contrast is not None:
-            dialog.onNewValue(None)
+            self._getBrightnessContrastDialog().setValues(brightness, contrast)
         self.paintCanvas()
         self.addRecentFile(self.filename)
         self.toggleActions(True)
         self.canvas.setFocus()
+        # Files first, so that the embedding prefetch can use their images.
+        self._prefetchFiles()
+        self._prefetch_image_embeddings()
+        _instrumentation.record(
+            "load_file.total", seconds=time.perf_counter() - t_start
+        )
         self.status(str(self.tr("Loaded %s")) % osp.basename(str(filename)))
-        return True
+
+    def _popPrefetchedFile(self, filename: str) -> Optional[_FileData]:
+        with self._file_prefetch_lock:
+            file_data = self._file_prefetch_cache.pop((filename, self.output_dir), None)
+        if file_data is None or file_data.isModified():
+            return None
+        return file_data
+
+    def _getPrefetchedImage(
+        self, filename: str, output_dir: Optional[str]
+    ) -> QtGui.QImage:
+        """Image of the file, read ahead by _prefetchFiles() or else now.
+
+        The prefetched file is left in place for loadFile(). This may run in
+        a worker thread.
+        """
+        with self._file_prefetch_lock:
+            file_data = self._file_prefetch_cache.get((filename, output_dir))
+        if file_data is None or file_data.isModified():
+            file_data = _read_file(filename, output_dir=output_dir)
+        return file_data.image
+
+    def _prefetchFiles(self) -> None:
+        """Read the files around the current one, nearest first."""
+        count: int = self._config["file_prefetch"]["count"]
+        image_list: list[str] = self.imageList
+        filenames: list[str] = []
+        index: int = self.fileListWidget.row(self.filename)
+        if count > 0 and index >= 0:
+            for offset in range(1, count + 1):
+                for i in [index + offset, index - offset]:
+                    if 0 <= i < len(image_list):
+                        filenames.append(image_list[i])
+
+        keys = [(filename, self.output_dir) for filename in filenames]
+        with self._file_prefetch_lock:
+            self._file_prefetch_keys = set(keys)
+            for key in list(self._file_prefetch_cache):
+                if key not in self._file_prefetch_keys:
+                    del self._file_prefetch_cache[key]
+            keys = [
+                key
+                for key in keys
+                if key not in self._file_prefetch_cache
+                and key not in self._file_prefetch_pending
+            ]
+            self._file_prefetch_pending.update(keys)
+        for key in keys:
+            self._file_prefetch_executor.submit(self._run_prefetch_file, key=key)
+
+    def _run_prefetch_file(self, key: tuple[str, Optional[str]]) -> None:
+        # This runs in the worker thread.
+        try:
+            with self._file_prefetch_lock:
+                if key not in self._file_prefetch_keys:
+                    return
+            filename, output_dir = key
+            file_data = _read_file(filename, output_dir=output_dir)
+            if file_data.image.isNull():
+                return  # let loadFile() report the error
+
+            max_bytes = self._config["file_prefetch"]["memory_mb"] * 1024 * 1024
+            with self._file_prefetch_lock:
+                if key not in self._file_prefetch_keys:
+                    return
+                nbytes = sum(data.nbytes for data in self._file_prefetch_cache.values())
+                if nbytes + file_data.nbytes > max_bytes:
+                    logger.debug("Skipping prefetch of {!r} over budget", filename)
+                    return
+                self._file_prefetch_cache[key] = file_data
+        except Exception:
+            logger.exception("Failed to prefetch file: {!r}", key[0])
+        finally:
+            with self._file_prefetch_lock:
+                self._file_prefetch_pending.discard(key)
 
     def resizeEvent(self, event):
         if (
@@ -1804,6 +2457,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.settings.setValue("window/position", self.pos())
         self.settings.setValue("window/state", self.saveState())
         self.settings.setValue("recentFiles", self.recentFiles)
+        self._flushAutosave()
+        if event.isAccepted():
+            self._embedding_prefetch_stop.set()
+            if self._ai_annotate_job is not None:
+                self._ai_annotate_job.cancelled.set()
+            self._thumbnail_loader.clear()
+            self._dir_scan_request_id += 1
         # ask the use for where to save the labels
         # self.settings.setValue('window/geometry', self.saveGeometry())
 
@@ -1848,7 +2508,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.filename is None:
             return
 
-        currIndex = self.imageList.index(self.filename)
+        currIndex = self.fileListWidget.row(self.filename)
         if currIndex - 1 >= 0:
             filename = self.imageList[currIndex - 1]
             if filename:
@@ -1873,7 +2533,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.filename is None:
             filename = self.imageList[0]
         else:
-            currIndex = self.imageList.index(self.filename)
+            currIndex = self.fileListWidget.row(self.filename)
             if currIndex + 1 < len(self.imageList):
                 filename = self.imageList[currIndex + 1]
             else:
@@ -1896,7 +2556,7 @@ class MainWindow(QtWidgets.QMainWindow):
         filters = self.tr("Image & Label files (%s)") % " ".join(
             formats + ["*%s" % LabelFile.suffix]
         )
-        fileDialog = FileDialogPreview(self)
+        fileDialog = FileDialogPreview(self, thumbnail_loader=self._thumbnail_loader)
         fileDialog.setFileMode(FileDialogPreview.ExistingFile)
         fileDialog.setNameFilter(filters)
         fileDialog.setWindowTitle(
@@ -1936,13 +2596,8 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         self.statusBar().show()  # type: ignore[union-attr]
 
-        current_filename = self.filename
-        self.importDirImages(self.lastOpenDir, load=False)
-
-        if current_filename in self.imageList:
-            # retain currently selected file
-            self.fileListWidget.setCurrentRow(self.imageList.index(current_filename))
-            self.fileListWidget.repaint()
+        # retain currently selected file
+        self.importDirImages(self.lastOpenDir, load=False, filename=self.filename)
 
     def saveFile(self, _value=False):
         assert not self.image.isNull(), "cannot save empty image"
@@ -2020,13 +2675,13 @@ class MainWindow(QtWidgets.QMainWindow):
         if answer != mb.Yes:
             return
 
+        self._flushAutosave()
         label_file = self.getLabelFile()
         if osp.exists(label_file):
             os.remove(label_file)
             logger.info("Label file is removed: {}".format(label_file))
 
-            item = self.fileListWidget.currentItem()
-            item.setCheckState(Qt.Unchecked)  # type: ignore[attr-defined,union-attr]
+            self.fileListWidget.setChecked(self.filename, False)
 
             self.resetState()
 
@@ -2137,11 +2792,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
     @property
     def imageList(self):
-        lst = []
-        for i in range(self.fileListWidget.count()):
-            item = self.fileListWidget.item(i)
-            lst.append(item.text())  # type: ignore[union-attr]
-        return lst
+        # Not a copy, so it must not be modified.
+        return self.fileListWidget.filenames()
 
     def importDroppedImageFiles(self, imageFiles):
         extensions = [
@@ -2150,20 +2802,15 @@ class MainWindow(QtWidgets.QMainWindow):
         ]
 
         self.filename = None
-        for file in imageFiles:
-            if file in self.imageList or not file.lower().endswith(tuple(extensions)):
-                continue
-            label_file = osp.splitext(file)[0] + ".json"
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            item = QtWidgets.QListWidgetItem(file)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)  # type: ignore[attr-defined]
-            if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(label_file):
-                item.setCheckState(Qt.Checked)  # type: ignore[attr-defined]
-            else:
-                item.setCheckState(Qt.Unchecked)  # type: ignore[attr-defined]
-            self.fileListWidget.addItem(item)
+        filenames = [
+            file
+            for file in imageFiles
+            if self.fileListWidget.row(file) < 0
+            and file.lower().endswith(tuple(extensions))
+        ]
+        self.fileListWidget.addFiles(
+            filenames, checked=_has_label_files(filenames, output_dir=self.output_dir)
+        )
 
         if len(self.imageList) > 1:
             self.actions.openNextImg.setEnabled(True)  # type: ignore[attr-defined]
@@ -2171,7 +2818,14 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.openNextImg()
 
-    def importDirImages(self, dirpath, pattern=None, load=True):
+    def importDirImages(self, dirpath, pattern=None, load=True, filename=None):
+        """Scan the directory in the background and list its images.
+
+        Once its row appears, ``filename`` is selected and so loaded. Without
+        one, or if it isn't found, the first image in sorted order is opened
+        as in :meth:`openNextImg` once the scan is done, unless a file was
+        opened meanwhile.
+        """
         self.actions.openNextImg.setEnabled(True)  # type: ignore[attr-defined]
         self.actions.openPrevImg.setEnabled(True)  # type: ignore[attr-defined]
 
@@ -2182,37 +2836,112 @@ class MainWindow(QtWidgets.QMainWindow):
         self.filename = None
         self.fileListWidget.clear()
 
-        filenames = self.scanAllImages(dirpath)
+        self._dir_scan_request_id += 1
+        self._dir_scan_target = filename
+        self._dir_scan_load = load
+        extensions = tuple(
+            ".%s" % fmt.data().decode().lower()
+            for fmt in QtGui.QImageReader.supportedImageFormats()
+        )
+        self.status(str(self.tr("Scanning %s...")) % dirpath)
+        self._dir_scan_executor.submit(
+            self._run_dir_scan,
+            request_id=self._dir_scan_request_id,
+            dirpath=dirpath,
+            pattern=pattern,
+            extensions=extensions,
+            output_dir=self.output_dir,
+        )
+
+    def _run_dir_scan(
+        self,
+        request_id: int,
+        dirpath: str,
+        pattern: Optional[str],
+        extensions: tuple[str, ...],
+        output_dir: Optional[str],
+    ) -> None:
+        # This runs in the worker thread, and stops once a newer scan starts.
+        import natsort
+
+        regex: Optional[re.Pattern] = None
         if pattern:
             try:
-                filenames = [f for f in filenames if re.search(pattern, f)]
+                regex = re.compile(pattern)
             except re.error:
                 pass
-        for filename in filenames:
-            label_file = osp.splitext(filename)[0] + ".json"
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = osp.join(self.output_dir, label_file_without_path)
-            item = QtWidgets.QListWidgetItem(filename)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)  # type: ignore[attr-defined]
-            if QtCore.QFile.exists(label_file) and LabelFile.is_label_file(label_file):
-                item.setCheckState(Qt.Checked)  # type: ignore[attr-defined]
-            else:
-                item.setCheckState(Qt.Unchecked)  # type: ignore[attr-defined]
-            self.fileListWidget.addItem(item)
-        self.openNextImg(load=load)
+
+        sort_key = natsort.os_sort_keygen()
+        names_by_dir: dict[str, set[str]] = {}
+        filenames: list[str] = []
+        sort_keys: list = []
+
+        def emit(done: bool) -> None:
+            checked = _has_label_files(
+                filenames, output_dir=output_dir, names_by_dir=names_by_dir
+            )
+            self._filesScanned.emit(request_id, (filenames, checked, sort_keys), done)
+
+        try:
+            # Show the first files right away, then merge batches at least as
+            # large as the list so far, as every merge copies the whole list.
+            interval = 0.1
+            t_emit = time.monotonic()
+            num_emitted = 0
+            for filename in _iter_image_files(dirpath, extensions=extensions):
+                if request_id != self._dir_scan_request_id:
+                    return
+                if regex is not None and not regex.search(filename):
+                    continue
+                filenames.append(filename)
+                # Natural sort keys are slow to compute, so the list keeps them.
+                sort_keys.append(sort_key(filename))
+                if (
+                    len(filenames) >= num_emitted
+                    and time.monotonic() - t_emit >= interval
+                ):
+                    emit(done=False)
+                    num_emitted += len(filenames)
+                    filenames = []
+                    sort_keys = []
+                    interval = min(interval * 2, 1.0)
+                    t_emit = time.monotonic()
+        except Exception:
+            logger.exception("Failed to scan directory: {!r}", dirpath)
+        if request_id == self._dir_scan_request_id:
+            emit(done=True)
+
+    def _addScannedFiles(self, request_id: int, batch, done: bool) -> None:
+        if request_id != self._dir_scan_request_id:
+            return  # the scan was replaced by a newer one
+
+        filenames, checked, sort_keys = batch
+        self.fileListWidget.addFiles(filenames, checked=checked, sort_keys=sort_keys)
+
+        if self.filename is not None:
+            # A file was opened while scanning, so leave it be.
+            self._dir_scan_target = None
+        elif self._dir_scan_target is not None:
+            row = self.fileListWidget.row(self._dir_scan_target)
+            if row >= 0:
+                self._dir_scan_target = None
+                self.fileListWidget.setCurrentRow(row)
+
+        if done:
+            self._dir_scan_target = None
+            if self.filename is None:
+                # The first image in sorted order is only known now.
+                self.openNextImg(load=self._dir_scan_load)
+            self.status(
+                str(self.tr("Found %d images in %s"))
+                % (self.fileListWidget.fileListModel().rowCount(), self.lastOpenDir)
+            )
 
     def scanAllImages(self, folderPath):
-        extensions = [
+        import natsort
+
+        extensions = tuple(
             ".%s" % fmt.data().decode().lower()
             for fmt in QtGui.QImageReader.supportedImageFormats()
-        ]
-
-        images = []
-        for root, dirs, files in os.walk(folderPath):
-            for file in files:
-                if file.lower().endswith(tuple(extensions)):
-                    relativePath = os.path.normpath(osp.join(root, file))
-                    images.append(relativePath)
-        images = natsort.os_sorted(images)
-        return images
+        )
+        return natsort.os_sorted(_iter_image_files(folderPath, extensions=extensions))
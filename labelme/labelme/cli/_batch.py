@@ -0,0 +1,102 @@
+"""Helpers for running the command line tools over many files."""
+
+import concurrent.futures
+import glob
+import json
+import os.path as osp
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from loguru import logger
+
+
+def get_label_names(json_file: str) -> set[str]:
+    with open(json_file) as f:
+        data = json.load(f)
+    return {shape["label"] for shape in data["shapes"]}
+
+
+def _get_label_names_or_none(json_file: str) -> Optional[set[str]]:
+    try:
+        return get_label_names(json_file)
+    except Exception as e:
+        logger.debug("Failed to read {}: {}", json_file, e)
+        return None
+
+
+def collect_label_name_to_value(
+    executor: concurrent.futures.Executor, json_files: list[str]
+) -> dict[str, int]:
+    """One label table for all files, so that a label has the same value in each.
+
+    Files that can't be read are skipped here, to fail later on their own.
+    """
+    label_names: set[str] = set()
+    for names in executor.map(_get_label_names_or_none, json_files, chunksize=16):
+        label_names |= names or set()
+    return get_label_name_to_value(label_names)
+
+
+def get_label_name_to_value(label_names: set[str]) -> dict[str, int]:
+    label_name_to_value = {"_background_": 0}
+    for label_name in sorted(label_names):
+        if label_name not in label_name_to_value:
+            label_name_to_value[label_name] = len(label_name_to_value)
+    return label_name_to_value
+
+
+def expand_inputs(inputs: list[str], suffix: str) -> list[str]:
+    """Files given as paths, glob patterns, or directories searched for suffix.
+
+    The order is kept, without duplicates, and directories and patterns are
+    sorted within.
+    """
+    filenames: dict[str, None] = {}
+    for input_ in inputs:
+        if osp.isdir(input_):
+            matches = glob.glob(osp.join(input_, "**", "*" + suffix), recursive=True)
+        elif glob.has_magic(input_):
+            matches = [f for f in glob.glob(input_, recursive=True) if osp.isfile(f)]
+        elif osp.isfile(input_):
+            matches = [input_]
+        else:
+            matches = []
+        if not matches:
+            logger.warning("No files matched: {}", input_)
+        filenames.update((filename, None) for filename in sorted(matches))
+    return list(filenames)
+
+
+def get_out_files(filenames: list[str], out_dir: str, ext: str) -> list[str]:
+    """Output file per input, keeping the layout below their common directory."""
+    root = osp.commonpath([osp.dirname(osp.abspath(f)) for f in filenames])
+    return [
+        osp.join(out_dir, osp.splitext(osp.relpath(osp.abspath(f), root))[0] + ext)
+        for f in filenames
+    ]
+
+
+def run_all(
+    executor: concurrent.futures.Executor,
+    func: Callable[..., Any],
+    kwargs_by_filename: dict[str, dict[str, Any]],
+) -> int:
+    """Call func with the kwargs of each input file, returning the failures.
+
+    A failed call is logged and does not stop the others.
+    """
+    futures = {
+        executor.submit(func, **kwargs): filename
+        for filename, kwargs in kwargs_by_filename.items()
+    }
+    num_failed = 0
+    for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+        try:
+            future.result()
+        except Exception as e:
+            logger.error("Failed on {}: {}", futures[future], e)
+            num_failed += 1
+        if i % 100 == 0 or i == len(futures):
+            logger.info("Processed {}/{} files", i, len(futures))
+    return num_failed
@@ -1,30 +1,28 @@
 #!/usr/bin/env python
 
 import argparse
+import concurrent.futures
+import os
+import os.path as osp
+import sys
 
 import imgviz
-import matplotlib.pyplot as plt
+import numpy as np
+import numpy.typing as npt
+import PIL.Image
+from loguru import logger
 
 from labelme import utils
+from labelme.cli import _batch
 from labelme.label_file import LabelFile
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("json_file")
-    args = parser.parse_args()
-
-    label_file = LabelFile(args.json_file)
+def _draw(
+    json_file: str, label_name_to_value: dict[str, int]
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
+    label_file = LabelFile(json_file)
     img = utils.img_data_to_arr(label_file.imageData)
 
-    label_name_to_value = {"_background_": 0}
-    for shape in sorted(label_file.shapes, key=lambda x: x["label"]):
-        label_name = shape["label"]
-        if label_name in label_name_to_value:
-            label_value = label_name_to_value[label_name]
-        else:
-            label_value = len(label_name_to_value)
-            label_name_to_value[label_name] = label_value
     lbl, _ = utils.shapes_to_label(img.shape, label_file.shapes, label_name_to_value)
 
     label_names = [None] * (max(label_name_to_value.values()) + 1)
@@ -37,12 +35,94 @@ def main():
         font_size=30,
         loc="rb",
     )
+    return img, lbl_viz
+
+
+def _save(json_file: str, out_file: str, label_name_to_value: dict[str, int]) -> None:
+    img, lbl_viz = _draw(json_file, label_name_to_value=label_name_to_value)
+    viz = imgviz.tile([imgviz.asrgb(img), lbl_viz], row=1, col=2, border=(0, 0, 0))
+
+    os.makedirs(osp.dirname(out_file), exist_ok=True)
+    PIL.Image.fromarray(viz).save(out_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "json_file",
+        nargs="+",
+        help="label files, glob patterns, or directories of label files",
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        default=None,
+        help="directory to save the drawings to instead of showing them",
+    )
+    parser.add_argument(
+        "--ext",
+        default=".jpg",
+        choices=[".jpg", ".png"],
+        help="file extension of the saved drawings",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes to save with, defaults to the number of CPUs",
+    )
+    args = parser.parse_args()
+
+    json_files = _batch.expand_inputs(args.json_file, suffix=LabelFile.suffix)
+    if not json_files:
+        logger.error("No label files found in: {}", args.json_file)
+        sys.exit(1)
+
+    if args.out is None:
+        if len(json_files) > 1:
+            parser.error("--out is required to draw more than one label file")
+
+        img, lbl_viz = _draw(
+            json_files[0],
+            label_name_to_value=_batch.get_label_name_to_value(
+                _batch.get_label_names(json_files[0])
+            ),
+        )
+
+        # Only needed to show the result, and slow to import.
+        import matplotlib.pyplot as plt
+
+        plt.subplot(121)
+        plt.imshow(img)
+        plt.subplot(122)
+        plt.imshow(lbl_viz)
+        plt.show()
+        return
+
+    out_files = _batch.get_out_files(json_files, out_dir=args.out, ext=args.ext)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        label_name_to_value = _batch.collect_label_name_to_value(executor, json_files)
+        logger.info("Label names: {}", list(label_name_to_value))
+
+        num_failed = _batch.run_all(
+            executor,
+            _save,
+            {
+                json_file: dict(
+                    json_file=json_file,
+                    out_file=out_file,
+                    label_name_to_value=label_name_to_value,
+                )
+                for json_file, out_file in zip(json_files, out_files)
+            },
+        )
 
-    plt.subplot(121)
-    plt.imshow(img)
-    plt.subplot(122)
-    plt.imshow(lbl_viz)
-    plt.show()
+    logger.info("Saved to: {} (failed={})", args.out, num_failed)
+    if num_failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,23 +1,102 @@
 import argparse
+import concurrent.futures
 import os
+import os.path as osp
+import sys
+from typing import Optional
 
 import imgviz
-import matplotlib.pyplot as plt
 import numpy as np
+import numpy.typing as npt
+import PIL.Image
 from loguru import logger
 
+from labelme.cli import _batch
+
+
+def _read_label(label_png: str) -> npt.NDArray[np.int32]:
+    label = imgviz.io.imread(label_png)
+    label = label.astype(np.int32)
+    label[label == 255] = -1
+    return label
+
+
+def _draw(
+    label: npt.NDArray[np.int32],
+    label_names: Optional[list[str]],
+    image: Optional[npt.NDArray[np.uint8]],
+) -> list[npt.NDArray[np.uint8]]:
+    vizs = [
+        imgviz.label2rgb(
+            label=label, label_names=label_names, font_size=label.shape[1] // 30
+        )
+    ]
+    if image is not None:
+        vizs.append(
+            imgviz.label2rgb(
+                label=label,
+                image=image,
+                label_names=label_names,
+                font_size=label.shape[1] // 30,
+            )
+        )
+    return vizs
+
+
+def _save(
+    label_png: str,
+    out_file: str,
+    label_names: Optional[list[str]],
+    image_file: Optional[str],
+) -> None:
+    label = _read_label(label_png)
+    image = imgviz.io.imread(image_file) if image_file is not None else None
+    vizs = _draw(label, label_names=label_names, image=image)
+    viz = imgviz.tile(vizs, row=1, col=len(vizs), border=(0, 0, 0))
+
+    os.makedirs(osp.dirname(out_file), exist_ok=True)
+    PIL.Image.fromarray(viz).save(out_file)
+
 
 def main():
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("label_png", help="label PNG file")
+    parser.add_argument(
+        "label_png",
+        nargs="+",
+        help="label PNG files, glob patterns, or directories of label.png files",
+    )
     parser.add_argument(
         "--labels",
         help="labels list (comma separated text or file)",
         default=None,
     )
     parser.add_argument("--image", help="image file", default=None)
+    parser.add_argument(
+        "--image-name",
+        default=None,
+        help="file name of the image beside each label PNG, e.g. img.png",
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        default=None,
+        help="directory to save the drawings to instead of showing them",
+    )
+    parser.add_argument(
+        "--ext",
+        default=".jpg",
+        choices=[".jpg", ".png"],
+        help="file extension of the saved drawings",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes to save with, defaults to the number of CPUs",
+    )
     args = parser.parse_args()
 
     if args.labels is not None:
@@ -29,14 +108,59 @@ def main():
     else:
         label_names = None
 
+    label_pngs = _batch.expand_inputs(args.label_png, suffix="label.png")
+    if not label_pngs:
+        logger.error("No label PNG files found in: {}", args.label_png)
+        sys.exit(1)
+    if args.image is not None and len(label_pngs) > 1:
+        parser.error("--image is for one label PNG, use --image-name for more")
+
+    image_files: list[Optional[str]]
     if args.image is not None:
-        image = imgviz.io.imread(args.image)
+        image_files = [args.image]
+    elif args.image_name is not None:
+        image_files = [
+            osp.join(osp.dirname(label_png), args.image_name)
+            for label_png in label_pngs
+        ]
+    else:
+        image_files = [None] * len(label_pngs)
+
+    if args.out is not None:
+        out_files = _batch.get_out_files(label_pngs, out_dir=args.out, ext=args.ext)
+        # The colors are those of the label values, so they're the same in each.
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            num_failed = _batch.run_all(
+                executor,
+                _save,
+                {
+                    label_png: dict(
+                        label_png=label_png,
+                        out_file=out_file,
+                        label_names=label_names,
+                        image_file=image_file,
+                    )
+                    for label_png, out_file, image_file in zip(
+                        label_pngs, out_files, image_files
+                    )
+                },
+            )
+        logger.info("Saved to: {} (failed={})", args.out, num_failed)
+        if num_failed:
+            sys.exit(1)
+        return
+
+    if len(label_pngs) > 1:
+        parser.error("--out is required to draw more than one label PNG")
+    label_png = label_pngs[0]
+    image_file = image_files[0]
+
+    if image_file is not None:
+        image = imgviz.io.imread(image_file)
     else:
         image = None
 
-    label = imgviz.io.imread(args.label_png)
-    label = label.astype(np.int32)
-    label[label == 255] = -1
+    label = _read_label(label_png)
 
     unique_label_values = np.unique(label)
 
@@ -52,30 +176,21 @@ def main():
             )
         )
 
-    if args.image:
-        num_cols = 2
-    else:
-        num_cols = 1
+    vizs = _draw(label, label_names=label_names, image=image)
 
-    plt.figure(figsize=(num_cols * 6, 5))
+    # Only needed to show the result, and slow to import.
+    import matplotlib.pyplot as plt
 
-    plt.subplot(1, num_cols, 1)
-    plt.title(args.label_png)
-    label_viz = imgviz.label2rgb(
-        label=label, label_names=label_names, font_size=label.shape[1] // 30
-    )
-    plt.imshow(label_viz)
+    plt.figure(figsize=(len(vizs) * 6, 5))
+
+    plt.subplot(1, len(vizs), 1)
+    plt.title(label_png)
+    plt.imshow(vizs[0])
 
     if image is not None:
-        plt.subplot(1, num_cols, 2)
-        label_viz_with_overlay = imgviz.label2rgb(
-            label=label,
-            image=image,
-            label_names=label_names,
-            font_size=label.shape[1] // 30,
-        )
-        plt.title("{}\n{}".format(args.label_png, args.image))
-        plt.imshow(label_viz_with_overlay)
+        plt.subplot(1, len(vizs), 2)
+        plt.title("{}\n{}".format(label_png, image_file))
+        plt.imshow(vizs[1])
 
     plt.tight_layout()
     plt.show()
@@ -1,6 +1,11 @@
 import argparse
+import concurrent.futures
+import glob
+import json
 import os
 import os.path as osp
+import sys
+from typing import Optional
 
 import imgviz
 import numpy as np
@@ -9,54 +14,207 @@ import PIL.Image
 from loguru import logger
 
 from labelme import utils
+from labelme.cli import _batch
 from labelme.label_file import LabelFile
 
+_OUTPUT_FILENAMES = ["img.png", "label.png", "label_viz.png", "label_names.txt"]
+
+
+def _is_up_to_date(json_file: str, out_dir: str, label_names: list[str]) -> bool:
+    # Outputs newer than the label file and the image it refers to, made with
+    # the same label names.
+    try:
+        mtime = min(
+            os.stat(osp.join(out_dir, filename)).st_mtime
+            for filename in _OUTPUT_FILENAMES
+        )
+        with open(osp.join(out_dir, "label_names.txt")) as f:
+            existing_label_names = f.read().splitlines()
+        if existing_label_names != label_names:
+            return False
+        if mtime < os.stat(json_file).st_mtime:
+            return False
+        with open(json_file) as f:
+            data = json.load(f)
+        if data.get("imageData") is None:
+            image_path = osp.join(osp.dirname(json_file), data["imagePath"])
+            if mtime < os.stat(image_path).st_mtime:
+                return False
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
+
+
+def _export(
+    json_file: str,
+    out_dir: str,
+    label_name_to_value: Optional[dict[str, int]],
+    compress_level: int,
+    skip_up_to_date: bool = False,
+) -> bool:
+    """Export the label file, returning False if skipped as up to date.
+
+    Without ``label_name_to_value``, the labels of the file are numbered alone.
+    """
+    label_file: Optional[LabelFile] = None
+    if label_name_to_value is None:
+        label_file = LabelFile(filename=json_file)
+        label_name_to_value = _batch.get_label_name_to_value(
+            {shape["label"] for shape in label_file.shapes}
+        )
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("json_file")
-    parser.add_argument("-o", "--out", default=None)
-    args = parser.parse_args()
+    label_names = [None] * (max(label_name_to_value.values()) + 1)
+    for name, value in label_name_to_value.items():
+        label_names[value] = name  # type: ignore[call-overload]
 
-    json_file = args.json_file
+    if skip_up_to_date and _is_up_to_date(
+        json_file,
+        out_dir=out_dir,
+        label_names=label_names,  # type: ignore[arg-type]
+    ):
+        return False
 
-    if args.out is None:
-        out_dir = osp.splitext(osp.basename(json_file))[0]
-        out_dir = osp.join(osp.dirname(json_file), out_dir)
-    else:
-        out_dir = args.out
-    if not osp.exists(out_dir):
-        os.mkdir(out_dir)
-
-    label_file: LabelFile = LabelFile(filename=json_file)
+    if label_file is None:
+        label_file = LabelFile(filename=json_file)
 
     image: npt.NDArray[np.uint8] = utils.img_data_to_arr(label_file.imageData)
 
-    label_name_to_value = {"_background_": 0}
-    for shape in sorted(label_file.shapes, key=lambda x: x["label"]):
-        label_name = shape["label"]
-        if label_name in label_name_to_value:
-            label_value = label_name_to_value[label_name]
-        else:
-            label_value = len(label_name_to_value)
-            label_name_to_value[label_name] = label_value
     lbl, _ = utils.shapes_to_label(image.shape, label_file.shapes, label_name_to_value)
 
-    label_names = [None] * (max(label_name_to_value.values()) + 1)
-    for name, value in label_name_to_value.items():
-        label_names[value] = name  # type: ignore[call-overload]
-
     lbl_viz = imgviz.label2rgb(
         lbl, imgviz.asgray(image), label_names=label_names, loc="rb"
     )
 
-    PIL.Image.fromarray(image).save(osp.join(out_dir, "img.png"))
-    utils.lblsave(osp.join(out_dir, "label.png"), lbl)
-    PIL.Image.fromarray(lbl_viz).save(osp.join(out_dir, "label_viz.png"))
+    os.makedirs(out_dir, exist_ok=True)
+    PIL.Image.fromarray(image).save(
+        osp.join(out_dir, "img.png"), compress_level=compress_level
+    )
+    utils.lblsave(osp.join(out_dir, "label.png"), lbl, compress_level=compress_level)
+    PIL.Image.fromarray(lbl_viz).save(
+        osp.join(out_dir, "label_viz.png"), compress_level=compress_level
+    )
 
+    # Written last, so that an interrupted export is not taken as up to date.
     with open(osp.join(out_dir, "label_names.txt"), "w") as f:
         for lbl_name in label_names:
             f.write(lbl_name + "\n")  # type: ignore[operator]
+    return True
+
+
+def _export_dir(
+    json_dir: str, out_dir: str, compress_level: int, num_workers: Optional[int]
+) -> tuple[int, int, int]:
+    """Export the label files under json_dir in worker processes.
+
+    Returns the numbers of files exported, skipped as up to date, and failed.
+    """
+    json_files = sorted(
+        glob.glob(osp.join(json_dir, "**", "*" + LabelFile.suffix), recursive=True)
+    )
+    if not json_files:
+        logger.error("No label files found in: {}", json_dir)
+        sys.exit(1)
+    logger.info("Found {} label files in: {}", len(json_files), json_dir)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+        label_name_to_value = _batch.collect_label_name_to_value(executor, json_files)
+        logger.info("Label names: {}", list(label_name_to_value))
+
+        futures = {
+            executor.submit(
+                _export,
+                json_file=json_file,
+                out_dir=osp.join(
+                    out_dir, osp.splitext(osp.relpath(json_file, json_dir))[0]
+                ),
+                label_name_to_value=label_name_to_value,
+                compress_level=compress_level,
+                skip_up_to_date=True,
+            ): json_file
+            for json_file in json_files
+        }
+        num_exported = num_skipped = num_failed = 0
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            try:
+                if future.result():
+                    num_exported += 1
+                else:
+                    num_skipped += 1
+            except Exception as e:
+                logger.error("Failed to export {}: {}", futures[future], e)
+                num_failed += 1
+            if i % 100 == 0 or i == len(futures):
+                logger.info("Processed {}/{} label files", i, len(futures))
+
+    with open(osp.join(out_dir, "label_names.txt"), "w") as f:
+        for label_name in label_name_to_value:
+            f.write(label_name + "\n")
+
+    logger.info(
+        "Saved to: {} (exported={}, up to date={}, failed={})",
+        out_dir,
+        num_exported,
+        num_skipped,
+        num_failed,
+    )
+    return num_exported, num_skipped, num_failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "json_file",
+        help="label file, or directory of label files to export each of",
+    )
+    parser.add_argument("-o", "--out", default=None)
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=6,
+        choices=range(10),
+        metavar="{0..9}",
+        help="PNG compression level, lower is faster and larger",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for a directory, defaults to the number of CPUs",
+    )
+    args = parser.parse_args()
+
+    json_file = args.json_file
+
+    if args.out is None:
+        out_dir = osp.splitext(osp.basename(osp.normpath(json_file)))[0]
+        if osp.isdir(json_file):
+            out_dir += "_export"
+        out_dir = osp.join(osp.dirname(osp.normpath(json_file)), out_dir)
+    else:
+        out_dir = args.out
+    if not osp.exists(out_dir):
+        os.mkdir(out_dir)
+
+    if osp.isdir(json_file):
+        _, _, num_failed = _export_dir(
+            json_dir=json_file,
+            out_dir=out_dir,
+            compress_level=args.compress_level,
+            num_workers=args.jobs,
+        )
+        if num_failed:
+            sys.exit(1)
+        return
+
+    _export(
+        json_file,
+        out_dir=out_dir,
+        label_name_to_value=None,
+        compress_level=args.compress_level,
+    )
 
     logger.info("Saved to: {}".format(out_dir))
 
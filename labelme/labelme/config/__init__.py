@@ -1,3 +1,4 @@
+import os
 import os.path as osp
 import shutil
 
@@ -7,6 +8,12 @@ from loguru import logger
 here = osp.dirname(osp.abspath(__file__))
 
 
+def get_cache_dir() -> str:
+    if os.name == "nt":
+        return osp.join(os.environ["LOCALAPPDATA"], "labelme")
+    return osp.expanduser("~/.cache/labelme")
+
+
 def update_dict(target_dict, new_dict, validate_item=None):
     for key, value in new_dict.items():
         if validate_item:
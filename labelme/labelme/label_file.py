@@ -104,6 +104,8 @@ class LabelFile(object):
                     mask=utils.img_b64_to_arr(s["mask"]).astype(bool)
                     if s.get("mask")
                     else None,
+                    # Kept so that an unchanged mask isn't encoded again on save.
+                    mask_base64=s.get("mask") or None,
                     other_data={k: v for k, v in s.items() if k not in shape_keys},
                 )
                 for s in data["shapes"]
@@ -1,7 +1,11 @@
 import copy
+import functools
+import types
+from typing import ClassVar
+from typing import Mapping
+from typing import Optional
 
 import numpy as np
-import skimage.measure
 from loguru import logger
 from PyQt5 import QtCore
 from PyQt5 import QtGui
@@ -12,6 +16,23 @@ import labelme.utils
 # - [opt] Store paths instead of creating new ones at each paint.
 
 
+@functools.lru_cache(maxsize=None)
+def get_shape_colors(r: int, g: int, b: int) -> tuple[QtGui.QColor, ...]:
+    """Colors of a shape of the RGB color, shared by all such shapes.
+
+    In the order of line_color, vertex_fill_color, hvertex_fill_color,
+    fill_color, select_line_color and select_fill_color.
+    """
+    return (
+        QtGui.QColor(r, g, b),  # line_color
+        QtGui.QColor(r, g, b),  # vertex_fill_color
+        QtGui.QColor(255, 255, 255),  # hvertex_fill_color
+        QtGui.QColor(r, g, b, 128),  # fill_color
+        QtGui.QColor(255, 255, 255),  # select_line_color
+        QtGui.QColor(r, g, b, 155),  # select_fill_color
+    )
+
+
 class Shape(object):
     # Render handles as squares
     P_SQUARE = 0
@@ -38,6 +59,17 @@ class Shape(object):
     point_size = 8
     scale = 1.0
 
+    # Vertex size factor and type by highlight mode, the same for all shapes,
+    # and read-only so that no shape can change it for the others.
+    _highlightSettings: ClassVar[Mapping[int, tuple[float, int]]] = (
+        types.MappingProxyType(
+            {
+                NEAR_VERTEX: (4, P_ROUND),
+                MOVE_VERTEX: (1.5, P_SQUARE),
+            }
+        )
+    )
+
     def __init__(
         self,
         label=None,
@@ -54,21 +86,16 @@ class Shape(object):
         self.point_labels = []
         self.shape_type = shape_type
         self._shape_raw = None
-        self._points_raw = []
-        self._shape_type_raw = None
         self.fill = False
         self.selected = False
         self.flags = flags
         self.description = description
         self.other_data = {}
+        self._mask_base64: Optional[tuple[np.ndarray, str]] = None
         self.mask = mask
 
         self._highlightIndex = None
         self._highlightMode = self.NEAR_VERTEX
-        self._highlightSettings = {
-            self.NEAR_VERTEX: (4, self.P_ROUND),
-            self.MOVE_VERTEX: (1.5, self.P_SQUARE),
-        }
 
         self._closed = False
 
@@ -88,6 +115,36 @@ class Shape(object):
         self.point_labels = point_labels
         self.mask = mask
 
+    @property
+    def mask(self) -> Optional[np.ndarray]:
+        return self._mask
+
+    @mask.setter
+    def mask(self, value: Optional[np.ndarray]) -> None:
+        self._mask = value
+        self._mask_base64 = None
+
+    def getMaskBase64(self) -> Optional[str]:
+        """Mask as a base64 PNG, encoded once until the mask is replaced.
+
+        It may be called from a worker thread, so the cache is tied to the
+        mask array it was encoded from.
+        """
+        mask = self._mask
+        if mask is None:
+            return None
+        cache = self._mask_base64
+        if cache is not None and cache[0] is mask:
+            return cache[1]
+        mask_base64: str = labelme.utils.img_arr_to_b64(mask.astype(np.uint8))
+        self._mask_base64 = (mask, mask_base64)
+        return mask_base64
+
+    def setMaskBase64(self, mask_base64: str) -> None:
+        """Set the encoded form of the current mask, e.g. as loaded from file."""
+        if self._mask is not None:
+            self._mask_base64 = (self._mask, mask_base64)
+
     def restoreShapeRaw(self):
         if self._shape_raw is None:
             return
@@ -125,6 +182,21 @@ class Shape(object):
             self.points.append(point)
             self.point_labels.append(label)
 
+    def addPoints(self, points, label=1):
+        """Add the points as addPoint() would one by one, in a single pass."""
+        if not points:
+            return
+        if not self.points:
+            self.points.append(points[0])
+            self.point_labels.append(label)
+            points = points[1:]
+        first = self.points[0]
+        new_points = [point for point in points if point != first]
+        if len(new_points) < len(points):
+            self.close()
+        self.points.extend(new_points)
+        self.point_labels.extend([label] * len(new_points))
+
     def canAddPoint(self):
         return self.shape_type in ["polygon", "linestrip"]
 
@@ -183,6 +255,8 @@ class Shape(object):
         painter.setPen(pen)
 
         if self.mask is not None:
+            import skimage.measure
+
             image_to_draw = np.zeros(self.mask.shape + (4,), dtype=np.uint8)
             fill_color = (
                 self.select_fill_color.getRgb()  # type: ignore[attr-defined]
@@ -216,53 +290,7 @@ class Shape(object):
             line_path = QtGui.QPainterPath()
             vrtx_path = QtGui.QPainterPath()
             negative_vrtx_path = QtGui.QPainterPath()
-
-            if self.shape_type in ["rectangle", "mask"]:
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = QtCore.QRectF(
-                        self._scale_point(self.points[0]),
-                        self._scale_point(self.points[1]),
-                    )
-                    line_path.addRect(rectangle)
-                if self.shape_type == "rectangle":
-                    for i in range(len(self.points)):
-                        self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "circle":
-                assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    raidus = labelme.utils.distance(
-                        self._scale_point(self.points[0] - self.points[1])
-                    )
-                    line_path.addEllipse(
-                        self._scale_point(self.points[0]), raidus, raidus
-                    )
-                for i in range(len(self.points)):
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "linestrip":
-                line_path.moveTo(self._scale_point(self.points[0]))
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(self._scale_point(p))
-                    self.drawVertex(vrtx_path, i)
-            elif self.shape_type == "points":
-                assert len(self.points) == len(self.point_labels)
-                for i, point_label in enumerate(self.point_labels):
-                    if point_label == 1:
-                        self.drawVertex(vrtx_path, i)
-                    else:
-                        self.drawVertex(negative_vrtx_path, i)
-            else:
-                line_path.moveTo(self._scale_point(self.points[0]))
-                # Uncommenting the following line will draw 2 paths
-                # for the 1st vertex, and make it non-filled, which
-                # may be desirable.
-                # self.drawVertex(vrtx_path, 0)
-
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(self._scale_point(p))
-                    self.drawVertex(vrtx_path, i)
-                if self.isClosed():
-                    line_path.lineTo(self._scale_point(self.points[0]))
+            self.addPaths(line_path, vrtx_path, negative_vrtx_path)
 
             painter.drawPath(line_path)
             if vrtx_path.length() > 0:
@@ -272,10 +300,62 @@ class Shape(object):
                 color = self.select_fill_color if self.selected else self.fill_color
                 painter.fillPath(line_path, color)
 
-            pen.setColor(QtGui.QColor(255, 0, 0, 255))
-            painter.setPen(pen)
-            painter.drawPath(negative_vrtx_path)
-            painter.fillPath(negative_vrtx_path, QtGui.QColor(255, 0, 0, 255))
+            if not negative_vrtx_path.isEmpty():
+                pen.setColor(QtGui.QColor(255, 0, 0, 255))
+                painter.setPen(pen)
+                painter.drawPath(negative_vrtx_path)
+                painter.fillPath(negative_vrtx_path, QtGui.QColor(255, 0, 0, 255))
+
+    def addPaths(self, line_path, vrtx_path, negative_vrtx_path):
+        """Add the outline and vertices of the points to the given paths.
+
+        The paths may already hold other shapes, so that shapes of the same
+        style can be drawn with a single call.
+        """
+        if self.shape_type in ["rectangle", "mask"]:
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                rectangle = QtCore.QRectF(
+                    self._scale_point(self.points[0]),
+                    self._scale_point(self.points[1]),
+                )
+                line_path.addRect(rectangle)
+            if self.shape_type == "rectangle":
+                for i in range(len(self.points)):
+                    self.drawVertex(vrtx_path, i)
+        elif self.shape_type == "circle":
+            assert len(self.points) in [1, 2]
+            if len(self.points) == 2:
+                raidus = labelme.utils.distance(
+                    self._scale_point(self.points[0] - self.points[1])
+                )
+                line_path.addEllipse(self._scale_point(self.points[0]), raidus, raidus)
+            for i in range(len(self.points)):
+                self.drawVertex(vrtx_path, i)
+        elif self.shape_type == "linestrip":
+            line_path.moveTo(self._scale_point(self.points[0]))
+            for i, p in enumerate(self.points):
+                line_path.lineTo(self._scale_point(p))
+                self.drawVertex(vrtx_path, i)
+        elif self.shape_type == "points":
+            assert len(self.points) == len(self.point_labels)
+            for i, point_label in enumerate(self.point_labels):
+                if point_label == 1:
+                    self.drawVertex(vrtx_path, i)
+                else:
+                    self.drawVertex(negative_vrtx_path, i)
+        else:
+            line_path.moveTo(self._scale_point(self.points[0]))
+            # Uncommenting the following line will draw 2 paths
+            # for the 1st vertex, and make it non-filled, which
+            # may be desirable.
+            # self.drawVertex(vrtx_path, 0)
+
+            for i, p in enumerate(self.points):
+                line_path.lineTo(self._scale_point(p))
+                self.drawVertex(vrtx_path, i)
+            if self.isClosed():
+                line_path.lineTo(self._scale_point(self.points[0]))
 
     def drawVertex(self, path, i):
         d = self.point_size
@@ -379,7 +459,21 @@ class Shape(object):
         self._highlightIndex = None
 
     def copy(self):
-        return copy.deepcopy(self)
+        # Masks and colors are replaced rather than modified in place, so
+        # share them and copy only the containers that are modified.
+        shape = copy.copy(self)
+        shape.points = [QtCore.QPointF(point) for point in self.points]
+        shape.point_labels = list(self.point_labels)
+        shape.flags = copy.deepcopy(self.flags)
+        shape.other_data = copy.deepcopy(self.other_data)
+        if self._shape_raw is not None:
+            shape_type, points, point_labels = self._shape_raw
+            shape._shape_raw = (
+                shape_type,
+                [QtCore.QPointF(point) for point in points],
+                list(point_labels),
+            )
+        return shape
 
     def __len__(self):
         return len(self.points)
@@ -11,6 +11,7 @@ from .image import img_data_to_pil
 from .image import img_data_to_png_data
 from .image import img_pil_to_data
 from .image import img_qt_to_arr
+from .image import img_qt_to_digest
 
 from .shape import labelme_shapes_to_label
 from .shape import masks_to_bboxes
@@ -18,12 +19,24 @@ from .shape import polygons_to_mask
 from .shape import shape_to_mask
 from .shape import shapes_to_label
 
-from .qt import newIcon
-from .qt import newButton
-from .qt import newAction
-from .qt import addActions
-from .qt import labelValidator
-from .qt import struct
-from .qt import distance
-from .qt import distancetoline
-from .qt import fmtShortcut
+# The Qt helpers are imported on first use, so that the rest of the package,
+# e.g. LabelFile and the CLI converters, can be used without Qt installed.
+_QT_NAMES = [
+    "newIcon",
+    "newButton",
+    "newAction",
+    "addActions",
+    "labelValidator",
+    "struct",
+    "distance",
+    "distancetoline",
+    "fmtShortcut",
+]
+
+
+def __getattr__(name):
+    if name in _QT_NAMES:
+        from . import qt
+
+        return getattr(qt, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
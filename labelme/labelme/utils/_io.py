@@ -7,7 +7,7 @@ import numpy as np
 import PIL.Image
 
 
-def lblsave(filename, lbl):
+def lblsave(filename, lbl, compress_level=None):
     import imgviz
 
     if osp.splitext(filename)[1] != ".png":
@@ -18,7 +18,10 @@ def lblsave(filename, lbl):
         lbl_pil = PIL.Image.fromarray(lbl.astype(np.uint8), mode="P")
         colormap = imgviz.label_colormap()
         lbl_pil.putpalette(colormap.flatten())
-        lbl_pil.save(filename)
+        if compress_level is None:
+            lbl_pil.save(filename)
+        else:
+            lbl_pil.save(filename, compress_level=compress_level)
     else:
         raise ValueError(
             "[%s] Cannot save the pixel-wise class label as PNG. "
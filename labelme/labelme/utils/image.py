@@ -2,6 +2,7 @@
 # Copyright (c) Kentaro Wada
 
 import base64
+import hashlib
 import io
 
 import numpy as np
@@ -66,6 +67,20 @@ def img_qt_to_arr(img_qt):
     return img_arr
 
 
+def img_qt_to_digest(img_qt):
+    """Return a hex digest of the size, format and pixels of a QImage."""
+    digest = hashlib.sha1(
+        "{}x{}:{}".format(
+            img_qt.width(), img_qt.height(), int(img_qt.format())
+        ).encode()
+    )
+    bits = img_qt.constBits()
+    if bits is not None:
+        bits.setsize(img_qt.sizeInBytes())
+        digest.update(bits)
+    return digest.hexdigest()
+
+
 def apply_exif_orientation(image):
     try:
         exif = image._getexif()
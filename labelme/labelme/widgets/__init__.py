@@ -8,12 +8,19 @@ from .canvas import Canvas
 
 from .file_dialog_preview import FileDialogPreview
 
+from .file_list_widget import FileListModel
+from .file_list_widget import FileListWidget
+
 from .label_dialog import LabelDialog
 from .label_dialog import LabelQLineEdit
 
 from .label_list_widget import LabelListWidget
 from .label_list_widget import LabelListWidgetItem
 
+from .thumbnail_loader import ThumbnailLoader
+
+from .tiled_image import TiledImage
+
 from .tool_bar import ToolBar
 
 from .unique_label_qlist_widget import UniqueLabelQListWidget
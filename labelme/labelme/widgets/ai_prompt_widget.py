@@ -2,13 +2,15 @@ from PyQt5 import QtWidgets
 
 
 class AiPromptWidget(QtWidgets.QWidget):
-    def __init__(self, on_submit, parent=None):
+    def __init__(self, on_submit, on_submit_all=None, parent=None):
         super().__init__(parent=parent)
 
         self.setLayout(QtWidgets.QVBoxLayout())
         self.layout().setSpacing(0)  # type: ignore[union-attr]
 
-        self._text_prompt_widget = _TextPromptWidget(on_submit=on_submit, parent=self)
+        self._text_prompt_widget = _TextPromptWidget(
+            on_submit=on_submit, on_submit_all=on_submit_all, parent=self
+        )
         self._text_prompt_widget.setMaximumWidth(400)
         self.layout().addWidget(self._text_prompt_widget)  # type: ignore[union-attr]
 
@@ -27,7 +29,7 @@ class AiPromptWidget(QtWidgets.QWidget):
 
 
 class _TextPromptWidget(QtWidgets.QWidget):
-    def __init__(self, on_submit, parent=None):
+    def __init__(self, on_submit, on_submit_all=None, parent=None):
         super().__init__(parent=parent)
 
         self.setLayout(QtWidgets.QHBoxLayout())
@@ -44,6 +46,16 @@ class _TextPromptWidget(QtWidgets.QWidget):
         submit_button.clicked.connect(slot=on_submit)
         self.layout().addWidget(submit_button)  # type: ignore[union-attr]
 
+        if on_submit_all is not None:
+            submit_all_button = QtWidgets.QPushButton(
+                text=self.tr("All Images"), parent=self
+            )
+            submit_all_button.setToolTip(
+                self.tr("Run the prompt on every image in the file list")
+            )
+            submit_all_button.clicked.connect(slot=on_submit_all)
+            self.layout().addWidget(submit_all_button)  # type: ignore[union-attr]
+
     def get_text_prompt(self) -> str:
         return self._texts_widget.text()
 
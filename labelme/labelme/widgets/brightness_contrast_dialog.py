@@ -1,11 +1,102 @@
+from typing import Optional
+from typing import Union
+
+import numpy as np
 import PIL.Image
-import PIL.ImageEnhance
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QImage
 
+import labelme.utils
+
+# Longest side of the image adjusted while a slider is being dragged.
+PREVIEW_SIZE = 1024
+
+
+def _qimage_to_array(image: QImage) -> np.ndarray:
+    # A view of the pixels as (height, width, channels), without the padding.
+    channels = image.depth() // 8
+    bits = image.bits()
+    bits.setsize(image.sizeInBytes())
+    arr = np.frombuffer(bits, dtype=np.uint8).reshape(
+        image.height(), image.bytesPerLine()
+    )
+    return arr[:, : image.width() * channels].reshape(
+        image.height(), image.width(), channels
+    )
+
+
+def _get_lut(
+    brightness: float, contrast: float, mean: Optional[float] = None
+) -> np.ndarray:
+    """Lookup table for PIL.ImageEnhance's Brightness then Contrast.
+
+    ``mean`` is the mean luma of the image, needed when ``contrast != 1``.
+    """
+    values = np.arange(256, dtype=np.float32)
+    lut = np.clip(values * brightness, 0, 255).astype(np.uint8)
+    if contrast != 1:
+        assert mean is not None
+        mean = int(mean + 0.5)
+        lut = lut.astype(np.float32)
+        lut = np.clip(mean + contrast * (lut - mean), 0, 255).astype(np.uint8)
+    return lut
+
+
+class _AdjustedImage(object):
+    """Source pixels of an image and a buffer the adjusted pixels go to."""
+
+    def __init__(self, image: QImage):
+        # Byte-ordered formats, so that channel i is the same on every platform.
+        if image.isGrayscale() and not image.hasAlphaChannel():
+            image = image.convertToFormat(QImage.Format_Grayscale8)
+        elif image.hasAlphaChannel():
+            image = image.convertToFormat(QImage.Format_RGBA8888)
+        else:
+            image = image.convertToFormat(QImage.Format_RGBX8888)
+        self.image: QImage = image
+        self.output: QImage = image.copy()
+
+        self._src: np.ndarray = _qimage_to_array(self.image)
+        self._dst: np.ndarray = _qimage_to_array(self.output)
+        self._num_color_channels: int = min(self._src.shape[2], 3)
+        self._histograms: Optional[list[np.ndarray]] = None
+
+    def get_mean_luma(self, lut: np.ndarray) -> float:
+        """Mean luma of the image after the lookup table is applied."""
+        if self._num_color_channels == 1:
+            weights = [1.0]
+        else:
+            weights = [0.299, 0.587, 0.114]
+        mean = 0.0
+        for channel, weight in enumerate(weights):
+            histogram = self._get_histogram(channel)
+            mean += weight * np.dot(histogram, lut) / histogram.sum()
+        return float(mean)
+
+    def _get_histogram(self, channel: int) -> np.ndarray:
+        if self._histograms is None:
+            self._histograms = [
+                np.bincount(self._src[:, :, i].ravel(), minlength=256)
+                for i in range(self._num_color_channels)
+            ]
+        return self._histograms[channel]
+
+    def apply(self, lut: np.ndarray) -> QImage:
+        np.take(lut, self._src, out=self._dst)
+        if self._num_color_channels < self._src.shape[2]:
+            # The alpha channel is left as is.
+            self._dst[:, :, 3] = self._src[:, :, 3]
+        return self.output
+
 
 class BrightnessContrastDialog(QtWidgets.QDialog):
+    """Brightness and contrast sliders, passing the adjusted image to callback.
+
+    While a slider is dragged, the image passed is a preview downscaled to
+    at most ``PREVIEW_SIZE``, and the full image follows on release.
+    """
+
     _base_value = 50
 
     def __init__(self, img, callback, parent=None):
@@ -32,8 +123,12 @@ class BrightnessContrastDialog(QtWidgets.QDialog):
             #
             slider.valueChanged.connect(self.onNewValue)
             slider.valueChanged.connect(
-                lambda: value_label.setText(f"{slider.value() / self._base_value:.2f}")
+                lambda value, value_label=value_label: value_label.setText(
+                    f"{value / self._base_value:.2f}"
+                )
             )
+            # The preview shown while dragging is replaced on release.
+            slider.sliderReleased.connect(lambda: self.onNewValue(None))
             layouts[title] = layout
             sliders[title] = slider
 
@@ -47,21 +142,80 @@ class BrightnessContrastDialog(QtWidgets.QDialog):
         del layouts
         self.setLayout(layout)
 
-        assert isinstance(img, PIL.Image.Image)
-        self.img = img
+        self._updating: bool = False
+        self.setImage(img)
         self.callback = callback
 
+    def setImage(self, img: Union[QImage, PIL.Image.Image]) -> None:
+        """Set the image to adjust. Its pixels are read on first use."""
+        if isinstance(img, PIL.Image.Image):
+            img = QImage.fromData(labelme.utils.img_pil_to_data(img))
+        assert isinstance(img, QImage)
+        self.img = img
+        self._adjusted: Optional[_AdjustedImage] = None
+        self._preview: Optional[_AdjustedImage] = None
+
+    def setValues(self, brightness: Optional[int], contrast: Optional[int]) -> None:
+        """Set both sliders, defaulting to no change, and adjust the image once."""
+        self._updating = True
+        try:
+            self.slider_brightness.setValue(
+                self._base_value if brightness is None else brightness
+            )
+            self.slider_contrast.setValue(
+                self._base_value if contrast is None else contrast
+            )
+        finally:
+            self._updating = False
+        self.onNewValue(None)
+
     def onNewValue(self, _):
+        if self._updating:
+            return
+
         brightness = self.slider_brightness.value() / self._base_value
         contrast = self.slider_contrast.value() / self._base_value
+        if brightness == 1 and contrast == 1:
+            self.callback(self.img)
+            return
 
-        img = self.img
-        if brightness != 1:
-            img = PIL.ImageEnhance.Brightness(img).enhance(brightness)
+        dragging = self.slider_brightness.isSliderDown() or (
+            self.slider_contrast.isSliderDown()
+        )
+        preview = self._getPreview()
+        if dragging:
+            adjusted = preview
+        else:
+            if self._adjusted is None:
+                self._adjusted = _AdjustedImage(self.img)
+            adjusted = self._adjusted
+
+        lut = _get_lut(brightness=brightness, contrast=1)
         if contrast != 1:
-            img = PIL.ImageEnhance.Contrast(img).enhance(contrast)
+            # The mean barely changes with downscaling, so use the cheaper one.
+            lut = _get_lut(
+                brightness=brightness,
+                contrast=contrast,
+                mean=preview.get_mean_luma(lut),
+            )
+        # The buffer is reused for the next value, and the callback may keep
+        # the image. The preview is passed at its own size, to be shown
+        # stretched to the size of the image.
+        self.callback(adjusted.apply(lut).copy())
 
-        qimage = QImage(
-            img.tobytes(), img.width, img.height, img.width * 3, QImage.Format_RGB888
-        )
-        self.callback(qimage)
+    def _getPreview(self) -> _AdjustedImage:
+        if self._preview is None:
+            if max(self.img.width(), self.img.height()) <= PREVIEW_SIZE:
+                if self._adjusted is None:
+                    self._adjusted = _AdjustedImage(self.img)
+                self._preview = self._adjusted
+            else:
+                self._preview = _AdjustedImage(
+                    self.img.scaled(
+                        PREVIEW_SIZE,
+                        PREVIEW_SIZE,
+                        Qt.KeepAspectRatio,  # type: ignore[attr-defined]
+                        Qt.SmoothTransformation,  # type: ignore[attr-defined]
+                    )
+                )
+        return self._preview
@@ -1,17 +1,28 @@
+import concurrent.futures
+import contextlib
 import functools
+import threading
+import weakref
+from typing import TYPE_CHECKING
+from typing import Iterator
 from typing import Literal
+from typing import Optional
 
-import imgviz
 import numpy as np
-import osam
 from loguru import logger
 from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
 
 import labelme.utils
+from labelme import _instrumentation
 from labelme._automation import polygon_from_mask
+from labelme._automation.embedding_cache import EmbeddingCache
 from labelme.shape import Shape
+from labelme.widgets.tiled_image import TiledImage
+
+if TYPE_CHECKING:
+    import osam
 
 # TODO(unknown):
 # - [maybe] Find optimal epsilon value.
@@ -25,6 +36,9 @@ CURSOR_GRAB = QtCore.Qt.OpenHandCursor  # type: ignore[attr-defined]
 
 MOVE_SPEED = 5.0
 
+# Delay after the last mouse move before the SAM prompt is decoded.
+SAM_DEBOUNCE_MSEC = 50
+
 
 class Canvas(QtWidgets.QWidget):
     zoomRequest = QtCore.pyqtSignal(int, QtCore.QPoint)
@@ -35,6 +49,7 @@ class Canvas(QtWidgets.QWidget):
     drawingPolygon = QtCore.pyqtSignal(bool)
     vertexSelected = QtCore.pyqtSignal(bool)
     mouseMoved = QtCore.pyqtSignal(QtCore.QPointF)
+    _samPreviewReady = QtCore.pyqtSignal(int, object)
 
     CREATE, EDIT = 0, 1
 
@@ -55,6 +70,10 @@ class Canvas(QtWidgets.QWidget):
                 "Unexpected value for double_click event: {}".format(self.double_click)
             )
         self.num_backups = kwargs.pop("num_backups", 10)
+        self.backups_memory_mb = kwargs.pop("backups_memory_mb", 256)
+        self._embedding_cache: Optional[EmbeddingCache] = kwargs.pop(
+            "embedding_cache", None
+        )
         self._crosshair = kwargs.pop(
             "crosshair",
             {
@@ -73,6 +92,11 @@ class Canvas(QtWidgets.QWidget):
         self.mode = self.EDIT
         self.shapes = []
         self.shapesBackups = []
+        # Backups share the copy of a shape until it's edited, so this maps
+        # each live shape to its latest copy in the backups.
+        self._shapeBackups: weakref.WeakKeyDictionary[Shape, Shape] = (
+            weakref.WeakKeyDictionary()
+        )
         self.current = None
         self.selectedShapes = []  # save the selected shapes here
         self.selectedShapesCopy = []
@@ -86,7 +110,7 @@ class Canvas(QtWidgets.QWidget):
         self.prevMovePoint = QtCore.QPointF()
         self.offsets = QtCore.QPointF(), QtCore.QPointF()
         self.scale = 1.0
-        self.pixmap = QtGui.QPixmap()
+        self.pixmap = TiledImage()
         self.visible = {}
         self._hideBackround = False
         self.hideBackround = False
@@ -111,6 +135,18 @@ class Canvas(QtWidgets.QWidget):
 
         self._ai_model_name: str = "sam2:latest"
 
+        # SAM prompts are decoded in a worker thread while drawing, and the
+        # latest finished result is painted. Only the latest request matters.
+        self._sam_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._sam_future: Optional[concurrent.futures.Future] = None
+        self._sam_request_id: int = 0
+        self._sam_preview: Optional[Shape] = None
+        self._sam_timer = QtCore.QTimer(self)
+        self._sam_timer.setSingleShot(True)
+        self._sam_timer.setInterval(SAM_DEBOUNCE_MSEC)
+        self._sam_timer.timeout.connect(self._request_sam_preview)
+        self._samPreviewReady.connect(self._on_sam_preview_ready)
+
     def fillDrawing(self):
         return self._fill_drawing
 
@@ -139,15 +175,108 @@ class Canvas(QtWidgets.QWidget):
     def set_ai_model_name(self, model_name: str) -> None:
         logger.debug("Setting AI model to {!r}", model_name)
         self._ai_model_name = model_name
+        self._cancel_sam_preview()
+
+    def prefetch_image_embedding(self, image: QtGui.QImage, image_digest: str) -> None:
+        """Encode an image with the current AI model ahead of any prompt.
+
+        Safe to call from a worker thread.
+        """
+        _compute_image_embedding(
+            sam=_get_ai_model(model_name=self._ai_model_name),
+            image=image,
+            image_digest=image_digest,
+            embedding_cache=self._embedding_cache,
+        )
+
+    def _request_sam_preview(self) -> None:
+        if not self.current or self.createMode not in ["ai_polygon", "ai_mask"]:
+            return
+
+        drawing_shape = self.current.copy()
+        drawing_shape.addPoint(
+            point=self.line.points[1],
+            label=self.line.point_labels[1],
+        )
+
+        # Latest request wins: drop the queued one, ignore the running one.
+        self._sam_request_id += 1
+        if self._sam_future is not None:
+            self._sam_future.cancel()
+        self._sam_future = self._sam_executor.submit(
+            self._run_sam_preview,
+            request_id=self._sam_request_id,
+            model_name=self._ai_model_name,
+            image=self.pixmap,
+            shape=drawing_shape,
+            createMode=self.createMode,
+        )
+
+    def _run_sam_preview(
+        self,
+        request_id: int,
+        model_name: str,
+        image: TiledImage,
+        shape: Shape,
+        createMode: Literal["ai_polygon", "ai_mask"],
+    ) -> None:
+        # This runs in the worker thread.
+        if request_id != self._sam_request_id:
+            return
+        try:
+            _update_shape_with_sam(
+                sam=_get_ai_model(model_name=model_name),
+                image=image.toImage(),
+                image_digest=image.digest(),
+                shape=shape,
+                createMode=createMode,
+                embedding_cache=self._embedding_cache,
+            )
+        except Exception:
+            logger.exception("Failed to run {!r} for preview", model_name)
+            return
+        try:
+            self._samPreviewReady.emit(request_id, shape)
+        except RuntimeError:
+            pass  # the canvas is already deleted
+
+    def _on_sam_preview_ready(self, request_id: int, shape: Shape) -> None:
+        if request_id != self._sam_request_id or not self.current:
+            return
+        self._sam_preview = shape
+        self.update()
+
+    def _cancel_sam_preview(self) -> None:
+        self._sam_timer.stop()
+        self._sam_request_id += 1
+        if self._sam_future is not None:
+            self._sam_future.cancel()
+            self._sam_future = None
+        self._sam_preview = None
 
     def storeShapes(self):
         shapesBackup = []
         for shape in self.shapes:
-            shapesBackup.append(shape.copy())
+            backup = self._shapeBackups.get(shape)
+            if backup is None or not _isShapeUnchanged(shape, backup):
+                backup = shape.copy()
+                self._shapeBackups[shape] = backup
+            shapesBackup.append(backup)
         if len(self.shapesBackups) > self.num_backups:
             self.shapesBackups = self.shapesBackups[-self.num_backups - 1 :]
         self.shapesBackups.append(shapesBackup)
 
+        # Drop the oldest backups beyond the memory budget, but keep the
+        # previous state so that the last edit can always be undone.
+        max_bytes = self.backups_memory_mb * 1024 * 1024
+        while len(self.shapesBackups) > 2:
+            shapes = {
+                id(shape): shape for backup in self.shapesBackups for shape in backup
+            }
+            if sum(_getShapeBytes(shape) for shape in shapes.values()) <= max_bytes:
+                break
+            self.shapesBackups.pop(0)
+
     @property
     def isShapeRestorable(self):
         # We save the state AFTER each edit (not before) so for an
@@ -168,7 +297,12 @@ class Canvas(QtWidgets.QWidget):
         # The application will eventually call Canvas.loadShapes which will
         # push this right back onto the stack.
         shapesBackup = self.shapesBackups.pop()
-        self.shapes = shapesBackup
+        # Backups are shared between states, so edit copies of them.
+        self.shapes = []
+        for backup in shapesBackup:
+            shape = backup.copy()
+            self._shapeBackups[shape] = backup
+            self.shapes.append(shape)
         self.selectedShapes = []
         for shape in self.shapes:
             shape.selected = False
@@ -285,6 +419,8 @@ class Canvas(QtWidgets.QWidget):
                 self.line.point_labels = [1]
                 self.line.close()
             assert len(self.line.points) == len(self.line.point_labels)
+            if self.createMode in ["ai_polygon", "ai_mask"]:
+                self._sam_timer.start()
             self.repaint()
             self.current.highlightClear()
             return
@@ -317,59 +453,60 @@ class Canvas(QtWidgets.QWidget):
         # - Highlight shapes
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
-        self.setToolTip(self.tr("Image"))
-        for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
-            # Look for a nearby vertex to highlight. If that fails,
-            # check if we happen to be inside a shape.
-            index = shape.nearestVertex(pos, self.epsilon)
-            index_edge = shape.nearestEdge(pos, self.epsilon)
-            if index is not None:
-                if self.selectedVertex():
-                    self.hShape.highlightClear()  # type: ignore[union-attr]
-                self.prevhVertex = self.hVertex = index
-                self.prevhShape = self.hShape = shape
-                self.prevhEdge = self.hEdge
-                self.hEdge = None
-                shape.highlightVertex(index, shape.MOVE_VERTEX)
-                self.overrideCursor(CURSOR_POINT)
-                self.setToolTip(
-                    self.tr(
-                        "Click & Drag to move point\n"
-                        "ALT + SHIFT + Click to delete point"
+        with _instrumentation.measure("canvas.hit_test"):
+            self.setToolTip(self.tr("Image"))
+            for shape in reversed([s for s in self.shapes if self.isVisible(s)]):
+                # Look for a nearby vertex to highlight. If that fails,
+                # check if we happen to be inside a shape.
+                index = shape.nearestVertex(pos, self.epsilon)
+                index_edge = shape.nearestEdge(pos, self.epsilon)
+                if index is not None:
+                    if self.selectedVertex():
+                        self.hShape.highlightClear()  # type: ignore[union-attr]
+                    self.prevhVertex = self.hVertex = index
+                    self.prevhShape = self.hShape = shape
+                    self.prevhEdge = self.hEdge
+                    self.hEdge = None
+                    shape.highlightVertex(index, shape.MOVE_VERTEX)
+                    self.overrideCursor(CURSOR_POINT)
+                    self.setToolTip(
+                        self.tr(
+                            "Click & Drag to move point\n"
+                            "ALT + SHIFT + Click to delete point"
+                        )
                     )
-                )
-                self.setStatusTip(self.toolTip())
-                self.update()
-                break
-            elif index_edge is not None and shape.canAddPoint():
-                if self.selectedVertex():
-                    self.hShape.highlightClear()  # type: ignore[union-attr]
-                self.prevhVertex = self.hVertex
-                self.hVertex = None
-                self.prevhShape = self.hShape = shape
-                self.prevhEdge = self.hEdge = index_edge
-                self.overrideCursor(CURSOR_POINT)
-                self.setToolTip(self.tr("ALT + Click to create point"))
-                self.setStatusTip(self.toolTip())
-                self.update()
-                break
-            elif shape.containsPoint(pos):
-                if self.selectedVertex():
-                    self.hShape.highlightClear()  # type: ignore[union-attr]
-                self.prevhVertex = self.hVertex
-                self.hVertex = None
-                self.prevhShape = self.hShape = shape
-                self.prevhEdge = self.hEdge
-                self.hEdge = None
-                self.setToolTip(
-                    self.tr("Click & drag to move shape '%s'") % shape.label
-                )
-                self.setStatusTip(self.toolTip())
-                self.overrideCursor(CURSOR_GRAB)
-                self.update()
-                break
-        else:  # Nothing found, clear highlights, reset state.
-            self.unHighlight()
+                    self.setStatusTip(self.toolTip())
+                    self.update()
+                    break
+                elif index_edge is not None and shape.canAddPoint():
+                    if self.selectedVertex():
+                        self.hShape.highlightClear()  # type: ignore[union-attr]
+                    self.prevhVertex = self.hVertex
+                    self.hVertex = None
+                    self.prevhShape = self.hShape = shape
+                    self.prevhEdge = self.hEdge = index_edge
+                    self.overrideCursor(CURSOR_POINT)
+                    self.setToolTip(self.tr("ALT + Click to create point"))
+                    self.setStatusTip(self.toolTip())
+                    self.update()
+                    break
+                elif shape.containsPoint(pos):
+                    if self.selectedVertex():
+                        self.hShape.highlightClear()  # type: ignore[union-attr]
+                    self.prevhVertex = self.hVertex
+                    self.hVertex = None
+                    self.prevhShape = self.hShape = shape
+                    self.prevhEdge = self.hEdge
+                    self.hEdge = None
+                    self.setToolTip(
+                        self.tr("Click & drag to move shape '%s'") % shape.label
+                    )
+                    self.setStatusTip(self.toolTip())
+                    self.overrideCursor(CURSOR_GRAB)
+                    self.update()
+                    break
+            else:  # Nothing found, clear highlights, reset state.
+                self.unHighlight()
         self.vertexSelected.emit(self.hVertex is not None)
 
     def addPointToEdge(self):
@@ -428,6 +565,8 @@ class Canvas(QtWidgets.QWidget):
                         self.line.point_labels[0] = self.current.point_labels[-1]
                         if ev.modifiers() & QtCore.Qt.ControlModifier:  # type: ignore[attr-defined]
                             self.finalise()
+                        else:
+                            self._sam_timer.start()
                 elif not self.outOfPixmap(pos):
                     # Create new shape.
                     self.current = Shape(
@@ -456,6 +595,8 @@ class Canvas(QtWidgets.QWidget):
                             self.line.point_labels = [1, 1]
                         self.setHiding()
                         self.drawingPolygon.emit(True)
+                        if self.createMode in ["ai_polygon", "ai_mask"]:
+                            self._sam_timer.start()
                         self.update()
             elif self.editing():
                 if self.selectedEdge() and ev.modifiers() == QtCore.Qt.AltModifier:  # type: ignore[attr-defined]
@@ -654,6 +795,33 @@ class Canvas(QtWidgets.QWidget):
         self.update()
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        with _instrumentation.measure("canvas.paint"):
+            self._paint(event)
+        if _instrumentation.is_enabled():
+            self._paintInstrumentationOverlay()
+
+    def _paintInstrumentationOverlay(self) -> None:
+        lines = _instrumentation.get_summary_lines()
+        if not lines:
+            return
+        p = self._painter
+        p.begin(self)
+        font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
+        p.setFont(font)
+        metrics = QtGui.QFontMetrics(font)
+        rect = QtCore.QRect(
+            0,
+            0,
+            max(metrics.horizontalAdvance(line) for line in lines) + 8,
+            metrics.lineSpacing() * len(lines) + 8,
+        )
+        p.fillRect(rect, QtGui.QColor(0, 0, 0, 160))
+        p.setPen(QtGui.QColor(255, 255, 255))
+        for i, line in enumerate(lines):
+            p.drawText(4, 4 + metrics.ascent() + metrics.lineSpacing() * i, line)
+        p.end()
+
+    def _paint(self, event: QtGui.QPaintEvent) -> None:
         if not self.pixmap:
             return super(Canvas, self).paintEvent(event)
 
@@ -666,7 +834,17 @@ class Canvas(QtWidgets.QWidget):
         p.scale(self.scale, self.scale)
         p.translate(self.offsetToCenter())
 
-        p.drawPixmap(0, 0, self.pixmap)
+        # Antialiasing the tile edges would show seams between the tiles.
+        p.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        exposed = QtCore.QRectF(event.rect())
+        self.pixmap.draw(
+            p,
+            rect=QtCore.QRectF(
+                self.transformPos(exposed.topLeft()), exposed.size() / self.scale
+            ),
+            scale=self.scale,
+        )
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
 
         p.scale(1 / self.scale, 1 / self.scale)
 
@@ -692,10 +870,12 @@ class Canvas(QtWidgets.QWidget):
             )
 
         Shape.scale = self.scale
+        shapes = []
         for shape in self.shapes:
             if (shape.selected or not self._hideBackround) and self.isVisible(shape):
                 shape.fill = shape.selected or shape == self.hShape
-                shape.paint(p)
+                shapes.append(shape)
+        self._paintShapes(p, shapes)
         if self.current:
             self.current.paint(p)
             assert len(self.line.points) == len(self.line.point_labels)
@@ -719,6 +899,7 @@ class Canvas(QtWidgets.QWidget):
                     "fill_drawing=true, but fill_color is transparent,"
                     " so forcing to be opaque."
                 )
+                drawing_shape.fill_color = QtGui.QColor(drawing_shape.fill_color)
                 drawing_shape.fill_color.setAlpha(64)
             drawing_shape.addPoint(self.line[1])
 
@@ -726,22 +907,59 @@ class Canvas(QtWidgets.QWidget):
             p.end()
             return
 
-        drawing_shape = self.current.copy()
-        drawing_shape.addPoint(
-            point=self.line.points[1],
-            label=self.line.point_labels[1],
-        )
-        _update_shape_with_sam(
-            sam=_get_ai_model(model_name=self._ai_model_name),
-            pixmap=self.pixmap,
-            shape=drawing_shape,
-            createMode=self.createMode,
-        )
-        drawing_shape.fill = self.fillDrawing()
-        drawing_shape.selected = True
-        drawing_shape.paint(p)
+        # The prompt is decoded off the paint path, see _request_sam_preview.
+        if self._sam_preview is not None:
+            self._sam_preview.fill = self.fillDrawing()
+            self._sam_preview.selected = True
+            self._sam_preview.paint(p)
         p.end()
 
+    def _paintShapes(self, painter: QtGui.QPainter, shapes: list[Shape]) -> None:
+        # Runs of plain outlines are merged into one path per color and drawn
+        # with a few calls. The others are painted one by one, each after the
+        # run before it, so the shapes are still drawn in list order.
+        batches: dict[
+            tuple[int, int], tuple[QtGui.QPainterPath, QtGui.QPainterPath]
+        ] = {}
+        batch_colors: dict[tuple[int, int], tuple[QtGui.QColor, QtGui.QColor]] = {}
+        for shape in shapes:
+            if (
+                shape.fill
+                or shape.mask is not None
+                or shape.shape_type == "points"
+                or shape._highlightIndex is not None
+                or not shape.points
+            ):
+                self._paintBatches(painter, batches, batch_colors)
+                batches.clear()
+                batch_colors.clear()
+                shape.paint(painter)
+                continue
+            key = (shape.line_color.rgba(), shape.vertex_fill_color.rgba())
+            if key not in batches:
+                batches[key] = (QtGui.QPainterPath(), QtGui.QPainterPath())
+                batch_colors[key] = (shape.line_color, shape.vertex_fill_color)
+            line_path, vrtx_path = batches[key]
+            shape.addPaths(line_path, vrtx_path, vrtx_path)
+        self._paintBatches(painter, batches, batch_colors)
+
+    @staticmethod
+    def _paintBatches(
+        painter: QtGui.QPainter,
+        batches: dict[tuple[int, int], tuple[QtGui.QPainterPath, QtGui.QPainterPath]],
+        batch_colors: dict[tuple[int, int], tuple[QtGui.QColor, QtGui.QColor]],
+    ) -> None:
+        pen = QtGui.QPen()
+        pen.setWidth(Shape.PEN_WIDTH)
+        for key, (line_path, vrtx_path) in batches.items():
+            line_color, vertex_fill_color = batch_colors[key]
+            pen.setColor(line_color)
+            painter.setPen(pen)
+            painter.drawPath(line_path)
+            if not vrtx_path.isEmpty():
+                painter.drawPath(vrtx_path)
+                painter.fillPath(vrtx_path, vertex_fill_color)
+
     def transformPos(self, point: QtCore.QPointF) -> QtCore.QPointF:
         """Convert from widget-logical coordinates to painter-logical ones."""
         return point / self.scale - self.offsetToCenter()
@@ -761,12 +979,15 @@ class Canvas(QtWidgets.QWidget):
 
     def finalise(self):
         assert self.current
+        self._cancel_sam_preview()
         if self.createMode in ["ai_polygon", "ai_mask"]:
             _update_shape_with_sam(
                 sam=_get_ai_model(model_name=self._ai_model_name),
-                pixmap=self.pixmap,
+                image=self.pixmap.toImage(),
+                image_digest=self.pixmap.digest(),
                 shape=self.current,
                 createMode=self.createMode,
+                embedding_cache=self._embedding_cache,
             )
         self.current.close()
 
@@ -873,6 +1094,7 @@ class Canvas(QtWidgets.QWidget):
         key = ev.key()
         if self.drawing():
             if key == QtCore.Qt.Key_Escape and self.current:  # type: ignore[attr-defined]
+                self._cancel_sam_preview()
                 self.current = None
                 self.drawingPolygon.emit(False)
                 self.update()
@@ -914,6 +1136,7 @@ class Canvas(QtWidgets.QWidget):
 
     def undoLastLine(self):
         assert self.shapes
+        self._cancel_sam_preview()
         self.current = self.shapes.pop()
         self.current.setOpen()
         self.current.restoreShapeRaw()
@@ -929,15 +1152,21 @@ class Canvas(QtWidgets.QWidget):
         if not self.current or self.current.isClosed():
             return
         self.current.popPoint()
+        self._cancel_sam_preview()
         if len(self.current) > 0:
             self.line[0] = self.current[-1]
+            if self.createMode in ["ai_polygon", "ai_mask"]:
+                self._sam_timer.start()
         else:
             self.current = None
             self.drawingPolygon.emit(False)
         self.update()
 
-    def loadPixmap(self, pixmap, clear_shapes=True):
-        self.pixmap = pixmap
+    def loadPixmap(self, pixmap, clear_shapes=True, size=None):
+        # pixmap can be QPixmap or QImage, and it's drawn tile by tile,
+        # stretched to size if given, e.g. for a downscaled preview.
+        self._cancel_sam_preview()
+        self.pixmap = TiledImage(pixmap, size=size)
         if clear_shapes:
             self.shapes = []
         self.update()
@@ -973,31 +1202,64 @@ class Canvas(QtWidgets.QWidget):
         self.update()
 
 
+def _isShapeUnchanged(shape: Shape, backup: Shape) -> bool:
+    # Masks are never modified in place, so comparing identity is enough.
+    return (
+        shape.mask is backup.mask
+        and shape.label == backup.label
+        and shape.group_id == backup.group_id
+        and shape.description == backup.description
+        and shape.shape_type == backup.shape_type
+        and shape.isClosed() == backup.isClosed()
+        and shape.flags == backup.flags
+        and shape.other_data == backup.other_data
+        and shape.point_labels == backup.point_labels
+        and shape.points == backup.points
+    )
+
+
+def _getShapeBytes(shape: Shape) -> int:
+    # Rough estimate: masks dominate, points and the rest are small.
+    size = 1024 + 64 * len(shape.points)
+    if shape.mask is not None:
+        size += shape.mask.nbytes
+    return size
+
+
 def _update_shape_with_sam(
-    sam: osam.types.Model,
-    pixmap: QtGui.QPixmap,
+    sam: "osam.types.Model",
+    image: QtGui.QImage,
+    image_digest: str,
     shape: Shape,
     createMode: Literal["ai_polygon", "ai_mask"],
+    embedding_cache: Optional[EmbeddingCache] = None,
 ) -> None:
+    import imgviz
+    import osam
+
     if createMode not in ["ai_polygon", "ai_mask"]:
         raise ValueError(
             f"createMode must be 'ai_polygon' or 'ai_mask', not {createMode}"
         )
 
     image_embedding: osam.types.ImageEmbedding = _compute_image_embedding(
-        sam=sam, pixmap=pixmap
+        sam=sam,
+        image=image,
+        image_digest=image_digest,
+        embedding_cache=embedding_cache,
     )
 
-    response: osam.types.GenerateResponse = osam.apis.generate(
-        osam.types.GenerateRequest(
-            model=sam.name,
-            image_embedding=image_embedding,
-            prompt=osam.types.Prompt(
-                points=[[point.x(), point.y()] for point in shape.points],
-                point_labels=shape.point_labels,
-            ),
+    with _instrumentation.measure("sam.decode"):
+        response: osam.types.GenerateResponse = osam.apis.generate(
+            osam.types.GenerateRequest(
+                model=sam.name,
+                image_embedding=image_embedding,
+                prompt=osam.types.Prompt(
+                    points=[[point.x(), point.y()] for point in shape.points],
+                    point_labels=shape.point_labels,
+                ),
+            )
         )
-    )
     if not response.annotations:
         logger.warning("No annotations returned by model {!r}", sam)
         return
@@ -1036,34 +1298,98 @@ def _update_shape_with_sam(
 
 
 @functools.lru_cache(maxsize=1)
-def _get_ai_model(model_name: str) -> osam.types.Model:
+def _get_ai_model(model_name: str) -> "osam.types.Model":
+    import osam
+
     return osam.apis.get_model_type_by_name(name=model_name)()
 
 
 def _compute_image_embedding(
-    sam: osam.types.Model, pixmap: QtGui.QPixmap
-) -> osam.types.ImageEmbedding:
-    return __compute_image_embedding(sam=sam, pixmap=_QPixmapForLruCache(pixmap))
+    sam: "osam.types.Model",
+    image: QtGui.QImage,
+    image_digest: str,
+    embedding_cache: Optional[EmbeddingCache] = None,
+) -> "osam.types.ImageEmbedding":
+    return __compute_image_embedding(
+        sam=sam,
+        image=_QImageForLruCache(image, image_digest),
+        embedding_cache=embedding_cache,
+    )
+
 
+class _QImageForLruCache(QtGui.QImage):
+    # Keyed by a digest computed once per image, as hashing the pixels on
+    # every lookup is as slow as the lookup is meant to be fast.
+    def __init__(self, image: QtGui.QImage, digest: str):
+        super().__init__(image)
+        self.digest: str = digest
 
-class _QPixmapForLruCache(QtGui.QPixmap):
     def __hash__(self) -> int:
-        qimage: QtGui.QImage = self.toImage()
-        bits = qimage.constBits()
-        if bits is None:
-            return hash(None)
-        return hash(bits.asstring(qimage.sizeInBytes()))
+        return hash(self.digest)
 
     def __eq__(self, other) -> bool:
-        if not isinstance(other, _QPixmapForLruCache):
+        if not isinstance(other, _QImageForLruCache):
             return False
-        return self.__hash__() == other.__hash__()
+        return self.digest == other.digest
+
+
+# Serializes encoding per image, so a prompt and a prefetch of the same image
+# don't both encode it: the second one finds the first one's result on disk.
+# Encodes of different images don't wait for each other, so a prompt never
+# waits for the prefetch of another image.
+_image_digest_locks: dict[tuple[str, str], tuple[threading.Lock, int]] = {}
+_image_digest_locks_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _lock_image_digest(model_name: str, image_digest: str) -> Iterator[None]:
+    key = (model_name, image_digest)
+    with _image_digest_locks_lock:
+        lock, num_users = _image_digest_locks.get(key, (threading.Lock(), 0))
+        _image_digest_locks[key] = (lock, num_users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _image_digest_locks_lock:
+            lock, num_users = _image_digest_locks[key]
+            if num_users == 1:
+                del _image_digest_locks[key]
+            else:
+                _image_digest_locks[key] = (lock, num_users - 1)
 
 
 @functools.lru_cache(maxsize=3)
 def __compute_image_embedding(
-    sam: osam.types.Model, pixmap: _QPixmapForLruCache
-) -> osam.types.ImageEmbedding:
-    logger.debug("Computing image embeddings for model {!r}", sam.name)
-    image: np.ndarray = labelme.utils.img_qt_to_arr(pixmap.toImage())
-    return sam.encode_image(image=imgviz.asrgb(image))
+    sam: "osam.types.Model",
+    image: _QImageForLruCache,
+    embedding_cache: Optional[EmbeddingCache],
+) -> "osam.types.ImageEmbedding":
+    import imgviz
+
+    with _lock_image_digest(model_name=sam.name, image_digest=image.digest):
+        if embedding_cache is not None and (
+            image_embedding := embedding_cache.get(
+                model_name=sam.name, image_digest=image.digest
+            )
+        ):
+            return image_embedding
+
+        logger.debug("Computing image embeddings for model {!r}", sam.name)
+        # Same 32-bit layout as QPixmap.toImage(), which this used to be fed from.
+        qimage: QtGui.QImage = image.convertToFormat(
+            QtGui.QImage.Format_ARGB32_Premultiplied
+            if image.hasAlphaChannel()
+            else QtGui.QImage.Format_RGB32
+        )
+        image_arr: np.ndarray = labelme.utils.img_qt_to_arr(qimage)
+        with _instrumentation.measure("sam.encode"):
+            image_embedding = sam.encode_image(image=imgviz.asrgb(image_arr))
+
+        if embedding_cache is not None:
+            embedding_cache.put(
+                model_name=sam.name,
+                image_digest=image.digest,
+                image_embedding=image_embedding,
+            )
+        return image_embedding
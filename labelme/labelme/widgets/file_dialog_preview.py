@@ -1,10 +1,13 @@
 import json
+from typing import Optional
 from typing import cast
 
 from PyQt5 import QtCore
 from PyQt5 import QtGui
 from PyQt5 import QtWidgets
 
+from .thumbnail_loader import ThumbnailLoader
+
 
 class ScrollAreaPreview(QtWidgets.QScrollArea):
     def __init__(self, *args, **kwargs):
@@ -33,10 +36,19 @@ class ScrollAreaPreview(QtWidgets.QScrollArea):
 
 
 class FileDialogPreview(QtWidgets.QFileDialog):
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self, *args, thumbnail_loader: Optional[ThumbnailLoader] = None, **kwargs
+    ):
         super(FileDialogPreview, self).__init__(*args, **kwargs)
         self.setOption(self.DontUseNativeDialog, True)
 
+        # Image previews are read through it if given, instead of decoding the
+        # whole image on the GUI thread.
+        self._thumbnail_loader: Optional[ThumbnailLoader] = thumbnail_loader
+        self._path: Optional[str] = None
+        if thumbnail_loader is not None:
+            thumbnail_loader.thumbnailLoaded.connect(self._onThumbnailLoaded)
+
         self.labelPreview = ScrollAreaPreview(self)
         self.labelPreview.setFixedSize(300, 300)
         self.labelPreview.setHidden(True)
@@ -52,6 +64,7 @@ class FileDialogPreview(QtWidgets.QFileDialog):
         self.currentChanged.connect(self.onChange)
 
     def onChange(self, path):
+        self._path = path
         if path.lower().endswith(".json"):
             with open(path, "r") as f:
                 data = json.load(f)
@@ -60,6 +73,10 @@ class FileDialogPreview(QtWidgets.QFileDialog):
                 QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop  # type: ignore[attr-defined]
             )
             self.labelPreview.setHidden(False)
+        elif self._thumbnail_loader is not None:
+            image = self._thumbnail_loader.thumbnail(path, size=self._previewSize())
+            if image is not None:
+                self._setPreviewImage(image)
         else:
             pixmap = QtGui.QPixmap(path)
             if pixmap.isNull():
@@ -76,3 +93,22 @@ class FileDialogPreview(QtWidgets.QFileDialog):
                 )
                 self.labelPreview.label.setAlignment(QtCore.Qt.AlignCenter)  # type: ignore[attr-defined]
                 self.labelPreview.setHidden(False)
+
+    def _previewSize(self) -> int:
+        return min(self.labelPreview.width(), self.labelPreview.height()) - 30
+
+    def _onThumbnailLoaded(self, filename: str, size: int) -> None:
+        if filename != self._path or size != self._previewSize():
+            return
+        image = self._thumbnail_loader.thumbnail(filename, size=size)  # type: ignore[union-attr]
+        if image is not None:
+            self._setPreviewImage(image)
+
+    def _setPreviewImage(self, image: QtGui.QImage) -> None:
+        if image.isNull():
+            self.labelPreview.clear()
+            self.labelPreview.setHidden(True)
+            return
+        self.labelPreview.setPixmap(QtGui.QPixmap.fromImage(image))
+        self.labelPreview.label.setAlignment(QtCore.Qt.AlignCenter)  # type: ignore[attr-defined]
+        self.labelPreview.setHidden(False)
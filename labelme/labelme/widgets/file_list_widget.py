@@ -0,0 +1,344 @@
+import bisect
+import os.path as osp
+import re
+from typing import Any
+from typing import Optional
+
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt
+
+from .thumbnail_loader import ThumbnailLoader
+
+
+class FileListModel(QtCore.QAbstractListModel):
+    """Image files with a check state telling whether they have a label file.
+
+    Rows are looked up by filename through a dict, and items are only built
+    by the view for the rows it shows.
+    """
+
+    def __init__(self, parent=None):
+        super(FileListModel, self).__init__(parent)
+        self._filenames: list[str] = []
+        self._checked: list[bool] = []
+        self._keys: list[tuple[int, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._num_appended: int = 0
+        self._thumbnail_loader: Optional[ThumbnailLoader] = None
+        self._thumbnail_size: int = 0
+        self._thumbnail_placeholder: QtGui.QImage = QtGui.QImage()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._filenames)
+
+    def data(self, index, role=Qt.DisplayRole):  # type: ignore[attr-defined]
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:  # type: ignore[attr-defined]
+            if self._thumbnail_loader is not None:
+                return osp.basename(self._filenames[index.row()])
+            return self._filenames[index.row()]
+        if role == Qt.CheckStateRole:  # type: ignore[attr-defined]
+            return Qt.Checked if self._checked[index.row()] else Qt.Unchecked  # type: ignore[attr-defined]
+        if self._thumbnail_loader is None:
+            return None
+        if role == Qt.DecorationRole:  # type: ignore[attr-defined]
+            # Only asked for the rows in view, so only those get loaded.
+            image = self._thumbnail_loader.thumbnail(
+                self._filenames[index.row()], size=self._thumbnail_size
+            )
+            if image is None or image.isNull():
+                # Same size as a thumbnail, as the view sizes all rows alike.
+                return self._thumbnail_placeholder
+            return image
+        if role == Qt.ToolTipRole:  # type: ignore[attr-defined]
+            return self._filenames[index.row()]
+        return None
+
+    def setThumbnailLoader(
+        self, loader: Optional[ThumbnailLoader], size: int = 128
+    ) -> None:
+        """Show thumbnails of the given size, or none if ``loader`` is None."""
+        if self._thumbnail_loader is not None:
+            self._thumbnail_loader.thumbnailLoaded.disconnect(self._onThumbnailLoaded)
+            self._thumbnail_loader.clear()
+        self._thumbnail_loader = loader
+        self._thumbnail_size = size
+        self._thumbnail_placeholder = QtGui.QImage(
+            size, size, QtGui.QImage.Format_ARGB32
+        )
+        self._thumbnail_placeholder.fill(Qt.transparent)  # type: ignore[attr-defined]
+        if loader is not None:
+            loader.thumbnailLoaded.connect(self._onThumbnailLoaded)
+        if self._filenames:
+            self.dataChanged.emit(self.index(0), self.index(len(self._filenames) - 1))
+
+    def _onThumbnailLoaded(self, filename: str, size: int) -> None:
+        row = self.row(filename)
+        if row < 0 or size != self._thumbnail_size:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])  # type: ignore[attr-defined]
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable  # type: ignore[attr-defined]
+
+    def filenames(self) -> list[str]:
+        """All filenames in order. The returned list must not be modified."""
+        return self._filenames
+
+    def row(self, filename: str) -> int:
+        """Row of the filename, or -1 if it's not in the list."""
+        return self._rows.get(filename, -1)
+
+    def addFiles(
+        self,
+        filenames: list[str],
+        checked: list[bool],
+        sort_keys: Optional[list[Any]] = None,
+    ) -> None:
+        """Add the files that are not in the list yet.
+
+        Files given with ``sort_keys`` are merged into place among the other
+        sorted files, and files without are appended at the end.
+        """
+        new_entries: list[tuple[tuple[int, Any], str, bool]] = []
+        new_filenames: set[str] = set()
+        for i, (filename, is_checked) in enumerate(zip(filenames, checked)):
+            if filename in self._rows or filename in new_filenames:
+                continue
+            new_filenames.add(filename)
+            if sort_keys is None:
+                key: tuple[int, Any] = (1, self._num_appended)
+                self._num_appended += 1
+            else:
+                key = (0, sort_keys[i])
+            new_entries.append((key, filename, is_checked))
+        if not new_entries:
+            return
+        new_entries.sort(key=lambda entry: entry[0])
+
+        first = len(self._filenames)
+        if not self._keys or new_entries[0][0] >= self._keys[-1]:
+            self.beginInsertRows(
+                QtCore.QModelIndex(), first, first + len(new_entries) - 1
+            )
+            for row, (key, filename, is_checked) in enumerate(new_entries, first):
+                self._keys.append(key)
+                self._filenames.append(filename)
+                self._checked.append(is_checked)
+                self._rows[filename] = row
+            self.endInsertRows()
+            return
+
+        # Merging moves the existing rows, so the selection and current index
+        # are carried over through the persistent indexes.
+        self.layoutAboutToBeChanged.emit()
+        persistent_indexes = self.persistentIndexList()
+        persistent_filenames = [
+            self._filenames[index.row()] for index in persistent_indexes
+        ]
+        keys: list[tuple[int, Any]] = []
+        filenames: list[str] = []
+        checked: list[bool] = []
+        start = 0
+        for key, filename, is_checked in new_entries:
+            end = bisect.bisect_right(self._keys, key, lo=start)
+            keys += self._keys[start:end]
+            filenames += self._filenames[start:end]
+            checked += self._checked[start:end]
+            keys.append(key)
+            filenames.append(filename)
+            checked.append(is_checked)
+            start = end
+        keys += self._keys[start:]
+        filenames += self._filenames[start:]
+        checked += self._checked[start:]
+        first = bisect.bisect_right(self._keys, new_entries[0][0])
+        self._keys = keys
+        self._filenames = filenames
+        self._checked = checked
+        for row in range(first, len(filenames)):
+            self._rows[filenames[row]] = row
+        self.changePersistentIndexList(
+            persistent_indexes,
+            [self.index(self._rows[filename]) for filename in persistent_filenames],
+        )
+        self.layoutChanged.emit()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._filenames = []
+        self._checked = []
+        self._keys = []
+        self._rows = {}
+        self._num_appended = 0
+        self.endResetModel()
+
+    def isChecked(self, filename: str) -> bool:
+        row = self.row(filename)
+        return row >= 0 and self._checked[row]
+
+    def setChecked(self, filename: str, checked: bool) -> None:
+        row = self.row(filename)
+        if row < 0 or self._checked[row] == checked:
+            return
+        self._checked[row] = checked
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])  # type: ignore[attr-defined]
+
+
+class _FileFilterProxyModel(QtCore.QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super(_FileFilterProxyModel, self).__init__(parent)
+        self._regex: Optional[re.Pattern] = None
+
+    def setRegex(self, regex: Optional[re.Pattern]) -> None:
+        self._regex = regex
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._regex is None:
+            return True
+        filename = self.sourceModel().filenames()[source_row]
+        return self._regex.search(filename) is not None
+
+
+class FileListWidget(QtWidgets.QListView):
+    """List view of a FileListModel with the QListWidget calls the app uses.
+
+    Rows are those of the files shown, which are all of them unless a filter
+    pattern is set.
+    """
+
+    itemSelectionChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super(FileListWidget, self).__init__(parent)
+        self._model = FileListModel(self)
+        self._proxy_model = _FileFilterProxyModel(self)
+        self._proxy_model.setSourceModel(self._model)
+        self.setModel(self._proxy_model)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.selectionModel().selectionChanged.connect(  # type: ignore[union-attr]
+            lambda selected, deselected: self.itemSelectionChanged.emit()
+        )
+
+        # Filtered filenames and their rows, built when first asked for.
+        self._regex: Optional[re.Pattern] = None
+        self._filtered_filenames: Optional[list[str]] = None
+        self._filtered_rows: Optional[dict[str, int]] = None
+        self._model.rowsInserted.connect(self._invalidateFiltered)
+        self._model.layoutChanged.connect(self._invalidateFiltered)
+        self._model.modelReset.connect(self._invalidateFiltered)
+
+    def _invalidateFiltered(self, *args) -> None:
+        self._filtered_filenames = None
+        self._filtered_rows = None
+
+    def setFilterPattern(self, pattern: str) -> None:
+        """Show only the files matching the regular expression, if valid."""
+        regex: Optional[re.Pattern] = None
+        if pattern:
+            try:
+                regex = re.compile(pattern)
+            except re.error:
+                pass
+        if regex == self._regex:
+            return
+        self._regex = regex
+        self._invalidateFiltered()
+        # Rows hidden or shown by the filter aren't a selection by the user.
+        self.blockSignals(True)
+        try:
+            self._proxy_model.setRegex(regex)
+        finally:
+            self.blockSignals(False)
+        if self.currentIndex().isValid():
+            self.scrollTo(self.currentIndex())
+
+    def setThumbnailLoader(
+        self, loader: Optional[ThumbnailLoader], size: int = 128
+    ) -> None:
+        """Show the files as a grid of thumbnails, or as a list if None."""
+        self._model.setThumbnailLoader(loader, size=size)
+        if loader is None:
+            self.setViewMode(QtWidgets.QListView.ListMode)
+            self.setWrapping(False)
+            self.setGridSize(QtCore.QSize())
+            self.setIconSize(QtCore.QSize())
+        else:
+            self.setViewMode(QtWidgets.QListView.IconMode)
+            self.setMovement(QtWidgets.QListView.Static)
+            self.setResizeMode(QtWidgets.QListView.Adjust)
+            self.setWrapping(True)
+            self.setIconSize(QtCore.QSize(size, size))
+            self.setGridSize(
+                QtCore.QSize(size + 16, size + 2 * self.fontMetrics().height())
+            )
+            self.setTextElideMode(Qt.ElideMiddle)  # type: ignore[attr-defined]
+        if self.currentIndex().isValid():
+            self.scrollTo(self.currentIndex())
+
+    def fileListModel(self) -> FileListModel:
+        return self._model
+
+    def count(self) -> int:
+        return self._proxy_model.rowCount()
+
+    def filenames(self) -> list[str]:
+        if self._regex is None:
+            return self._model.filenames()
+        if self._filtered_filenames is None:
+            regex = self._regex
+            self._filtered_filenames = [
+                filename
+                for filename in self._model.filenames()
+                if regex.search(filename)
+            ]
+        return self._filtered_filenames
+
+    def row(self, filename: str) -> int:
+        if self._regex is None:
+            return self._model.row(filename)
+        if self._filtered_rows is None:
+            self._filtered_rows = {
+                filename: row for row, filename in enumerate(self.filenames())
+            }
+        return self._filtered_rows.get(filename, -1)
+
+    def currentRow(self) -> int:
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row: int) -> None:
+        self.setCurrentIndex(self._proxy_model.index(row, 0))
+
+    def selectedFilename(self) -> Optional[str]:
+        indexes = self.selectionModel().selectedIndexes()  # type: ignore[union-attr]
+        if not indexes:
+            return None
+        row = self._proxy_model.mapToSource(indexes[0]).row()
+        return self._model.filenames()[row]
+
+    def addFiles(
+        self,
+        filenames: list[str],
+        checked: list[bool],
+        sort_keys: Optional[list[Any]] = None,
+    ) -> None:
+        self._model.addFiles(filenames, checked=checked, sort_keys=sort_keys)
+
+    def clear(self) -> None:
+        self._model.clear()
+
+    def isChecked(self, filename: str) -> bool:
+        return self._model.isChecked(filename)
+
+    def setChecked(self, filename: str, checked: bool) -> None:
+        self._model.setChecked(filename, checked=checked)
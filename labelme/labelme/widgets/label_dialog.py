@@ -75,8 +75,10 @@ class LabelDialog(QtWidgets.QDialog):
         if self._fit_to_content["column"]:
             self.labelList.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)  # type: ignore[attr-defined]
         self._sort_labels = sort_labels
+        self._labels: set[str] = set()
         if labels:
             self.labelList.addItems(labels)
+            self._labels.update(labels)
         if self._sort_labels:
             self.labelList.sortItems()
         else:
@@ -115,11 +117,24 @@ class LabelDialog(QtWidgets.QDialog):
         self.edit.setCompleter(completer)
 
     def addLabelHistory(self, label):
-        if self.labelList.findItems(label, QtCore.Qt.MatchExactly):  # type: ignore[attr-defined]
+        self.addLabelHistories([label])
+
+    def addLabelHistories(self, labels):
+        """Add the labels not in the list yet, sorting the list once."""
+        new_labels = []
+        for label in labels:
+            if label not in self._labels:
+                self._labels.add(label)
+                new_labels.append(label)
+        if not new_labels:
             return
-        self.labelList.addItem(label)
-        if self._sort_labels:
-            self.labelList.sortItems()
+        self.labelList.blockSignals(True)
+        try:
+            self.labelList.addItems(new_labels)
+            if self._sort_labels:
+                self.labelList.sortItems()
+        finally:
+            self.labelList.blockSignals(False)
 
     def labelSelected(self, item):
         self.edit.setText(item.text())
@@ -116,6 +116,9 @@ class LabelListWidget(QtWidgets.QListView):
         self._model: StandardItemModel = StandardItemModel()
         self._model.setItemPrototype(LabelListWidgetItem())  # type: ignore[union-attr]
         self.setModel(self._model)
+        # Items by id of their shape, for findItemByShape.
+        self._items_by_shape: dict[int, LabelListWidgetItem] = {}
+        self._model.rowsAboutToBeRemoved.connect(self._onRowsAboutToBeRemoved)
 
         self.setItemDelegate(HTMLDelegate())
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
@@ -158,10 +161,26 @@ class LabelListWidget(QtWidgets.QListView):
         self.scrollTo(self._model.indexFromItem(item))  # type: ignore[union-attr]
 
     def addItem(self, item):
-        if not isinstance(item, LabelListWidgetItem):
-            raise TypeError("item must be LabelListWidgetItem")
-        self._model.setItem(self._model.rowCount(), 0, item)  # type: ignore[union-attr]
-        item.setSizeHint(self.itemDelegate().sizeHint(None, None))  # type: ignore[arg-type,union-attr]
+        self.addItems([item])
+
+    def addItems(self, items):
+        """Append the items at once, which is faster than one by one."""
+        if not items:
+            return
+        size_hint = self.itemDelegate().sizeHint(None, None)  # type: ignore[arg-type,union-attr]
+        for item in items:
+            if not isinstance(item, LabelListWidgetItem):
+                raise TypeError("item must be LabelListWidgetItem")
+            item.setSizeHint(size_hint)
+            self._items_by_shape[id(item.shape())] = item
+        self._model.invisibleRootItem().appendRows(items)  # type: ignore[union-attr]
+
+    def _onRowsAboutToBeRemoved(self, parent, first, last):
+        for row in range(first, last + 1):
+            item = cast(LabelListWidgetItem, self._model.item(row, 0))  # type: ignore[union-attr]
+            key = id(item.shape())
+            if self._items_by_shape.get(key) is item:
+                del self._items_by_shape[key]
 
     def removeItem(self, item):
         index = self._model.indexFromItem(item)  # type: ignore[union-attr]
@@ -172,12 +191,15 @@ class LabelListWidget(QtWidgets.QListView):
         self.selectionModel().select(index, QtCore.QItemSelectionModel.Select)  # type: ignore[attr-defined,union-attr]
 
     def findItemByShape(self, shape):
-        for row in range(self._model.rowCount()):  # type: ignore[union-attr]
-            item = self._model.item(row, 0)  # type: ignore[union-attr]
-            item = cast(LabelListWidgetItem, item)
-            if item.shape() == shape:
-                return item
-        raise ValueError("cannot find shape: {}".format(shape))
+        item = self._items_by_shape.get(id(shape))
+        if item is None or item.shape() is not shape:
+            # Items moved by drag and drop are new ones, so index them again.
+            self._items_by_shape = {id(item.shape()): item for item in self}
+            item = self._items_by_shape.get(id(shape))
+        if item is None:
+            raise ValueError("cannot find shape: {}".format(shape))
+        return item
 
     def clear(self):
         self._model.clear()  # type: ignore[union-attr]
+        self._items_by_shape = {}
@@ -0,0 +1,121 @@
+import collections
+import concurrent.futures
+import os
+import threading
+from typing import Optional
+
+from loguru import logger
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+
+from labelme._thumbnail_cache import ThumbnailCache
+
+# Requests beyond this many are dropped, oldest first, as they're for rows
+# scrolled out of view by now.
+_MAX_PENDING = 256
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """Thumbnails made or read from a ThumbnailCache in worker threads.
+
+    The most recent requests are served first, as they're for what's on
+    screen now, and the loaded thumbnails are kept in memory up to
+    ``max_images``.
+    """
+
+    thumbnailLoaded = QtCore.pyqtSignal(str, int)
+    _loaded = QtCore.pyqtSignal(str, int, QtGui.QImage)
+
+    def __init__(self, cache: ThumbnailCache, max_images: int = 512, parent=None):
+        super(ThumbnailLoader, self).__init__(parent)
+        self._cache: ThumbnailCache = cache
+        self._max_images: int = max_images
+        self._images: collections.OrderedDict[tuple[str, int], QtGui.QImage] = (
+            collections.OrderedDict()
+        )
+
+        self._lock: threading.Lock = threading.Lock()
+        self._pending: collections.OrderedDict[tuple[str, int], None] = (
+            collections.OrderedDict()
+        )
+        self._in_flight: set[tuple[str, int]] = set()
+        self._num_workers: int = 0
+        self._max_workers: int = min(4, os.cpu_count() or 1)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_workers
+        )
+        self._loaded.connect(self._onLoaded)
+
+    def thumbnail(self, filename: str, size: int) -> Optional[QtGui.QImage]:
+        """Thumbnail if loaded, or None after requesting it.
+
+        The image is null if the file could not be read.
+        """
+        key = (filename, size)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+        self._request(key)
+        return None
+
+    def clear(self) -> None:
+        """Drop the requests not started yet."""
+        with self._lock:
+            self._pending.clear()
+
+    def _request(self, key: tuple[str, int]) -> None:
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._pending[key] = None
+            self._pending.move_to_end(key)
+            while len(self._pending) > _MAX_PENDING:
+                self._pending.popitem(last=False)
+            if self._num_workers >= self._max_workers:
+                return
+            self._num_workers += 1
+        self._executor.submit(self._work)
+
+    def _work(self) -> None:
+        # This runs in the worker threads, until no request is left.
+        key: Optional[tuple[str, int]] = None
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._num_workers -= 1
+                        return
+                    key, _ = self._pending.popitem(last=True)
+                    self._in_flight.add(key)
+                self._loaded.emit(key[0], key[1], self._load(key[0], key[1]))
+        except BaseException:
+            # Frees the slot and the request, so that loading goes on and the
+            # thumbnail can be requested again.
+            with self._lock:
+                self._num_workers -= 1
+                if key is not None:
+                    self._in_flight.discard(key)
+            raise
+
+    def _load(self, filename: str, size: int) -> QtGui.QImage:
+        image = QtGui.QImage()
+        try:
+            data: Optional[bytes] = self._cache.get_or_create(
+                filename=filename, size=size
+            )
+            if data is not None:
+                image.loadFromData(data)
+        except Exception:
+            logger.exception("Failed to load thumbnail of {!r}", filename)
+            return QtGui.QImage()
+        return image
+
+    def _onLoaded(self, filename: str, size: int, image: QtGui.QImage) -> None:
+        key = (filename, size)
+        with self._lock:
+            self._in_flight.discard(key)
+        self._images[key] = image
+        while len(self._images) > self._max_images:
+            self._images.popitem(last=False)
+        self.thumbnailLoaded.emit(filename, size)
@@ -0,0 +1,163 @@
+import collections
+import math
+from typing import Optional
+from typing import Union
+
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+
+import labelme.utils
+
+TILE_SIZE = 512
+CACHE_BYTES = 256 * 1024 * 1024
+
+
+class TiledImage(object):
+    """Tiled multi-resolution view of an image for drawing on the canvas.
+
+    Level ``k`` of the pyramid is the image downscaled by ``2 ** k``. Levels
+    and their tiles are built on first use, and the tiles are kept in an LRU
+    cache bounded by ``cache_bytes``, so only the part of the image that is
+    visible at the current zoom is ever converted to pixmaps.
+
+    It mimics the parts of the ``QPixmap`` API used by the canvas (``width``,
+    ``height``, ``size``, ``isNull``, ``toImage`` and truthiness).
+
+    With ``size``, the image is drawn stretched to that size, which is then
+    the size in canvas coordinates, e.g. for a downscaled preview.
+    """
+
+    def __init__(
+        self,
+        image: Optional[Union[QtGui.QImage, QtGui.QPixmap]] = None,
+        tile_size: int = TILE_SIZE,
+        cache_bytes: int = CACHE_BYTES,
+        size: Optional[QtCore.QSize] = None,
+    ):
+        if image is None:
+            image = QtGui.QImage()
+        elif isinstance(image, QtGui.QPixmap):
+            image = image.toImage()
+        self._image: QtGui.QImage = image
+        self._size: QtCore.QSize = image.size() if size is None else size
+        self._tile_size: int = tile_size
+        self._cache_bytes: int = cache_bytes
+
+        self._levels: list[QtGui.QImage] = [image]
+        self._tiles: collections.OrderedDict[tuple[int, int, int], QtGui.QPixmap] = (
+            collections.OrderedDict()
+        )
+        self._tiles_bytes: int = 0
+        self._digest: Optional[str] = None
+
+        num_levels = 1
+        longest_side = max(image.width(), image.height())
+        while (longest_side >> (num_levels - 1)) > tile_size:
+            num_levels += 1
+        self._num_levels: int = num_levels
+
+    def __bool__(self) -> bool:
+        return not self._image.isNull()
+
+    def isNull(self) -> bool:
+        return self._image.isNull()
+
+    def width(self) -> int:
+        return self._size.width()
+
+    def height(self) -> int:
+        return self._size.height()
+
+    def size(self) -> QtCore.QSize:
+        return QtCore.QSize(self._size)
+
+    def toImage(self) -> QtGui.QImage:
+        return self._image
+
+    def digest(self) -> str:
+        """Content digest of the image, computed once and then reused."""
+        if self._digest is None:
+            self._digest = labelme.utils.img_qt_to_digest(self._image)
+        return self._digest
+
+    @property
+    def num_levels(self) -> int:
+        return self._num_levels
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._tiles_bytes
+
+    def level_for_scale(self, scale: float) -> int:
+        if scale >= 1:
+            return 0
+        level = int(math.floor(math.log2(1.0 / scale)))
+        return min(level, self._num_levels - 1)
+
+    def _get_level(self, level: int) -> QtGui.QImage:
+        while len(self._levels) <= level:
+            prev = self._levels[-1]
+            self._levels.append(
+                prev.scaled(
+                    max(1, prev.width() // 2),
+                    max(1, prev.height() // 2),
+                    QtCore.Qt.IgnoreAspectRatio,  # type: ignore[attr-defined]
+                    QtCore.Qt.SmoothTransformation,  # type: ignore[attr-defined]
+                )
+            )
+        return self._levels[level]
+
+    def _get_tile(self, level: int, col: int, row: int) -> QtGui.QPixmap:
+        key = (level, col, row)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        image = self._get_level(level)
+        size = self._tile_size
+        rect = QtCore.QRect(col * size, row * size, size, size).intersected(
+            image.rect()
+        )
+        tile = QtGui.QPixmap.fromImage(image.copy(rect))
+        self._tiles[key] = tile
+        self._tiles_bytes += _get_pixmap_bytes(tile)
+
+        while self._tiles_bytes > self._cache_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._tiles_bytes -= _get_pixmap_bytes(evicted)
+        return tile
+
+    def draw(self, painter: QtGui.QPainter, rect: QtCore.QRectF, scale: float) -> None:
+        """Draw the tiles covering ``rect``, given in image coordinates."""
+        rect = rect.intersected(QtCore.QRectF(0, 0, self.width(), self.height()))
+        if self.isNull() or rect.isEmpty():
+            return
+
+        level = self.level_for_scale(scale)
+        image = self._get_level(level)
+        fx = self.width() / image.width()
+        fy = self.height() / image.height()
+
+        size = self._tile_size
+        num_cols = (image.width() + size - 1) // size
+        num_rows = (image.height() + size - 1) // size
+        col_min = max(0, int(rect.left() / fx) // size)
+        col_max = min(num_cols - 1, int(math.ceil(rect.right() / fx)) // size)
+        row_min = max(0, int(rect.top() / fy) // size)
+        row_max = min(num_rows - 1, int(math.ceil(rect.bottom() / fy)) // size)
+
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                tile = self._get_tile(level=level, col=col, row=row)
+                target = QtCore.QRectF(
+                    col * size * fx,
+                    row * size * fy,
+                    tile.width() * fx,
+                    tile.height() * fy,
+                )
+                painter.drawPixmap(target, tile, QtCore.QRectF(tile.rect()))
+
+
+def _get_pixmap_bytes(pixmap: QtGui.QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
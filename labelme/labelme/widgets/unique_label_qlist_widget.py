@@ -9,16 +9,20 @@ from .escapable_qlist_widget import EscapableQListWidget
 
 
 class UniqueLabelQListWidget(EscapableQListWidget):
+    def __init__(self, parent=None):
+        super(UniqueLabelQListWidget, self).__init__(parent)
+        self._items_by_label: dict[str, QtWidgets.QListWidgetItem] = {}
+
     def mousePressEvent(self, event):
         super(UniqueLabelQListWidget, self).mousePressEvent(event)
         if not self.indexAt(event.pos()).isValid():
             self.clearSelection()
 
     def findItemByLabel(self, label):
-        for row in range(self.count()):
-            item = self.item(row)
-            if item.data(Qt.UserRole) == label:  # type: ignore[attr-defined,union-attr]
-                return item
+        item = self._items_by_label.get(label)
+        if item is not None and item.listWidget() is self:
+            return item
+        return None
 
     def createItemFromLabel(self, label):
         if self.findItemByLabel(label):
@@ -26,8 +30,13 @@ class UniqueLabelQListWidget(EscapableQListWidget):
 
         item = QtWidgets.QListWidgetItem()
         item.setData(Qt.UserRole, label)  # type: ignore[attr-defined]
+        self._items_by_label[label] = item
         return item
 
+    def clear(self):
+        super(UniqueLabelQListWidget, self).clear()
+        self._items_by_label = {}
+
     def setItemLabel(self, item, label, color=None):
         qlabel = QtWidgets.QLabel()
         if color is None:
@@ -0,0 +1,42 @@
+import numpy as np
+
+from labelme._automation import bbox_from_text
+
+
+def test_nms_new_bboxes():
+    boxes = np.array(
+        [
+            [0, 0, 10, 10],  # overlaps the existing "a" box
+            [1, 1, 11, 11],  # overlaps it too, but is of "b"
+            [50, 50, 60, 60],
+        ],
+        dtype=np.float32,
+    )
+    boxes, scores, labels = bbox_from_text.nms_new_bboxes(
+        boxes=boxes,
+        scores=np.array([0.9, 0.8, 0.7], dtype=np.float32),
+        labels=np.array([0, 1, 0], dtype=np.int32),
+        existing_boxes=np.array([[0, 0, 10, 10]], dtype=np.float32),
+        existing_labels=np.array([0], dtype=np.int32),
+        iou_threshold=0.5,
+        score_threshold=0.1,
+        max_num_detections=100,
+    )
+    order = np.argsort(-scores)
+    assert boxes[order].tolist() == [[1, 1, 11, 11], [50, 50, 60, 60]]
+    assert labels[order].tolist() == [1, 0]
+    np.testing.assert_allclose(scores[order], [0.8, 0.7])
+
+
+def test_nms_new_bboxes_empty():
+    boxes, scores, labels = bbox_from_text.nms_new_bboxes(
+        boxes=np.empty((0, 4), dtype=np.float32),
+        scores=np.empty((0,), dtype=np.float32),
+        labels=np.empty((0,), dtype=np.int32),
+        existing_boxes=np.empty((0, 4), dtype=np.float32),
+        existing_labels=np.empty((0,), dtype=np.int32),
+        iou_threshold=0.5,
+        score_threshold=0.1,
+        max_num_detections=100,
+    )
+    assert len(boxes) == len(scores) == len(labels) == 0
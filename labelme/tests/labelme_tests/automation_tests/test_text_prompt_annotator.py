@@ -0,0 +1,184 @@
+import base64
+import json
+import os
+import os.path as osp
+import types
+
+import PIL.Image
+import pytest
+
+from labelme._automation.text_prompt_annotator import TextPromptAnnotator
+from labelme.label_file import LabelFile
+
+
+class _StubModel:
+    """Detects the same boxes in any image, as (xmin, ymin, xmax, ymax, score, text)."""
+
+    name = "stub"
+
+    def __init__(self, detections):
+        self.detections = detections
+        self.num_calls = 0
+
+    def generate(self, request):
+        self.num_calls += 1
+        return types.SimpleNamespace(
+            annotations=[
+                types.SimpleNamespace(
+                    bounding_box=types.SimpleNamespace(
+                        xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax
+                    ),
+                    score=score,
+                    text=text,
+                )
+                for xmin, ymin, xmax, ymax, score, text in self.detections
+            ]
+        )
+
+
+def _make_annotator(detections, **kwargs):
+    annotator = TextPromptAnnotator(
+        model_name="stub",
+        texts=["dog", "cat"],
+        iou_threshold=0.5,
+        score_threshold=0.1,
+        **kwargs,
+    )
+    annotator._model = _StubModel(detections)  # type: ignore[assignment]
+    return annotator
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    filename = tmp_path / "images" / "image.jpg"
+    filename.parent.mkdir()
+    PIL.Image.new("RGB", (80, 60)).save(filename)
+    return str(filename)
+
+
+def _save_label_file(label_file, shapes, imagePath="image.jpg", imageData=None):
+    LabelFile().save(
+        filename=label_file,
+        shapes=shapes,
+        imagePath=imagePath,
+        imageData=imageData,
+        imageHeight=60,
+        imageWidth=80,
+        otherData={"extra": 1},
+        flags={"checked": True},
+    )
+
+
+def test_annotate_file_writes_label_file(image_file, tmp_path):
+    annotator = _make_annotator(
+        [(0, 0, 10, 10, 0.9, "dog"), (20, 20, 40, 40, 0.8, "cat")],
+        flags={"checked": False},
+    )
+    label_file = str(tmp_path / "labels" / "image.json")
+
+    assert annotator.annotate_file(image_file, label_file=label_file) == "written"
+
+    with open(label_file) as f:
+        data = json.load(f)
+    assert data["imagePath"] == "../images/image.jpg"
+    assert data["imageData"] is None
+    assert (data["imageHeight"], data["imageWidth"]) == (60, 80)
+    assert data["flags"] == {"checked": False}
+    shapes = sorted(data["shapes"], key=lambda shape: shape["label"])
+    assert [shape["label"] for shape in shapes] == ["cat", "dog"]
+    assert shapes[0]["shape_type"] == "rectangle"
+    assert shapes[0]["points"] == [[20, 20], [40, 40]]
+    assert json.loads(shapes[0]["description"]) == {
+        "score": pytest.approx(0.8),
+        "text": "cat",
+    }
+    assert LabelFile(label_file).shapes  # it loads back
+
+
+def test_annotate_file_skips_labeled(image_file, tmp_path):
+    annotator = _make_annotator([(0, 0, 10, 10, 0.9, "dog")])
+    label_file = str(tmp_path / "images" / "image.json")
+    _save_label_file(label_file, shapes=[])
+    with open(label_file) as f:
+        before = f.read()
+
+    assert annotator.annotate_file(image_file, label_file=label_file) == "skipped"
+
+    with open(label_file) as f:
+        assert f.read() == before
+    assert annotator._model.num_calls == 0  # type: ignore[union-attr]
+
+
+def test_annotate_file_adds_to_labeled(image_file, tmp_path):
+    annotator = _make_annotator(
+        [
+            (1, 1, 11, 11, 0.9, "dog"),  # the same as the existing dog box
+            (1, 1, 11, 11, 0.8, "cat"),
+            (40, 40, 50, 50, 0.7, "dog"),
+        ],
+        store_data=True,
+    )
+    label_file = str(tmp_path / "images" / "image.json")
+    existing_shapes = [
+        dict(
+            label="dog",
+            points=[[0, 0], [10, 10]],
+            group_id=None,
+            description="",
+            shape_type="rectangle",
+            flags={},
+            mask=None,
+        ),
+        dict(
+            label="tail",
+            points=[[0, 0], [5, 5], [0, 5]],
+            group_id=1,
+            description="",
+            shape_type="polygon",
+            flags={},
+            mask=None,
+        ),
+    ]
+    _save_label_file(label_file, shapes=existing_shapes)
+
+    assert (
+        annotator.annotate_file(image_file, label_file=label_file, overwrite=True)
+        == "written"
+    )
+
+    with open(label_file) as f:
+        data = json.load(f)
+    assert data["shapes"][:2] == existing_shapes
+    added = sorted((shape["label"], shape["points"]) for shape in data["shapes"][2:])
+    assert added == [("cat", [[1, 1], [11, 11]]), ("dog", [[40, 40], [50, 50]])]
+    assert data["flags"] == {"checked": True}
+    assert data["extra"] == 1
+    assert data["imagePath"] == "image.jpg"
+    assert data["imageData"] is None
+
+
+def test_annotate_file_keeps_image_of_labeled(image_file, tmp_path):
+    annotator = _make_annotator([(40, 40, 50, 50, 0.7, "dog")], store_data=False)
+    label_file = str(tmp_path / "labels" / "image.json")
+    os.makedirs(osp.dirname(label_file))
+    with open(image_file, "rb") as f:
+        image_data = f.read()
+    _save_label_file(label_file, shapes=[], imagePath=image_file, imageData=image_data)
+
+    assert (
+        annotator.annotate_file(image_file, label_file=label_file, overwrite=True)
+        == "written"
+    )
+
+    with open(label_file) as f:
+        data = json.load(f)
+    assert data["imagePath"] == image_file
+    assert base64.b64decode(data["imageData"]) == image_data
+
+
+def test_annotate_file_no_detections(image_file, tmp_path):
+    annotator = _make_annotator([(0, 0, 10, 10, 0.05, "dog")])
+    label_file = str(tmp_path / "images" / "image.json")
+
+    assert annotator.annotate_file(image_file, label_file=label_file) == "no_detections"
+    assert not (tmp_path / "images" / "image.json").exists()
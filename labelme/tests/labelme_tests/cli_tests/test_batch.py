@@ -0,0 +1,89 @@
+import concurrent.futures
+import os.path as osp
+import sys
+
+import PIL.Image
+import pytest
+
+from labelme.cli import _batch
+from labelme.cli import draw_json
+
+from .util import make_label_file
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+    return str(path)
+
+
+def test_expand_inputs(tmp_path):
+    b = _touch(tmp_path / "d" / "b" / "label.png")
+    a = _touch(tmp_path / "d" / "a" / "label.png")
+    _touch(tmp_path / "d" / "a" / "image.png")
+    c = _touch(tmp_path / "c_label.png")
+    (tmp_path / "e_label.png").mkdir()
+
+    assert _batch.expand_inputs(
+        [
+            str(tmp_path / "*label.png"),
+            str(tmp_path / "d"),
+            a,  # duplicate
+            str(tmp_path / "missing"),
+        ],
+        suffix="label.png",
+    ) == [c, a, b]
+
+
+def test_get_out_files(tmp_path):
+    filenames = [
+        str(tmp_path / "x" / "1" / "a.json"),
+        str(tmp_path / "y" / "b.json"),
+    ]
+    assert _batch.get_out_files(filenames, out_dir="out", ext=".jpg") == [
+        osp.join("out", "x", "1", "a.jpg"),
+        osp.join("out", "y", "b.jpg"),
+    ]
+
+
+def _fail_on_b(name):
+    if name == "b":
+        raise ValueError(name)
+
+
+def test_run_all():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        assert (
+            _batch.run_all(
+                executor,
+                _fail_on_b,
+                {name: dict(name=name) for name in ["a", "b", "c"]},
+            )
+            == 1
+        )
+
+
+def test_draw_json_out(tmp_path, monkeypatch):
+    make_label_file(str(tmp_path / "labels" / "a.json"), labels=["dog"])
+    make_label_file(str(tmp_path / "labels" / "sub" / "b.json"), labels=["cat"])
+    out_dir = tmp_path / "out"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["labelme_draw_json", str(tmp_path / "labels"), "-o", str(out_dir), "-j", "1"],
+    )
+
+    draw_json.main()
+
+    for out_file in [out_dir / "a.jpg", out_dir / "sub" / "b.jpg"]:
+        width, height = PIL.Image.open(out_file).size
+        assert width > 2 * 40 and height == 30  # image and label side by side
+
+
+def test_draw_json_multiple_without_out(tmp_path, monkeypatch):
+    make_label_file(str(tmp_path / "a.json"), labels=["dog"])
+    make_label_file(str(tmp_path / "b.json"), labels=["cat"])
+    monkeypatch.setattr(sys, "argv", ["labelme_draw_json", str(tmp_path)])
+
+    with pytest.raises(SystemExit):
+        draw_json.main()
@@ -0,0 +1,46 @@
+import os
+import os.path as osp
+
+import numpy as np
+import PIL.Image
+
+from labelme.cli import export_json
+
+from .util import make_label_file
+
+
+def test_export_dir(tmp_path):
+    json_dir = tmp_path / "labels"
+    out_dir = tmp_path / "export"
+    make_label_file(str(json_dir / "a.json"), labels=["dog"])
+    image_file = make_label_file(
+        str(json_dir / "sub" / "b.json"), labels=["cat", "dog"]
+    )
+    (json_dir / "annotations.json").write_text('{"images": []}')  # not labelme's
+
+    assert export_json._export_dir(
+        json_dir=str(json_dir), out_dir=str(out_dir), compress_level=1, num_workers=2
+    ) == (2, 0, 1)
+
+    # One label table for all files.
+    label_names = ["_background_", "cat", "dog"]
+    for label_names_file in [
+        out_dir / "label_names.txt",
+        out_dir / "a" / "label_names.txt",
+        out_dir / "sub" / "b" / "label_names.txt",
+    ]:
+        assert label_names_file.read_text().splitlines() == label_names
+    label_a = np.asarray(PIL.Image.open(out_dir / "a" / "label.png"))
+    label_b = np.asarray(PIL.Image.open(out_dir / "sub" / "b" / "label.png"))
+    assert np.unique(label_a).tolist() == [0, 2]
+    assert np.unique(label_b).tolist() == [0, 1, 2]
+
+    # Up-to-date outputs are skipped, but not those of a changed image.
+    assert export_json._export_dir(
+        json_dir=str(json_dir), out_dir=str(out_dir), compress_level=1, num_workers=2
+    ) == (0, 2, 1)
+    mtime = osp.getmtime(out_dir / "sub" / "b" / "label.png")
+    os.utime(image_file, (mtime + 10, mtime + 10))
+    assert export_json._export_dir(
+        json_dir=str(json_dir), out_dir=str(out_dir), compress_level=1, num_workers=2
+    ) == (1, 1, 1)
@@ -0,0 +1,32 @@
+import os
+
+import PIL.Image
+
+from labelme.label_file import LabelFile
+
+
+def make_label_file(json_file, labels, image_size=(40, 30)):
+    """Label file with a box per label, and its image next to it."""
+    os.makedirs(os.path.dirname(json_file), exist_ok=True)
+    image_file = os.path.splitext(json_file)[0] + ".png"
+    PIL.Image.new("RGB", image_size, (128, 128, 128)).save(image_file)
+    shapes = [
+        dict(
+            label=label,
+            points=[[2 + 6 * i, 2], [6 + 6 * i, 10]],
+            group_id=None,
+            description="",
+            shape_type="rectangle",
+            flags={},
+            mask=None,
+        )
+        for i, label in enumerate(labels)
+    ]
+    LabelFile().save(
+        filename=json_file,
+        shapes=shapes,
+        imagePath=os.path.basename(image_file),
+        imageHeight=image_size[1],
+        imageWidth=image_size[0],
+    )
+    return image_file
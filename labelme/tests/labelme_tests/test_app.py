@@ -1,8 +1,15 @@
+import os
 import os.path as osp
 import shutil
 import tempfile
+import threading
+import time
+import types
 
+import PIL.Image
 import pytest
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
 from PyQt5.QtCore import QPoint
 from PyQt5.QtCore import Qt
 from PyQt5.QtCore import QTimer
@@ -84,6 +91,317 @@ def test_MainWindow_openNextAndPrevImg(qtbot: QtBot) -> None:
     assert osp.basename(win.imagePath) == first_image_name
 
 
+@pytest.mark.gui
+def test_MainWindow_open_dir_opens_first_sorted(
+    qtbot: QtBot, tmp_path, monkeypatch
+) -> None:
+    names = ["img10.jpg", "img2.jpg", "img1.jpg", "img03.jpg"]
+    for name in names:
+        PIL.Image.new("RGB", (32, 24)).save(tmp_path / name)
+
+    def iter_image_files(dirpath, extensions):
+        # Found out of order, and slowly enough to be listed in batches.
+        for name in names:
+            yield str(tmp_path / name)
+            time.sleep(0.15)
+
+    monkeypatch.setattr(labelme.app, "_iter_image_files", iter_image_files)
+
+    win: labelme.app.MainWindow = labelme.app.MainWindow(filename=str(tmp_path))
+    qtbot.addWidget(win)
+    _show_window_and_wait_for_imagedata(qtbot=qtbot, win=win)
+
+    assert osp.basename(win.imagePath) == "img1.jpg"
+    assert [osp.basename(filename) for filename in win.imageList] == [
+        "img1.jpg",
+        "img2.jpg",
+        "img03.jpg",
+        "img10.jpg",
+    ]
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_ai_annotate_cancelled_status(qtbot: QtBot) -> None:
+    win: labelme.app.MainWindow = labelme.app.MainWindow()
+    qtbot.addWidget(win)
+    job = labelme.app._AiAnnotateJob(
+        annotator=None,  # type: ignore[arg-type]
+        filenames=["a.jpg", "b.jpg", "c.jpg"],
+        progress=QtWidgets.QProgressDialog(win),
+    )
+    win._ai_annotate_job = job
+    win._onAiAnnotateProgress(job, "a.jpg", "skipped")
+    job.cancelled.set()
+    win._onAiAnnotateProgress(job, "b.jpg", "cancelled")
+    win._onAiAnnotateProgress(job, "c.jpg", "cancelled")
+
+    assert win._ai_annotate_job is None
+    message = win.statusBar().currentMessage()
+    assert message.startswith("Cancelled")
+    assert "1 skipped" in message
+    assert "2 cancelled" in message
+    win.close()
+
+
+def _load_file_and_wait(qtbot: QtBot, win: labelme.app.MainWindow, filename) -> None:
+    win.loadFile(str(filename))
+    qtbot.waitUntil(lambda: not win.image.isNull())
+
+
+@pytest.mark.gui
+def test_MainWindow_loadFile_drops_superseded(
+    qtbot: QtBot, tmp_path, monkeypatch
+) -> None:
+    for name, size in [("a.jpg", (16, 12)), ("b.jpg", (32, 24)), ("c.jpg", (64, 48))]:
+        PIL.Image.new("RGB", size).save(tmp_path / name)
+
+    win: labelme.app.MainWindow = labelme.app.MainWindow()
+    qtbot.addWidget(win)
+    win.show()
+    _load_file_and_wait(qtbot, win, tmp_path / "a.jpg")
+
+    loaded_sizes = []
+    load_pixmap = win.canvas.loadPixmap
+
+    def load_pixmap_and_record(pixmap, *args, **kwargs):
+        loaded_sizes.append((pixmap.width(), pixmap.height()))
+        load_pixmap(pixmap, *args, **kwargs)
+
+    monkeypatch.setattr(win.canvas, "loadPixmap", load_pixmap_and_record)
+
+    win.loadFile(str(tmp_path / "b.jpg"))
+    assert not win.actions.fitWindow.isEnabled()
+    win.resize(win.width() + 10, win.height())  # scales to no image
+    win.loadFile(str(tmp_path / "c.jpg"))
+    win.resize(win.width() + 10, win.height())
+    qtbot.waitUntil(lambda: not win.image.isNull())
+    qtbot.wait(100)  # for b's result, if it were to be shown
+
+    assert loaded_sizes == [(64, 48)]
+    assert win.filename == str(tmp_path / "c.jpg")
+    assert win.actions.fitWindow.isEnabled()
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_loadFile_bad_label_file(
+    qtbot: QtBot, tmp_path, monkeypatch
+) -> None:
+    PIL.Image.new("RGB", (16, 12)).save(tmp_path / "a.jpg")
+    PIL.Image.new("RGB", (16, 12)).save(tmp_path / "b.jpg")
+    (tmp_path / "b.json").write_text("{")
+
+    win: labelme.app.MainWindow = labelme.app.MainWindow()
+    qtbot.addWidget(win)
+    errors = []
+    monkeypatch.setattr(
+        win, "errorMessage", lambda title, message: errors.append(message)
+    )
+    win.show()
+    _load_file_and_wait(qtbot, win, tmp_path / "a.jpg")
+
+    win.loadFile(str(tmp_path / "b.jpg"))
+    qtbot.waitUntil(lambda: len(errors) == 1)
+
+    assert str(tmp_path / "b.json") in errors[0]
+    assert win.filename is None
+    assert win.image.isNull()
+    assert win.canvas.pixmap is None
+    win.resize(win.width() + 10, win.height())
+    win.close()
+
+
+def _open_dir_with_file_prefetch(
+    qtbot: QtBot, dirpath, count: int, memory_mb: float = 512
+) -> labelme.app.MainWindow:
+    for i in range(4):
+        PIL.Image.new("RGB", (64, 48)).save(osp.join(dirpath, "img%d.jpg" % i))
+    config: dict = labelme.config.get_default_config()
+    config["file_prefetch"] = dict(count=count, memory_mb=memory_mb)
+    win: labelme.app.MainWindow = labelme.app.MainWindow(
+        config=config, filename=str(dirpath)
+    )
+    qtbot.addWidget(win)
+    _show_window_and_wait_for_imagedata(qtbot=qtbot, win=win)
+    return win
+
+
+def _get_prefetched_files(win: labelme.app.MainWindow) -> set[str]:
+    with win._file_prefetch_lock:
+        return {filename for filename, _ in win._file_prefetch_cache}
+
+
+@pytest.mark.gui
+def test_MainWindow_prefetch_files(qtbot: QtBot, tmp_path, monkeypatch) -> None:
+    win = _open_dir_with_file_prefetch(qtbot, tmp_path, count=1)
+    filenames = win.imageList
+    qtbot.waitUntil(lambda: _get_prefetched_files(win) == {filenames[1]})
+
+    read_files: list[str] = []
+    read_file = labelme.app._read_file
+
+    def read_file_and_record(filename, output_dir):
+        read_files.append(filename)
+        return read_file(filename, output_dir=output_dir)
+
+    monkeypatch.setattr(labelme.app, "_read_file", read_file_and_record)
+
+    for i in [1, 2]:
+        read_files.clear()
+        win.openNextImg()
+        qtbot.waitUntil(lambda: win.imagePath == filenames[i])
+        assert filenames[i] not in read_files  # taken from the prefetched ones
+        # The files beyond the count are evicted.
+        qtbot.waitUntil(
+            lambda: _get_prefetched_files(win) == {filenames[i - 1], filenames[i + 1]}
+        )
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_prefetch_files_memory_budget(qtbot: QtBot, tmp_path) -> None:
+    # Room for one 64x48 image, decoded and encoded, but not for two.
+    win = _open_dir_with_file_prefetch(qtbot, tmp_path, count=2, memory_mb=0.015)
+    filenames = win.imageList
+    qtbot.waitUntil(lambda: not win._file_prefetch_pending)
+
+    assert _get_prefetched_files(win) == {filenames[1]}
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_prefetch_files_modified(qtbot: QtBot, tmp_path) -> None:
+    win = _open_dir_with_file_prefetch(qtbot, tmp_path, count=1)
+    filenames = win.imageList
+    qtbot.waitUntil(lambda: _get_prefetched_files(win) == {filenames[1]})
+
+    PIL.Image.new("RGB", (80, 60)).save(filenames[1])
+    mtime = time.time() + 10
+    os.utime(filenames[1], (mtime, mtime))
+    win.openNextImg()
+    qtbot.waitUntil(lambda: win.imagePath == filenames[1])
+
+    assert (win.image.width(), win.image.height()) == (80, 60)
+    win.close()
+
+
+def _open_with_autosave(qtbot: QtBot, tmp_path) -> labelme.app.MainWindow:
+    for name in ["a.jpg", "b.jpg"]:
+        PIL.Image.new("RGB", (16, 12)).save(tmp_path / name)
+    config: dict = labelme.config.get_default_config()
+    config["auto_save"] = True
+    win: labelme.app.MainWindow = labelme.app.MainWindow(
+        config=config, filename=str(tmp_path / "a.jpg")
+    )
+    qtbot.addWidget(win)
+    _show_window_and_wait_for_imagedata(qtbot=qtbot, win=win)
+    return win
+
+
+@pytest.mark.gui
+def test_MainWindow_autosave_coalesces(qtbot: QtBot, tmp_path, monkeypatch) -> None:
+    win = _open_with_autosave(qtbot, tmp_path)
+    saved_files: list[str] = []
+    save = labelme.app.LabelFile.save
+
+    def save_and_record(self, filename, *args, **kwargs):
+        saved_files.append(filename)
+        save(self, filename, *args, **kwargs)
+
+    monkeypatch.setattr(labelme.app.LabelFile, "save", save_and_record)
+
+    for _ in range(5):
+        win.setDirty()
+    qtbot.waitUntil(lambda: len(saved_files) > 0)
+    qtbot.wait(win._autosave_timer.interval() + 100)
+
+    assert saved_files == [str(tmp_path / "a.json")]
+    assert win.labelFile is not None
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_autosave_flushed(qtbot: QtBot, tmp_path) -> None:
+    win = _open_with_autosave(qtbot, tmp_path)
+
+    win.setDirty()
+    win.loadFile(str(tmp_path / "b.jpg"))
+    assert (tmp_path / "a.json").exists()  # saved before b loads
+    qtbot.waitUntil(lambda: win.imagePath == str(tmp_path / "b.jpg"))
+
+    win.setDirty()
+    win.close()
+    assert (tmp_path / "b.json").exists()
+
+
+@pytest.mark.gui
+def test_MainWindow_autosave_error(qtbot: QtBot, tmp_path, monkeypatch) -> None:
+    win = _open_with_autosave(qtbot, tmp_path)
+    errors: list[tuple[str, threading.Thread]] = []
+    monkeypatch.setattr(
+        win,
+        "errorMessage",
+        lambda title, message: errors.append((message, threading.current_thread())),
+    )
+
+    def save(self, filename, *args, **kwargs):
+        raise labelme.app.LabelFileError("disk full")
+
+    monkeypatch.setattr(labelme.app.LabelFile, "save", save)
+
+    win.setDirty()
+    qtbot.waitUntil(lambda: len(errors) > 0)
+
+    assert errors == [("<b>disk full</b>", threading.main_thread())]
+    win.close()
+
+
+@pytest.mark.gui
+def test_MainWindow_embedding_prefetch_uses_prefetched_files(
+    qtbot: QtBot, tmp_path, monkeypatch
+) -> None:
+    output_dir = str(tmp_path / "output")
+    filenames = [str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")]
+    for filename in filenames:
+        PIL.Image.new("RGB", (32, 24)).save(filename)
+
+    win: labelme.app.MainWindow = labelme.app.MainWindow()
+    qtbot.addWidget(win)
+    prefetched = labelme.app._read_file(filenames[0], output_dir=output_dir)
+    win._file_prefetch_cache[(filenames[0], output_dir)] = prefetched
+
+    read_files: list[str] = []
+    read_file = labelme.app._read_file
+
+    def read_file_and_record(filename, output_dir):
+        read_files.append(filename)
+        return read_file(filename, output_dir=output_dir)
+
+    monkeypatch.setattr(labelme.app, "_read_file", read_file_and_record)
+    images: list[QtGui.QImage] = []
+    monkeypatch.setattr(
+        win.canvas,
+        "prefetch_image_embedding",
+        lambda image, image_digest: images.append(image),
+    )
+
+    current = QtGui.QImage(8, 8, QtGui.QImage.Format_RGB888)
+    win._run_image_embedding_prefetch(
+        image=types.SimpleNamespace(toImage=lambda: current, digest=lambda: "x"),  # type: ignore[arg-type]
+        filenames=filenames,
+        output_dir=output_dir,
+        stop=threading.Event(),
+    )
+
+    assert read_files == [filenames[1]]
+    assert images[0] is current
+    assert images[1] is prefetched.image
+    assert images[2].size() == prefetched.image.size()
+    assert (filenames[0], output_dir) in win._file_prefetch_cache  # left for loading
+    win.close()
+
+
 @pytest.mark.gui
 def test_MainWindow_annotate_jpg(qtbot: QtBot) -> None:
     tmp_dir: str = tempfile.mkdtemp()
@@ -139,3 +457,19 @@ def test_MainWindow_annotate_jpg(qtbot: QtBot) -> None:
 
     labelme.testing.assert_labelfile_sanity(out_file)
     shutil.rmtree(tmp_dir)
+
+
+def test_has_label_files(tmp_path) -> None:
+    (tmp_path / "a.jpg").touch()
+    (tmp_path / "a.json").touch()
+    (tmp_path / "b.jpg").touch()
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    (output_dir / "b.json").touch()
+
+    filenames = [str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")]
+    assert labelme.app._has_label_files(filenames, output_dir=None) == [True, False]
+    assert labelme.app._has_label_files(filenames, output_dir=str(output_dir)) == [
+        False,
+        True,
+    ]
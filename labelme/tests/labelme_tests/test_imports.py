@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module,lazy_modules",
+    [
+        ("labelme.__main__", ["osam", "skimage", "imgviz", "natsort", "matplotlib"]),
+        ("labelme.cli.draw_json", ["matplotlib"]),
+        ("labelme.cli.draw_label_png", ["matplotlib"]),
+    ],
+)
+def test_lazy_imports(module, lazy_modules):
+    code = (
+        f"import sys; import {module}; "
+        f"print([m for m in {lazy_modules!r} if m in sys.modules])"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    assert output.strip() == "[]"
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "labelme",
+        "labelme.label_file",
+        "labelme.utils",
+        "labelme.cli.draw_json",
+        "labelme.cli.draw_label_png",
+        "labelme.cli.export_json",
+    ],
+)
+def test_headless_imports(module):
+    # Importing PyQt5 fails as if it were not installed.
+    code = f"import sys; sys.modules['PyQt5'] = None; import {module}"
+    subprocess.check_call([sys.executable, "-c", code])
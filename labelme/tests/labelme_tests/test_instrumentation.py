@@ -0,0 +1,15 @@
+from labelme import _instrumentation
+
+
+def test_Histogram():
+    histogram = _instrumentation.Histogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.summary() == "n=0"
+
+    for msec in [0.5, 3, 3, 3, 12000]:
+        histogram.add(msec)
+    assert histogram.count == 5
+    assert histogram.max_msec == 12000
+    assert histogram.percentile(50) == 4
+    assert histogram.percentile(100) == 12000
+    assert histogram.format_counts() == "<=1ms:1 <=4ms:3 >5000ms:1"
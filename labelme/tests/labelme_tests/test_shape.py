@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+
+from labelme.shape import Shape
+from labelme.shape import get_shape_colors
+
+
+def _make_shape(label, colors):
+    shape = Shape(label=label, shape_type="polygon")
+    shape.points = [QtCore.QPointF(0, 0), QtCore.QPointF(10, 0), QtCore.QPointF(5, 5)]
+    shape.point_labels = [1, 1, 1]
+    (
+        shape.line_color,
+        shape.vertex_fill_color,
+        shape.hvertex_fill_color,
+        shape.fill_color,
+        shape.select_line_color,
+        shape.select_fill_color,
+    ) = colors
+    shape.close()
+    return shape
+
+
+def test_Shape_colors_shared():
+    assert get_shape_colors(r=1, g=2, b=3) is get_shape_colors(r=1, g=2, b=3)
+
+    a = _make_shape("a", get_shape_colors(r=1, g=2, b=3))
+    b = _make_shape("b", get_shape_colors(r=1, g=2, b=3))
+    assert a.fill_color is b.fill_color
+    assert a.copy().fill_color is a.fill_color
+
+    # Changing a shape's color replaces it, leaving the shared one as is.
+    a.fill_color = QtGui.QColor(a.fill_color)
+    a.fill_color.setAlpha(64)
+    assert b.fill_color.alpha() == 128
+    assert get_shape_colors(r=1, g=2, b=3)[3].alpha() == 128
+
+
+def test_Shape_highlightSettings_shared():
+    a = _make_shape("a", get_shape_colors(r=1, g=2, b=3))
+    b = _make_shape("b", get_shape_colors(r=1, g=2, b=3))
+    assert a._highlightSettings is b._highlightSettings
+
+    a.highlightVertex(0, Shape.MOVE_VERTEX)
+    assert (a._highlightIndex, a._highlightMode) == (0, Shape.MOVE_VERTEX)
+    assert (b._highlightIndex, b._highlightMode) == (None, Shape.NEAR_VERTEX)
+
+    with pytest.raises(TypeError):
+        a._highlightSettings[Shape.NEAR_VERTEX] = (1, Shape.P_SQUARE)  # type: ignore[index]
+
+
+def test_Shape_getMaskBase64_cached():
+    shape = Shape(label="a", shape_type="mask")
+    shape.points = [QtCore.QPointF(0, 0), QtCore.QPointF(10, 10)]
+    shape.point_labels = [1, 1]
+    shape.mask = np.ones((11, 11), dtype=bool)
+    shape.close()
+    mask_base64 = shape.getMaskBase64()
+    assert shape.copy().getMaskBase64() is mask_base64
+
+    shape.label = "b"
+    assert shape.getMaskBase64() is mask_base64
+
+    shape.mask = np.zeros((11, 11), dtype=bool)
+    assert shape.getMaskBase64() != mask_base64
+
+    shape.mask = None
+    assert shape.getMaskBase64() is None
+
+
+def test_Shape_addPoints():
+    points = [QtCore.QPointF(x, y) for x, y in [(0, 0), (1, 0), (1, 1), (0, 0)]]
+    expected = Shape(shape_type="polygon")
+    for point in points:
+        expected.addPoint(point)
+    shape = Shape(shape_type="polygon")
+    shape.addPoints(points)
+    assert shape.points == expected.points == points[:3]
+    assert shape.point_labels == expected.point_labels
+    assert shape.isClosed() and expected.isClosed()
+
+
+def test_Shape_copy():
+    shape = Shape(label="a", shape_type="polygon", flags={"x": False})
+    shape.addPoints([QtCore.QPointF(0, 0), QtCore.QPointF(1, 1)])
+    shape.other_data = {"extra": [1, 2]}
+    shape.fill_color = QtGui.QColor(1, 2, 3)
+
+    copied = shape.copy()
+    copied.points[0].setX(5)
+    copied.flags["x"] = True
+    copied.other_data["extra"].append(3)
+    assert shape.points[0] == QtCore.QPointF(0, 0)
+    assert shape.flags == {"x": False}
+    assert shape.other_data == {"extra": [1, 2]}
+    assert copied.fill_color == shape.fill_color
@@ -0,0 +1,33 @@
+import io
+import os
+
+import numpy as np
+import PIL.Image
+
+from labelme._thumbnail_cache import ThumbnailCache
+
+
+def test_ThumbnailCache(tmp_path):
+    filename = str(tmp_path / "image.jpg")
+    PIL.Image.new("RGB", (400, 200), color=(255, 0, 0)).save(filename)
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024**2)
+
+    assert cache.get(filename, size=64) is None
+    data = cache.get_or_create(filename, size=64)
+    assert data is not None
+    thumbnail = PIL.Image.open(io.BytesIO(data))
+    assert thumbnail.size == (64, 32)
+    assert np.abs(np.asarray(thumbnail)[16, 32] - [255, 0, 0]).max() < 8
+    assert cache.get(filename, size=64) == data
+    assert cache.get(filename, size=32) is None
+
+    # A changed file is a miss, as its mtime or size differs.
+    PIL.Image.new("RGB", (100, 100)).save(filename)
+    os.utime(filename, ns=(0, 0))
+    assert cache.get(filename, size=64) is None
+    assert PIL.Image.open(io.BytesIO(cache.get_or_create(filename, size=64))).size == (
+        64,
+        64,
+    )
+
+    assert cache.get_or_create(str(tmp_path / "missing.jpg"), size=64) is None
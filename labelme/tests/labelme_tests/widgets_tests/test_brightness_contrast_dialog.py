@@ -0,0 +1,52 @@
+import numpy as np
+import PIL.Image
+import PIL.ImageEnhance
+import pytest
+
+from labelme.utils import img_qt_to_arr
+from labelme.widgets import BrightnessContrastDialog
+from labelme.widgets import brightness_contrast_dialog
+
+
+@pytest.mark.gui
+@pytest.mark.parametrize("mode", ["RGB", "L"])
+def test_BrightnessContrastDialog_matches_PIL(qtbot, mode):
+    arr = np.random.RandomState(0).randint(0, 256, size=(31, 48, 3), dtype=np.uint8)
+    img_pil = PIL.Image.fromarray(arr).convert(mode)
+
+    results = []
+    dialog = BrightnessContrastDialog(img_pil, results.append)
+    qtbot.addWidget(dialog)
+    dialog.setValues(brightness=60, contrast=80)
+    assert len(results) == 1
+
+    expected = PIL.ImageEnhance.Brightness(img_pil).enhance(60 / 50)
+    expected = PIL.ImageEnhance.Contrast(expected).enhance(80 / 50)
+    expected = np.asarray(expected.convert("RGB"))
+    actual = img_qt_to_arr(results[0].convertToFormat(results[0].Format_RGB888))
+    diff = np.abs(actual.astype(int) - expected.astype(int))
+    # The mean luma that Contrast() pivots on may round differently.
+    assert diff.max() <= 2
+
+    dialog.setValues(brightness=None, contrast=None)
+    assert results[-1] is dialog.img
+
+
+@pytest.mark.gui
+def test_BrightnessContrastDialog_preview(qtbot, monkeypatch):
+    monkeypatch.setattr(brightness_contrast_dialog, "PREVIEW_SIZE", 16)
+    arr = np.random.RandomState(0).randint(0, 256, size=(40, 64, 3), dtype=np.uint8)
+
+    results = []
+    dialog = BrightnessContrastDialog(PIL.Image.fromarray(arr), results.append)
+    qtbot.addWidget(dialog)
+
+    # Dragging passes the downscaled preview, at its own size.
+    dialog.slider_brightness.setSliderDown(True)
+    dialog.slider_brightness.setValue(60)
+    assert (results[-1].width(), results[-1].height()) == (16, 10)
+
+    # Releasing passes the full image.
+    dialog.slider_brightness.setSliderDown(False)
+    dialog.onNewValue(None)
+    assert (results[-1].width(), results[-1].height()) == (64, 40)
@@ -0,0 +1,174 @@
+import concurrent.futures
+
+import numpy as np
+import pytest
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+
+from labelme.shape import Shape
+from labelme.widgets import canvas as canvas_module
+from labelme.widgets.canvas import Canvas
+
+
+def _make_shape(label, x):
+    shape = Shape(label=label, shape_type="mask")
+    shape.points = [QtCore.QPointF(x, 0), QtCore.QPointF(x + 10, 10)]
+    shape.point_labels = [1, 1]
+    shape.mask = np.ones((11, 11), dtype=bool)
+    shape.close()
+    return shape
+
+
+@pytest.mark.gui
+def test_Canvas_storeShapes_shares_unchanged(qtbot):
+    canvas = Canvas()
+    qtbot.addWidget(canvas)
+    canvas.loadShapes([_make_shape("a", 0), _make_shape("b", 20)])
+
+    canvas.shapes[1].label = "c"
+    canvas.storeShapes()
+
+    before, after = canvas.shapesBackups
+    assert after[0] is before[0]
+    assert after[1] is not before[1]
+    assert after[1].mask is before[1].mask
+
+    canvas.restoreShape()
+    assert [shape.label for shape in canvas.shapes] == ["a", "b"]
+    assert canvas.shapes[1] is not before[1]
+
+    canvas.shapes[0].label = "d"
+    assert before[0].label == "a"
+
+
+@pytest.mark.gui
+def test_Canvas_paintShapes_batched(qtbot):
+    canvas = Canvas()
+    qtbot.addWidget(canvas)
+
+    shapes = []
+    for i, shape_type in enumerate(["polygon", "rectangle", "circle", "linestrip"]):
+        shape = Shape(label=str(i), shape_type=shape_type)
+        shape.points = [
+            QtCore.QPointF(10 + 40 * i, 10),
+            QtCore.QPointF(40 + 40 * i, 60),
+        ]
+        if shape_type == "polygon":
+            shape.points.append(QtCore.QPointF(10 + 40 * i, 60))
+        shape.point_labels = [1] * len(shape.points)
+        shape.line_color = QtGui.QColor(255, 0, 0)
+        shape.vertex_fill_color = QtGui.QColor(0, 255, 0)
+        shape.close()
+        shapes.append(shape)
+
+    images = []
+    for batched in [False, True]:
+        image = QtGui.QImage(200, 100, QtGui.QImage.Format_RGB32)
+        image.fill(QtGui.QColor(0, 0, 0))
+        painter = QtGui.QPainter(image)
+        if batched:
+            canvas._paintShapes(painter, shapes)
+        else:
+            for shape in shapes:
+                shape.paint(painter)
+        painter.end()
+        images.append(image)
+    assert images[0] == images[1]
+
+
+@pytest.mark.gui
+def test_Canvas_paintShapes_keeps_order(qtbot):
+    canvas = Canvas()
+    qtbot.addWidget(canvas)
+
+    # A filled shape between plain ones that overlap it from below and above.
+    shapes = []
+    for i, (color, fill) in enumerate(
+        [((255, 0, 0), False), ((0, 0, 255), True), ((0, 255, 0), False)]
+    ):
+        shape = Shape(label=str(i), shape_type="rectangle")
+        shape.points = [
+            QtCore.QPointF(10 + 20 * i, 10),
+            QtCore.QPointF(60 + 20 * i, 60),
+        ]
+        shape.point_labels = [1, 1]
+        shape.line_color = shape.vertex_fill_color = QtGui.QColor(*color)
+        shape.select_line_color = shape.hvertex_fill_color = QtGui.QColor(*color)
+        shape.fill_color = shape.select_fill_color = QtGui.QColor(*color)
+        shape.fill = fill
+        shape.close()
+        shapes.append(shape)
+
+    images = []
+    for batched in [False, True]:
+        image = QtGui.QImage(200, 100, QtGui.QImage.Format_RGB32)
+        image.fill(QtGui.QColor(0, 0, 0))
+        painter = QtGui.QPainter(image)
+        if batched:
+            canvas._paintShapes(painter, shapes)
+        else:
+            for shape in shapes:
+                shape.paint(painter)
+        painter.end()
+        images.append(image)
+    assert images[0] == images[1]
+
+
+@pytest.mark.gui
+def test_Canvas_fillDrawing_keeps_shared_colors(qtbot):
+    canvas = Canvas()
+    qtbot.addWidget(canvas)
+    image = QtGui.QImage(100, 100, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(0, 0, 0))
+    canvas.loadPixmap(image)
+    canvas.createMode = "polygon"
+    canvas.setFillDrawing(True)
+
+    # Colors shared with other shapes of the label, here transparent.
+    fill_color = QtGui.QColor(255, 0, 0, 0)
+    canvas.current = Shape(shape_type="polygon")
+    for shape in [canvas.current, canvas.line]:
+        shape.line_color = shape.select_line_color = QtGui.QColor(255, 0, 0)
+        shape.vertex_fill_color = shape.hvertex_fill_color = QtGui.QColor(255, 0, 0)
+        shape.fill_color = shape.select_fill_color = fill_color
+    canvas.current.points = [QtCore.QPointF(10, 10), QtCore.QPointF(50, 10)]
+    canvas.current.point_labels = [1, 1]
+    canvas.line.points = [QtCore.QPointF(50, 10), QtCore.QPointF(50, 50)]
+    canvas.line.point_labels = [1, 1]
+    canvas.resize(100, 100)
+    canvas.grab()
+
+    assert fill_color.alpha() == 0
+
+
+class _StubSam:
+    name = "stub"
+
+    def encode_image(self, image):
+        return image.shape
+
+
+def test_compute_image_embedding_locks_per_image():
+    image = QtGui.QImage(4, 4, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(0, 0, 0))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        with canvas_module._lock_image_digest(
+            model_name="stub", image_digest="test-locked"
+        ):
+            locked = executor.submit(
+                canvas_module._compute_image_embedding,
+                sam=_StubSam(),
+                image=image,
+                image_digest="test-locked",
+            )
+            # Another image doesn't wait for the one being encoded.
+            assert executor.submit(
+                canvas_module._compute_image_embedding,
+                sam=_StubSam(),
+                image=image,
+                image_digest="test-unlocked",
+            ).result(timeout=5) == (4, 4, 3)
+            assert not locked.done()
+        assert locked.result(timeout=5) == (4, 4, 3)
+    assert canvas_module._image_digest_locks == {}
@@ -0,0 +1,106 @@
+import PIL.Image
+import pytest
+from PyQt5.QtCore import QSize
+from PyQt5.QtCore import Qt
+
+from labelme._thumbnail_cache import ThumbnailCache
+from labelme.widgets import FileListWidget
+from labelme.widgets import ThumbnailLoader
+
+
+@pytest.mark.gui
+def test_FileListWidget(qtbot):
+    widget = FileListWidget()
+    qtbot.addWidget(widget)
+
+    widget.addFiles(["a.jpg", "b.jpg"], checked=[False, True])
+    widget.addFiles(["b.jpg", "c.jpg"], checked=[False, False])
+    assert widget.filenames() == ["a.jpg", "b.jpg", "c.jpg"]
+    assert widget.count() == 3
+    assert widget.row("c.jpg") == 2
+    assert widget.row("d.jpg") == -1
+    assert widget.isChecked("b.jpg")
+
+    model = widget.fileListModel()
+    widget.setChecked("a.jpg", True)
+    assert model.data(model.index(0), Qt.CheckStateRole) == Qt.Checked
+
+    with qtbot.waitSignal(widget.itemSelectionChanged):
+        widget.setCurrentRow(1)
+    assert widget.currentRow() == 1
+    assert widget.selectedFilename() == "b.jpg"
+
+    widget.clear()
+    assert widget.count() == 0
+    assert widget.row("a.jpg") == -1
+
+
+@pytest.mark.gui
+def test_FileListWidget_addFiles_sort_keys(qtbot):
+    widget = FileListWidget()
+    qtbot.addWidget(widget)
+
+    widget.addFiles(["2.jpg", "10.jpg"], checked=[False, False], sort_keys=[2, 10])
+    widget.setCurrentRow(widget.row("10.jpg"))
+    widget.addFiles(["x.jpg"], checked=[False])
+    widget.addFiles(
+        ["1.jpg", "5.jpg", "20.jpg"], checked=[True, False, False], sort_keys=[1, 5, 20]
+    )
+    assert widget.filenames() == [
+        "1.jpg",
+        "2.jpg",
+        "5.jpg",
+        "10.jpg",
+        "20.jpg",
+        "x.jpg",
+    ]
+    assert widget.row("10.jpg") == 3
+    assert widget.isChecked("1.jpg")
+    assert widget.currentRow() == 3
+    assert widget.selectedFilename() == "10.jpg"
+
+
+@pytest.mark.gui
+def test_FileListWidget_setFilterPattern(qtbot):
+    widget = FileListWidget()
+    qtbot.addWidget(widget)
+
+    widget.addFiles(["a1.jpg", "b1.jpg", "a2.jpg"], checked=[False, False, False])
+    widget.setFilterPattern("^a")
+    assert widget.filenames() == ["a1.jpg", "a2.jpg"]
+    assert widget.count() == 2
+    assert widget.row("a2.jpg") == 1
+    assert widget.row("b1.jpg") == -1
+
+    widget.setCurrentRow(1)
+    assert widget.selectedFilename() == "a2.jpg"
+
+    widget.addFiles(["a3.jpg", "b2.jpg"], checked=[False, False])
+    assert widget.filenames() == ["a1.jpg", "a2.jpg", "a3.jpg"]
+
+    widget.setFilterPattern("[")  # invalid, so nothing is filtered
+    assert widget.count() == 5
+    assert widget.currentRow() == widget.row("a2.jpg") == 2
+
+
+@pytest.mark.gui
+def test_FileListWidget_setThumbnailLoader(qtbot, tmp_path):
+    filename = str(tmp_path / "image.png")
+    PIL.Image.new("RGB", (60, 30)).save(filename)
+    loader = ThumbnailLoader(
+        ThumbnailCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024**2)
+    )
+    widget = FileListWidget()
+    qtbot.addWidget(widget)
+    widget.addFiles([filename], checked=[False])
+
+    widget.setThumbnailLoader(loader, size=16)
+    model = widget.fileListModel()
+    index = model.index(0)
+    assert model.data(index) == "image.png"
+    assert model.data(index, Qt.ToolTipRole) == filename
+    qtbot.waitUntil(lambda: model.data(index, Qt.DecorationRole).size() == QSize(16, 8))
+
+    widget.setThumbnailLoader(None)
+    assert model.data(index) == filename
+    assert model.data(index, Qt.DecorationRole) is None
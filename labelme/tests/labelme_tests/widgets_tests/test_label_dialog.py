@@ -44,6 +44,11 @@ def test_LabelDialog_addLabelHistory(qtbot):
     item = widget.labelList.item(0)
     assert item.text() == "bicycle"
 
+    widget.addLabelHistories(["zebra", "ant", "cat", "ant"])
+    assert [
+        widget.labelList.item(i).text() for i in range(widget.labelList.count())
+    ] == ["ant", "bicycle", "cat", "dog", "person", "zebra"]
+
 
 @pytest.mark.gui
 def test_LabelDialog_popUp(qtbot):
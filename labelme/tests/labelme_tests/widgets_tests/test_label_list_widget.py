@@ -18,3 +18,25 @@ def test_LabelListWidget(qtbot):
     widget.show()
     qtbot.addWidget(widget)
     qtbot.waitExposed(widget)
+
+
+@pytest.mark.gui
+def test_LabelListWidget_findItemByShape(qtbot):
+    widget = LabelListWidget()
+    qtbot.addWidget(widget)
+
+    shapes = [object() for _ in range(3)]
+    items = [LabelListWidgetItem(text=str(i), shape=s) for i, s in enumerate(shapes)]
+    widget.addItems(items)
+    assert len(widget) == 3
+    for item, shape in zip(items, shapes):
+        assert widget.findItemByShape(shape) is item
+
+    widget.removeItem(items[1])
+    assert widget.findItemByShape(shapes[2]) is items[2]
+    with pytest.raises(ValueError):
+        widget.findItemByShape(shapes[1])
+
+    widget.clear()
+    with pytest.raises(ValueError):
+        widget.findItemByShape(shapes[0])
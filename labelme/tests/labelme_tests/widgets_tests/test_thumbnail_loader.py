@@ -0,0 +1,34 @@
+import PIL.Image
+import pytest
+
+from labelme._thumbnail_cache import ThumbnailCache
+from labelme.widgets import ThumbnailLoader
+
+
+class _FailingCache(ThumbnailCache):
+    def get_or_create(self, filename, size):
+        if "broken" in filename:
+            raise OSError("cache directory removed")
+        return super().get_or_create(filename=filename, size=size)
+
+
+@pytest.mark.gui
+def test_ThumbnailLoader_survives_errors(qtbot, tmp_path):
+    filename = str(tmp_path / "image.png")
+    PIL.Image.new("RGB", (60, 30)).save(filename)
+    loader = ThumbnailLoader(
+        _FailingCache(cache_dir=str(tmp_path / "cache"), max_bytes=1024**2)
+    )
+
+    # More failures than there are workers, each giving a null image.
+    broken = [str(tmp_path / f"broken{i}.png") for i in range(10)]
+    for broken_filename in broken:
+        assert loader.thumbnail(broken_filename, 16) is None
+    qtbot.waitUntil(lambda: all(loader.thumbnail(f, 16) is not None for f in broken))
+    assert all(loader.thumbnail(f, 16).isNull() for f in broken)
+    assert loader._in_flight == set()
+
+    assert loader.thumbnail(filename, 16) is None
+    qtbot.waitUntil(lambda: loader.thumbnail(filename, 16) is not None)
+    assert loader.thumbnail(filename, 16).size().width() == 16
+    qtbot.waitUntil(lambda: loader._num_workers == 0)
@@ -0,0 +1,71 @@
+import pytest
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+
+from labelme.widgets.tiled_image import TiledImage
+
+
+def _make_image(width, height, color):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    image.fill(color)
+    return image
+
+
+@pytest.mark.gui
+def test_TiledImage_level_for_scale(qtbot):
+    tiled_image = TiledImage(
+        _make_image(1000, 600, QtGui.QColor(255, 0, 0)), tile_size=128
+    )
+    assert tiled_image.num_levels == 4
+    assert tiled_image.level_for_scale(2.0) == 0
+    assert tiled_image.level_for_scale(1.0) == 0
+    assert tiled_image.level_for_scale(0.5) == 1
+    assert tiled_image.level_for_scale(0.3) == 1
+    assert tiled_image.level_for_scale(0.01) == 3
+
+
+@pytest.mark.gui
+def test_TiledImage_draw(qtbot):
+    tiled_image = TiledImage(
+        _make_image(300, 200, QtGui.QColor(255, 0, 0)),
+        tile_size=64,
+        cache_bytes=4 * 64 * 64 * 4,
+    )
+    assert tiled_image.size() == QtCore.QSize(300, 200)
+    assert tiled_image
+
+    target = _make_image(300, 200, QtGui.QColor(0, 0, 0))
+    painter = QtGui.QPainter(target)
+    tiled_image.draw(painter, rect=QtCore.QRectF(0, 0, 300, 200), scale=1.0)
+    painter.end()
+
+    assert QtGui.QColor(target.pixel(0, 0)) == QtGui.QColor(255, 0, 0)
+    assert QtGui.QColor(target.pixel(299, 199)) == QtGui.QColor(255, 0, 0)
+    assert tiled_image.cached_bytes <= 4 * 64 * 64 * 4
+
+
+@pytest.mark.gui
+def test_TiledImage_null(qtbot):
+    tiled_image = TiledImage()
+    assert not tiled_image
+    assert tiled_image.isNull()
+
+
+@pytest.mark.gui
+def test_TiledImage_size(qtbot):
+    # A quarter-size preview drawn in place of the full image.
+    tiled_image = TiledImage(
+        _make_image(75, 50, QtGui.QColor(255, 0, 0)),
+        tile_size=64,
+        size=QtCore.QSize(300, 200),
+    )
+    assert tiled_image.size() == QtCore.QSize(300, 200)
+    assert tiled_image.toImage().size() == QtCore.QSize(75, 50)
+
+    target = _make_image(300, 200, QtGui.QColor(0, 0, 0))
+    painter = QtGui.QPainter(target)
+    tiled_image.draw(painter, rect=QtCore.QRectF(0, 0, 300, 200), scale=1.0)
+    painter.end()
+
+    assert QtGui.QColor(target.pixel(0, 0)) == QtGui.QColor(255, 0, 0)
+    assert QtGui.QColor(target.pixel(299, 199)) == QtGui.QColor(255, 0, 0)